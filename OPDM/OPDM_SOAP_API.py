@@ -9,31 +9,237 @@
 # Licence:     MIT
 # -------------------------------------------------------------------------------
 from requests import Session
-from zeep import Client as SOAPClient
-from zeep.transports import Transport
+from zeep import Client as SOAPClient, Settings
 from zeep.wsse.username import UsernameToken
-from zeep.plugins import HistoryPlugin
+from zeep.wsdl.utils import etree_to_string
+from zeep.exceptions import Fault, TransportError
+from requests.exceptions import ConnectionError, Timeout
 
 from lxml import etree
 
 import os
+import re
 import uuid
+import fnmatch
+import base64
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 
 import xmltodict
 
 import urllib3
 
-from OPDM import __version__ as package_version
+import OPDM
+
+from OPDM.scheduler import PriorityScheduler, priority_class
+from OPDM.ledger import UploadLedger
+from OPDM.catalogue import PublicationCatalogue
+from OPDM.transport import InstrumentedTransport, observe, phase
+from OPDM.metrics import MetricsRegistry
+from OPDM.tracing import Tracer
+from OPDM.capture import CaptureBuffer
+from OPDM.profiling import Profiler
+from OPDM.cassette import Cassette, CassetteAdapter
 
 import logging
 logger = logging.getLogger(__name__)
 
+# Name of the operation root element, used as operation label in metrics
+OPERATION_NAME = re.compile(rb"<(?:[\w.-]+:)?([A-Za-z][\w.-]*)")
+
+# HTTP status codes of OPDM or proxies that are worth retrying
+TRANSIENT_STATUS_CODES = (429, 502, 503, 504)
+
 
 def get_element(element_path, xml_tree):
     element = xml_tree.find(element_path, namespaces=xml_tree.nsmap)
     return element
 
 
+def iter_base64_chunks(file_path_or_file_object, chunk_size=3 * 256 * 1024):
+    """Read file path, file object or bytes like object in chunks and yield base64 encoded chunks, chunk_size is rounded to multiple of 3"""
+
+    chunk_size = max(3, chunk_size - chunk_size % 3)
+
+    if isinstance(file_path_or_file_object, (bytes, bytearray, memoryview)):
+        view = memoryview(file_path_or_file_object).cast("B")
+
+        for position in range(0, len(view), chunk_size):
+            yield base64.b64encode(view[position:position + chunk_size])
+
+        return
+
+    if isinstance(file_path_or_file_object, (str, os.PathLike)):
+        with open(file_path_or_file_object, "rb") as file_object:
+            yield from iter_base64_chunks(file_object, chunk_size)
+
+        return
+
+    # Only multiples of 3 bytes can be encoded without padding, carry over the rest to next chunk
+    remainder = b""
+    while True:
+        chunk = file_path_or_file_object.read(chunk_size)
+
+        if not chunk:
+            break
+
+        chunk = remainder + chunk
+        cut = len(chunk) - len(chunk) % 3
+        remainder = chunk[cut:]
+
+        if cut:
+            yield base64.b64encode(chunk[:cut])
+
+    if remainder:
+        yield base64.b64encode(remainder)
+
+
+def is_transient_error(error):
+    """True for network errors and temporary HTTP errors, SOAP faults are not retried as those are answers from OPDM"""
+
+    if isinstance(error, (ConnectionError, Timeout)):
+        return True
+
+    if isinstance(error, TransportError):
+        return error.status_code in TRANSIENT_STATUS_CODES
+
+    return False
+
+
+def _ruleset_sender(ruleset):
+    """SenderToolboxCode of ruleset first file, None if metadata is missing"""
+
+    components = as_list(ruleset.get("opde:Component"))
+    profile = components[0].get("opdm:Profile") if components and isinstance(components[0], dict) else None
+
+    return (((profile or {}).get("opde:Context") or {}).get("opde:EDXContext") or {}).get("opde:SenderToolboxCode")
+
+
+def as_list(value):
+    """xmltodict returns single element as dict and multiple elements as list, this always returns a list"""
+
+    if value is None:
+        return []
+
+    if isinstance(value, list):
+        return value
+
+    return [value]
+
+
+def _local_value(item, *names):
+    """Get value from xmltodict element by local name (without namespace prefix), case insensitive"""
+
+    for key, value in item.items():
+        if key.lstrip("@").split(":")[-1].lower() in names:
+            return value.get("#text") if isinstance(value, dict) else value
+
+    return None
+
+
+def parse_publication_report(response):
+    """
+    Parse GetProfilePublicationReport response into list of reports
+
+    report_example = {"filename": "20190712T0930Z_1D_ELERING_EQ_001.zip",
+                      "model_id": "3c09a995-d250-460d-9b34-09f75fc2cade",
+                      "status": "<status of the last step>",
+                      "steps": [<publication:step dictionaries>]}
+    """
+
+    reports = []
+
+    parts = as_list(response["sm:GetProfilePublicationReportResult"].get("sm:part"))
+
+    for part in parts:
+
+        if not isinstance(part, dict):
+            continue
+
+        for report in as_list(part.get("opdm:PublicationReport")):
+
+            history = report.get("publication:history") or {}
+            steps = as_list(history.get("publication:step"))
+            last_step = steps[-1] if steps else {}
+
+            reports.append({"filename": _local_value(report, "filename"),
+                            "model_id": _local_value(report, "modelid"),
+                            "status": _local_value(last_step, "status", "state", "result") if isinstance(last_step, dict) else None,
+                            "steps": steps})
+
+    return reports
+
+
+def _metadata_value(value):
+    """Normalize metadata value from query dictionary or xmltodict response to (operator, value)"""
+
+    if isinstance(value, dict):
+        return value.get("operator", value.get("@operator")), value.get("value", value.get("#text"))
+
+    return None, value
+
+
+def parse_subscriptions(response):
+    """
+    Parse GetSubscriptions response into list of subscriptions
+
+    subscription_example = {"subscription_id": "IGM-1D",
+                            "publication_id": "<publication id>",
+                            "mode": "DIRECT_CONTENT",
+                            "object_type": "IGM",
+                            "metadata_dict": {"pmd:timeHorizon": "1D"},
+                            "status": "SUBSCRIBED"}     # SUBSCRIBED, NOT_SUBSCRIBED, PENDING or DELETED
+    """
+
+    subscriptions = []
+
+    for part in as_list(response["sm:GetSubscriptionsResult"].get("sm:part")):
+
+        if not isinstance(part, dict):
+            continue
+
+        containers = [part] + [value for value in part.values() if isinstance(value, dict)]
+
+        for container in containers:
+            for subscription in as_list(container.get("opdm:Subscription")):
+
+                pattern = (subscription.get("opdm:MetadataPattern") or {}).get("opdm:OPDMObject") or {}
+                metadata_dict = {}
+                object_type = None
+
+                for key, value in pattern.items():
+                    if key.startswith("@"):
+                        continue
+
+                    if key.split(":")[-1] == "Object-Type":
+                        object_type = _metadata_value(value)[1]
+                        continue
+
+                    operator, value = _metadata_value(value)
+                    metadata_dict[key] = value if operator is None else {"operator": operator, "value": value}
+
+                status = _local_value(subscription, "status", "subscriptionstatus") or ""
+
+                subscriptions.append({"subscription_id": _local_value(subscription, "subscriptionid"),
+                                      "publication_id": _local_value(subscription, "publicationid"),
+                                      "mode": _local_value(subscription, "mode"),
+                                      "object_type": object_type,
+                                      "metadata_dict": metadata_dict,
+                                      "status": status.strip().upper().replace(" ", "_")})
+
+    return subscriptions
+
+
+def parse_response(response):
+    """Convert ExecuteOperation result element to dictionary, sm:part is always a list"""
+
+    return xmltodict.parse(etree.tostring(response, pretty_print=True),
+                           xml_attribs=True,
+                           force_list=('sm:part',))
+
+
 def add_xml_elements(xml_string, parent_element_url, metadata_dict):
 
     if type(xml_string) is str:
@@ -62,14 +268,54 @@ def add_xml_elements(xml_string, parent_element_url, metadata_dict):
 
 class Client:
 
-    def __init__(self, server, username="", password="", debug=False, verify=False):
+    def __init__(self, server, username="", password="", debug=False, verify=False, scheduler_workers=4, catalogue_ttl=300, metrics=None, tracing=None, capture=None, profiling=None, cassette=None):
 
         """At minimum server address or IP must be provided
-        service = create_client(<server_ip_or_address>)"""
+        service = create_client(<server_ip_or_address>)
+
+        scheduler_workers -> number of worker threads used by submit(), started on first use
+        catalogue_ttl -> seconds the list of available publications is cached
+        metrics -> True or OPDM.metrics.MetricsRegistry to collect per operation duration, size and error metrics
+        tracing -> path of JSON lines file, callable receiving list of spans or OPDM.tracing.Tracer to record spans of client operations
+        capture -> True or OPDM.capture.CaptureBuffer to keep last SOAP exchanges for debugging, enabled by default with debug=True
+        profiling -> True or OPDM.profiling.Profiler to collect cProfile and tracemalloc profiles per operation, False to disable, by default configured from OPDM_PROFILE environment variables
+        cassette -> path or OPDM.cassette.Cassette to record HTTP exchanges to file, or replay them offline when the file exists"""
 
         self.debug = debug
-        self.history = HistoryPlugin()
-        self.API_VERSION = package_version
+        self.scheduler_workers = scheduler_workers
+        self._scheduler = None
+        self._scheduler_lock = threading.Lock()
+        self.catalogue = PublicationCatalogue(self, ttl=catalogue_ttl)
+        self._installed_ruleset_version = None
+        self._ruleset_checked = None
+
+        # Observers of SOAP operations, see OPDM.transport.observe
+        self._observers = []
+
+        self.metrics = MetricsRegistry() if metrics is True else metrics
+        if self.metrics is not None:
+            self._observers.append(self.metrics)
+
+        self.tracer = tracing if tracing is None or isinstance(tracing, Tracer) else Tracer(tracing)
+        if self.tracer is not None:
+            self._observers.append(self.tracer)
+
+        if capture is None and debug:
+            capture = True
+
+        self.capture = CaptureBuffer() if capture is True else capture
+        if self.capture is not None:
+            self._observers.append(self.capture)
+
+        # Profiler is last, so other observers are not included in profiles
+        if profiling is None:
+            profiling = Profiler.from_environment()
+
+        self.profiler = Profiler() if profiling is True else profiling or None
+        if self.profiler is not None:
+            self._observers.append(self.profiler)
+
+        self.API_VERSION = OPDM.__version__
 
         service_wsdl = '{}/opdm/cxf/OPDMSoapInterface?wsdl'.format(server)
         ruleset_wsdl = '{}/opdm/cxf/OPDMSoapInterface/RuleSetManagementService?wsdl'.format(server)
@@ -81,35 +327,95 @@ class Client:
             urllib3.disable_warnings()
             session.verify = False
 
+        self.cassette = Cassette(cassette) if isinstance(cassette, (str, os.PathLike)) else cassette
+        if self.cassette is not None:
+            adapter = CassetteAdapter(self.cassette)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+
         # Set up client
-        self.client = SOAPClient(service_wsdl, transport=Transport(session=session), wsse=UsernameToken(username=username, password=password))
-        self.ruleset_client = SOAPClient(ruleset_wsdl, transport=Transport(session=session), wsse=UsernameToken(username=username, password=password))
+        # Payloads over 10 MB are single base64 text nodes, these are rejected by lxml without huge tree
+        settings = Settings(xml_huge_tree=True)
+
+        self.client = SOAPClient(service_wsdl, transport=InstrumentedTransport(session=session), wsse=UsernameToken(username=username, password=password), settings=settings)
+        self.ruleset_client = SOAPClient(ruleset_wsdl, transport=InstrumentedTransport(session=session), wsse=UsernameToken(username=username, password=password), settings=settings)
 
         if self.debug:
-            self.client.plugins = [self.history]
-            self.ruleset_client.plugins = [self.history]
             logging.basicConfig(format='%(asctime)s | %(name)s | %(levelname)s | %(message)s', level=logging.DEBUG)
 
+            # Message bodies are kept in capture buffer, do not log every message
+            logging.getLogger("zeep.transports").setLevel(logging.INFO)
+
     def _print_last_message_exchange(self):
-        """Prints out last sent and received SOAP messages"""
+        """Prints out last sent and received SOAP messages, requires capture (enabled with debug=True)"""
+
+        if self.capture is None:
+            logger.warning("Message capture is not enabled, create client with debug=True or capture=True")
+            return
+
+        last = self.capture.last()
 
-        messages = {"SENT":     self.history.last_sent,
-                    "RECEIVED": self.history.last_received}
-        print("-" * 50)
+        if last is None:
+            logger.warning("No captured messages")
+            return
 
-        for message in messages:
+        print(self.capture.format([last]))
 
-            print(f"### {message} HTTP HEADER ###")
-            print('\n' * 1)
-            print(messages[message]["http_headers"])
-            print('\n' * 1)
-            print(f"### {message} HTTP ENVELOPE START ###")
-            print('\n' * 1)
-            print(etree.tostring(messages[message]["envelope"], pretty_print=True).decode())
-            print(f"### {message} HTTP ENVELOPE END ###")
-            print('\n' * 1)
+    def _observe(self, operation, kind="client", **attributes):
+        """Context for observers of single SOAP operation, does nothing when no observers are registered"""
+
+        if not self._observers:
+            return nullcontext()
+
+        return observe(self._observers, operation, kind=kind, **attributes)
+
+    def span(self, name, **attributes):
+        """
+        Group client operations under one span when tracing is enabled, for example query -> download -> write
 
-        print("-" * 50)
+        with service.span("download_closure", model_id=model_id):
+            ...
+        """
+
+        return self._observe(name, kind="internal", **attributes)
+
+    @property
+    def scheduler(self):
+        """Priority scheduler used by submit(), created on first use"""
+
+        with self._scheduler_lock:
+            if self._scheduler is None:
+                self._scheduler = PriorityScheduler(max_workers=self.scheduler_workers)
+
+        return self._scheduler
+
+    def submit(self, operation, *args, priority=None, **kwargs):
+        """
+        Queue client operation to the priority scheduler, returns concurrent.futures.Future
+
+        operation -> name of client method, for example "query_object" or "get_content"
+        priority -> RT, ID, DA, WA, YR or BACKGROUND, if not set it is derived from pmd:timeHorizon in metadata_dict or from object_type
+
+        future = service.submit("query_object", "CGM", metadata_dict={'pmd:timeHorizon': 'ID'})
+        response = future.result()
+        """
+
+        if priority is None:
+            object_type = kwargs.get("object_type")
+            metadata_dict = kwargs.get("metadata_dict")
+
+            # Only query methods take object type or metadata_dict as positional arguments
+            if operation == "query_object" and args:
+                object_type = args[0]
+                metadata_dict = args[1] if len(args) > 1 else metadata_dict
+            elif operation == "query_profile" and args:
+                metadata_dict = args[0]
+
+            priority = priority_class(metadata_dict, object_type)
+
+        logger.debug(f"Queueing {operation} with priority {priority}")
+
+        return self.scheduler.submit(getattr(self, operation), *args, priority=priority, **kwargs)
 
     class Operations:
 
@@ -222,40 +528,220 @@ class Client:
         if type(operation_xml) is str:
             operation_xml = operation_xml.encode("UTF-8")
 
-        response = self.client.service.ExecuteOperation(operation_xml)
+        if self._observers:
+            operation_name = OPERATION_NAME.search(operation_xml)
+            operation_name = operation_name.group(1).decode() if operation_name else "ExecuteOperation"
+        else:
+            operation_name = None
 
-        if self.debug:
-            logger.debug(etree.tostring(response, pretty_print=True))
+        with self._observe(operation_name) as exchange:
+
+            response = self.client.service.ExecuteOperation(operation_xml)
+
+            if exchange is not None:
+                exchange["deserialized"] = time.perf_counter()
 
-        if not return_raw_response:
-            response = xmltodict.parse(etree.tostring(response, pretty_print=True),
-                                       xml_attribs=True,
-                                       force_list=('sm:part',))
+            if not return_raw_response:
+                with phase("parse"):
+                    response = parse_response(response)
 
         return response
 
     def publication_request(self, file_path_or_file_object, content_type="CGMES"):
         """PublicationRequest(dataset: ns0:opdeFileDto) -> return: ns0:resultDto,
-        ns0:opdeFileDto(id: xsd:string, type: xsd:string, content: xsd:base64Binary)"""
+        ns0:opdeFileDto(id: xsd:string, type: xsd:string, content: xsd:base64Binary)
 
-        if type(file_path_or_file_object) == str:
+        file_path_or_file_object -> path, io.BytesIO with name (whole buffer is sent) or file object opened in binary mode (read from current position)"""
+
+        if isinstance(file_path_or_file_object, (str, os.PathLike)):
 
             with open(file_path_or_file_object, "rb") as file_object:
                 file_string = file_object.read()
 
-            file_name = os.path.basename(file_path_or_file_object)
+            file_name = os.path.basename(os.fspath(file_path_or_file_object))
 
         else:
-            file_string = file_path_or_file_object.getvalue()
-            file_name = file_path_or_file_object.name
+            # In memory files are usually not rewound after writing, send the whole buffer
+            if hasattr(file_path_or_file_object, "getvalue"):
+                file_string = file_path_or_file_object.getvalue()
+            else:
+                file_string = file_path_or_file_object.read()
+            file_name = os.path.basename(file_path_or_file_object.name)
 
         payload = {"id": file_name, "type": content_type, "content": file_string}
 
-        response = self.client.service.PublicationRequest(payload)
+        with self._observe("PublicationRequest", file_name=file_name):
+            response = self.client.service.PublicationRequest(payload)
+
+        return response
+
+    def publication_request_stream(self, file_path_or_file_object, content_type="CGMES", file_name=None, chunk_size=3 * 256 * 1024):
+        """
+        Same as publication_request, but the file is read and base64 encoded in chunks while it is sent as chunked HTTP request body,
+        so memory usage does not depend on the file size.
+
+        file_path_or_file_object -> path, file object opened in binary mode or bytes like object (bytes, memoryview)
+        file_name -> name of the file on OPDM, by default taken from path or file object name (required for bytes like objects)
+        """
+
+        # Open the file before the request is started, so missing files are not reported as connection errors
+        if isinstance(file_path_or_file_object, (str, os.PathLike)):
+            with open(file_path_or_file_object, "rb") as file_object:
+                return self.publication_request_stream(file_object, content_type=content_type, file_name=file_name or os.path.basename(file_path_or_file_object), chunk_size=chunk_size)
+
+        if file_name is None:
+            if hasattr(file_path_or_file_object, "name"):
+                file_name = os.path.basename(file_path_or_file_object.name)
+            else:
+                raise ValueError("file_name must be provided when uploading bytes like object")
+
+        with self._observe("PublicationRequest", file_name=file_name, stream=True):
+
+            # Build the envelope with zeep using a placeholder for content, so that headers and WS-Security are the same as for normal request
+            placeholder = uuid.uuid4().hex.encode()
+            envelope = self.client.create_message(self.client.service, "PublicationRequest", {"id": file_name, "type": content_type, "content": placeholder})
+            envelope_start, envelope_end = etree_to_string(envelope).split(base64.b64encode(placeholder))
+
+            def body():
+                yield envelope_start
+                yield from iter_base64_chunks(file_path_or_file_object, chunk_size)
+                yield envelope_end
+
+            binding = self.client.service._binding
+            operation = binding.get("PublicationRequest")
+            headers = {"Content-Type": "text/xml; charset=utf-8", "SOAPAction": f'"{operation.soapaction or ""}"'}
+
+            logger.debug(f"Streaming upload of {file_name}")
+
+            response = self.client.transport.post(self.client.service._binding_options["address"], body(), headers)
+            response = binding.process_reply(self.client, operation, response)
 
         return response
 
-    def get_profile_publication_report(self, model_id="", filename=""):
+    def published_file_names(self, file_names, batch_size=100):
+        """Returns set of file names that already exist on OPDM, queried with one "is one of" filter per batch_size names"""
+
+        file_names = list(file_names)
+        published = set()
+
+        for position in range(0, len(file_names), batch_size):
+            batch = file_names[position:position + batch_size]
+            response = self.query_profile({"pmd:fileName": {"operator": "is one of", "value": ",".join(batch)}})
+
+            # Remove first part of the response, it is the id of the original query
+            for part in as_list(response['sm:QueryResult'].get('sm:part'))[1:]:
+                if isinstance(part, dict) and isinstance(part.get('opdm:Profile'), dict):
+                    published.add(part['opdm:Profile'].get('pmd:fileName'))
+
+        return published & set(file_names)
+
+    def publish_many(self, paths, workers=4, retries=2, retry_delay=2, content_type="CGMES", stream=False, ledger=None, skip_published=False):
+        """
+        Upload multiple files concurrently, returns list of results in the same order as paths
+
+        workers -> number of concurrent uploads
+        retries -> number of retries per file on transient errors (connection errors, timeouts, HTTP 429/502/503/504)
+        retry_delay -> seconds to wait before first retry, doubled on every next retry
+        stream -> use publication_request_stream, recommended for large files
+        ledger -> OPDM.UploadLedger or path to ledger file, files accepted before with same content are skipped without network calls
+        skip_published -> check with batched query_profile which file names already exist on OPDM and skip those
+
+        result_example = {"path": "C:/IGM/20190712T0930Z_1D_ELERING_EQ_001.zip",
+                          "file_name": "20190712T0930Z_1D_ELERING_EQ_001.zip",
+                          "accepted": True,           # False if OPDM returned a fault or upload failed
+                          "response": <lxml response document or None>,
+                          "error": None,              # error message if not accepted
+                          "attempts": 1,
+                          "duration": 1.52,           # seconds, including retries
+                          "skipped": None}            # "ledger" or "published" if upload was not needed
+        """
+
+        paths = list(paths)
+
+        if isinstance(ledger, (str, os.PathLike)):
+            ledger = UploadLedger(ledger)
+
+        skipped = {}
+
+        if ledger is not None:
+            for path in paths:
+                if os.path.exists(path) and ledger.is_uploaded(path):
+                    skipped[path] = "ledger"
+
+        if skip_published:
+            candidates = {os.path.basename(path): path for path in paths if path not in skipped}
+
+            if candidates:
+                for file_name in self.published_file_names(candidates.keys()):
+                    skipped[candidates[file_name]] = "published"
+
+                    if ledger is not None:
+                        ledger.record(candidates[file_name], accepted=True, result={"skipped": "published"})
+
+        if skipped:
+            logger.info(f"Skipping {len(skipped)} files already on OPDM")
+
+        publish = self.publication_request_stream if stream else self.publication_request
+
+        def upload(path):
+
+            result = {"path": path, "file_name": os.path.basename(path), "accepted": False, "response": None, "error": None, "attempts": 0, "duration": None, "skipped": skipped.get(path)}
+
+            if result["skipped"]:
+                result["accepted"] = True
+                result["duration"] = 0.0
+                return result
+
+            start = time.monotonic()
+
+            while True:
+                result["attempts"] += 1
+
+                try:
+                    logger.info(f"Uploading {path}")
+                    result["response"] = publish(path, content_type=content_type)
+                    result["accepted"] = True
+                    break
+
+                except Exception as error:
+                    result["error"] = str(error)
+
+                    if isinstance(error, Fault):
+                        logger.error(f"Upload rejected {path} -> {error}")
+                        break
+
+                    if not is_transient_error(error) or result["attempts"] > retries:
+                        logger.error(f"Upload failed {path} -> {error}")
+                        break
+
+                    wait_time = retry_delay * 2 ** (result["attempts"] - 1)
+                    logger.warning(f"Upload of {path} failed on attempt {result['attempts']}, retrying in {wait_time}s -> {error}")
+                    time.sleep(wait_time)
+
+            if result["accepted"]:
+                result["error"] = None
+
+            result["duration"] = time.monotonic() - start
+
+            if ledger is not None and os.path.exists(path):
+                ledger.record(path, accepted=result["accepted"], result={key: result[key] for key in ("accepted", "error", "attempts", "duration")})
+
+            return result
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(upload, paths))
+
+    def get_profile_publication_report(self, model_id="", filename="", batch_size=100):
+        """
+        Get publication report of uploaded file by model ID or file name
+
+        If list of model ID-s or file names is given, reports are queried with one "is one of" filter per batch_size items
+        and all publication steps are returned as one columnar table
+        table_example = {"filename": ["a.zip", "a.zip", ...], "model_id": [...], "step": [0, 1, ...], "publication:status": [...], ...}
+        """
+
+        if isinstance(model_id, (list, tuple, set)) or isinstance(filename, (list, tuple, set)):
+            return self._publication_report_table(model_ids=model_id or [], filenames=filename or [], batch_size=batch_size)
 
         if model_id == "" and filename == "":
             logger.error("model_id or filename needs to be defined to get the report")
@@ -276,6 +762,36 @@ class Client:
 
         return self.execute_operation(get_profile_publication_report)
 
+    def _publication_report_table(self, model_ids=(), filenames=(), batch_size=100):
+
+        rows = []
+
+        for kind, values in (("model_id", list(model_ids)), ("filename", list(filenames))):
+            for position in range(0, len(values), batch_size):
+                batch = values[position:position + batch_size]
+                value = batch[0] if len(batch) == 1 else {"operator": "is one of", "value": ",".join(batch)}
+
+                response = self.get_profile_publication_report(**{kind: value})
+
+                for report in parse_publication_report(response):
+
+                    # Single file query might not echo back the identifier
+                    if report[kind] is None and len(batch) == 1:
+                        report[kind] = batch[0]
+
+                    for number, step in enumerate(report["steps"]):
+                        row = {"filename": report["filename"], "model_id": report["model_id"], "step": number}
+                        row.update(step if isinstance(step, dict) else {"#text": step})
+                        rows.append(row)
+
+        columns = []
+        for row in rows:
+            columns.extend(column for column in row if column not in columns)
+
+        table = {column: [row.get(column) for row in rows] for column in ["filename", "model_id", "step"] + columns[3:]}
+
+        return table
+
     def query_object(self, object_type="IGM", metadata_dict=None, components=None, dependencies=None, raw_response=False):
         """
         object_type ->IGM, CGM, BDS
@@ -357,29 +873,31 @@ class Client:
         query_id = "py_opdm-api{api_version}_{uuid}".format(uuid=uuid.uuid4(), api_version=self.API_VERSION)
         logger.debug(f"Executing query with ID: {query_id}")
 
-        query_object = self.Operations.QueryObject.format(query_id=query_id)
+        with self._observe("query_object", kind="internal", query_id=query_id, object_type=object_type):
+
+            query_object = self.Operations.QueryObject.format(query_id=query_id)
+
+            # Use default object type or passed in object type from function call, if not defined directly in query metadata
 
-        # Use default object type or passed in object type from function call, if not defined directly in query metadata
+            if not metadata_dict:
+                metadata_dict = {}
 
-        if not metadata_dict:
-            metadata_dict = {}
-        
-        if not metadata_dict.get("pmd:Object-Type"):
-            metadata_dict["pmd:Object-Type"] = object_type
+            if not metadata_dict.get("pmd:Object-Type"):
+                metadata_dict["pmd:Object-Type"] = object_type
 
-        query_object = add_xml_elements(query_object, ".//opdm:OPDMObject", metadata_dict)
+            query_object = add_xml_elements(query_object, ".//opdm:OPDMObject", metadata_dict)
 
-        if components:
-            for component in components:
-                query_object = add_xml_elements(query_object, ".//opde:Components", component)
+            if components:
+                for component in components:
+                    query_object = add_xml_elements(query_object, ".//opde:Components", component)
 
-        if dependencies:
-            for dependency in dependencies:
-                query_object = add_xml_elements(query_object, ".//opde:Dependencies", dependency)
+            if dependencies:
+                for dependency in dependencies:
+                    query_object = add_xml_elements(query_object, ".//opde:Dependencies", dependency)
 
-        logger.debug(query_object)
+            logger.debug(query_object)
 
-        return self.execute_operation(query_object, return_raw_response=raw_response)
+            return self.execute_operation(query_object, return_raw_response=raw_response)
 
 
     def query_profile(self, metadata_dict, raw_response=False):
@@ -389,12 +907,14 @@ class Client:
         query_id = "py_opdm-api{api_version}_{uuid}".format(uuid=uuid.uuid4(), api_version=self.API_VERSION)
         logger.debug(f"Executing query with ID: {query_id}")
 
-        query_profile = self.Operations.QueryProfile.format(query_id=query_id)
-        query_profile = add_xml_elements(query_profile, ".//opdm:Profile", metadata_dict)
+        with self._observe("query_profile", kind="internal", query_id=query_id):
 
-        logger.debug(query_profile)
+            query_profile = self.Operations.QueryProfile.format(query_id=query_id)
+            query_profile = add_xml_elements(query_profile, ".//opdm:Profile", metadata_dict)
 
-        return self.execute_operation(query_profile, return_raw_response=raw_response)
+            logger.debug(query_profile)
+
+            return self.execute_operation(query_profile, return_raw_response=raw_response)
 
     def get_content(self, content_id, return_payload=False, object_type="file", raw_response=False):
         """
@@ -443,7 +963,8 @@ class Client:
 
         get_content_result = self.Operations.GetContentResult.format(identifier_parts=identifier_parts_str, return_mode=return_mode)
 
-        return self.execute_operation(get_content_result, return_raw_response=raw_response)
+        with self._observe("get_content", kind="internal", content_id=content_id, object_type=object_type, return_mode=return_mode):
+            return self.execute_operation(get_content_result, return_raw_response=raw_response)
 
     def publication_list(self):
 
@@ -470,20 +991,10 @@ class Client:
         return self.execute_operation(get_subscriptions)
 
 
-    def publication_subscribe(self, object_type="BDS", subscription_id="", publication_id="", mode="DIRECT_CONTENT", metadata_dict=None, raw_response=False):
-        """
-        Set up subscription for data models. By default sets up subscription for BDS
+    def _create_subscription_operation(self, object_type="BDS", subscription_id="", publication_id="", mode="DIRECT_CONTENT", metadata_dict=None):
+        """Validate subscription against publication catalogue, returns CreateSubscription operation xml or None if not valid"""
 
-        objec_type -> IGM, CGM, BDS
-        subscription_id -> if empty string, uuid4 is assigned as id
-        publication_id -> if empty string, at random suitable publication is selected
-        mode -> META, DIRECT_CONTENT, FULL
-        metadata_dict_example = {'pmd:TSO': 'ELERING', 'pmd:timeHorizon': '1D'}
-        """
-        # Get available publications
-        available_publications = self.publication_list()['sm:PublicationsSubscriptionListResult']['sm:part'][0]['opdm:PublicationsList']['opdm:Publication']
-
-        object_types = {item['opde:messageType']["@v"].split("-")[-1]: item['opde:publicationID']["@v"] for item in available_publications}
+        object_types = self.catalogue.object_types
 
         if object_type not in object_types.keys():
             logger.warning(f"ObjectType '{object_type}' not supported, supported types are: {object_types}")
@@ -500,7 +1011,7 @@ class Client:
         if publication_id == "":
             publication_id = object_types[object_type]
 
-        publications_ids = [item['opde:publicationID']["@v"] for item in available_publications]
+        publications_ids = self.catalogue.publication_ids
         if publication_id not in publications_ids:
             logger.error(f"Publication '{publication_id}' not supported, supported modes are: {publications_ids}")
             return None
@@ -513,33 +1024,297 @@ class Client:
         if metadata_dict:
             create_subscription = add_xml_elements(create_subscription, ".//opdm:OPDMObject", metadata_dict)
 
+        return create_subscription
+
+    def publication_subscribe(self, object_type="BDS", subscription_id="", publication_id="", mode="DIRECT_CONTENT", metadata_dict=None, raw_response=False):
+        """
+        Set up subscription for data models. By default sets up subscription for BDS
+
+        objec_type -> IGM, CGM, BDS
+        subscription_id -> if empty string, uuid4 is assigned as id
+        publication_id -> if empty string, at random suitable publication is selected
+        mode -> META, DIRECT_CONTENT, FULL
+        metadata_dict_example = {'pmd:TSO': 'ELERING', 'pmd:timeHorizon': '1D'}
+
+        Available publications are taken from the client catalogue, that is refreshed when older than catalogue_ttl
+        """
+
+        create_subscription = self._create_subscription_operation(object_type, subscription_id, publication_id, mode, metadata_dict)
+
+        if create_subscription is None:
+            return None
+
         return self.execute_operation(create_subscription)
 
+    def subscribe_many(self, subscriptions, workers=8):
+        """
+        Set up multiple subscriptions concurrently, all are validated against one publication catalogue fetch
+
+        subscriptions -> list of publication_subscribe arguments as dictionaries
+        subscriptions_example = [{"object_type": "IGM", "subscription_id": "IGM-1D", "metadata_dict": {'pmd:timeHorizon': '1D'}},
+                                 {"object_type": "BDS", "subscription_id": "BDS"}]
+
+        Returns list of outcomes in the same order as subscriptions
+        outcome_example = {"subscription": {...}, "ok": True, "response": {...}, "error": None}
+        """
+
+        outcomes = []
+        operations = []
+
+        for subscription in subscriptions:
+            outcome = {"subscription": subscription, "ok": False, "response": None, "error": None}
+            outcomes.append(outcome)
+
+            try:
+                create_subscription = self._create_subscription_operation(**subscription)
+            except TypeError as error:
+                outcome["error"] = str(error)
+                continue
+
+            if create_subscription is None:
+                outcome["error"] = "Subscription not valid for available publications"
+                continue
+
+            operations.append((outcome, create_subscription))
+
+        def create(item):
+            outcome, create_subscription = item
+
+            try:
+                outcome["response"] = self.execute_operation(create_subscription)
+                outcome["ok"] = True
+            except Exception as error:
+                logger.error(f"Subscription {outcome['subscription']} failed -> {error}")
+                outcome["error"] = str(error)
+
+        if operations:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(create, operations))
+
+        return outcomes
+
+    def publication_start_subscription(self, subscription_id):
+        """Start subscription by subscription ID"""
+
+        logger.debug(f"Starting subscription with ID -> {subscription_id}")
+
+        return self.execute_operation(self.Operations.StartSubscription.format(subscription_id=subscription_id))
+
+    def publication_stop_subscription(self, subscription_id):
+        """Stop subscription by subscription ID"""
+
+        logger.debug(f"Stopping subscription with ID -> {subscription_id}")
+
+        return self.execute_operation(self.Operations.StopSubscription.format(subscription_id=subscription_id))
+
+    def publication_delete_subscription(self, subscription_id):
+        """Delete subscription by subscription ID, subscription should be stopped first"""
+
+        logger.debug(f"Deleting subscription with ID -> {subscription_id}")
+
+        return self.execute_operation(self.Operations.DeleteSubscription.format(subscription_id=subscription_id))
+
     def publication_cancel_subscription(self, subscription_id):
         """Cancel subscription by subscription ID"""
 
         logger.debug(f"Cancelling subscription with ID -> {subscription_id}")
 
-        stop_response = self.execute_operation(self.Operations.StopSubscription.format(subscription_id=subscription_id))
-        delete_response = self.execute_operation(self.Operations.DeleteSubscription.format(subscription_id=subscription_id))
+        stop_response = self.publication_stop_subscription(subscription_id)
+        delete_response = self.publication_delete_subscription(subscription_id)
 
         return delete_response
 
+    def cancel_subscriptions(self, subscription_status="ALL", pattern=None, subscription_ids=None, workers=8):
+        """
+        Cancel multiple subscriptions concurrently, each subscription is stopped (if active) and deleted
+
+        subscription_status -> only subscriptions with this status, see subscription_list()
+        pattern -> only subscription ID-s matching wildcard pattern, for example "IGM-*"
+        subscription_ids -> only subscriptions with these ID-s
+
+        Returns consolidated report
+        report_example = {"matched": 2, "cancelled": ["IGM-1D", "IGM-2D"], "failed": [{"subscription_id": "IGM-YR", "step": "delete", "error": "..."}], "duration": 1.2}
+        """
+
+        start = time.monotonic()
+
+        response = self.subscription_list(subscription_status)
+        if response is None:
+            return None
+
+        subscriptions = [item for item in parse_subscriptions(response) if item["status"] != "DELETED"]
+
+        if pattern is not None:
+            subscriptions = [item for item in subscriptions if fnmatch.fnmatchcase(item["subscription_id"] or "", pattern)]
+
+        if subscription_ids is not None:
+            subscriptions = [item for item in subscriptions if item["subscription_id"] in subscription_ids]
+
+        report = {"matched": len(subscriptions), "cancelled": [], "failed": [], "duration": None}
+
+        def cancel(subscription):
+            subscription_id = subscription["subscription_id"]
+            steps = ["stop", "delete"] if subscription["status"] in ("SUBSCRIBED", "PENDING") else ["delete"]
+
+            for step in steps:
+                try:
+                    if step == "stop":
+                        self.publication_stop_subscription(subscription_id)
+                    else:
+                        self.publication_delete_subscription(subscription_id)
+
+                except Exception as error:
+                    logger.error(f"Cancelling subscription {subscription_id} failed on {step} -> {error}")
+                    return {"subscription_id": subscription_id, "step": step, "error": str(error)}
+
+            return None
+
+        if subscriptions:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for subscription, failure in zip(subscriptions, executor.map(cancel, subscriptions)):
+                    if failure is None:
+                        report["cancelled"].append(subscription["subscription_id"])
+                    else:
+                        report["failed"].append(failure)
+
+        report["duration"] = time.monotonic() - start
+        logger.info(f"Cancelled {len(report['cancelled'])} of {report['matched']} subscriptions")
+
+        return report
+
     def get_installed_ruleset_version(self):
         """Returns a string with the latest ruleset version"""
-        return self.ruleset_client.service.GetInstalledRuleSetVersion()
+        with self._observe("GetInstalledRuleSetVersion"):
+            return self.ruleset_client.service.GetInstalledRuleSetVersion()
 
     def list_available_rulesets(self):
         """Returns a list of available rulesets"""
-        return self.ruleset_client.service.ListAvailableRuleSets()
+        with self._observe("ListAvailableRuleSets"):
+            return self.ruleset_client.service.ListAvailableRuleSets()
 
     def install_ruleset(self, version=None):
         """Install ruleset library by providing the library version as a string. To get available ruleset libraries use list_available_rulesets()"""
-        return self.ruleset_client.service.Install(Version=version)
+        self._installed_ruleset_version = None
+        with self._observe("Install", version=version):
+            return self.ruleset_client.service.Install(Version=version)
 
     def reset_ruleset(self):
         """Reset ruleset library"""
-        return self.ruleset_client.service.Reset()
+        self._installed_ruleset_version = None
+        with self._observe("Reset"):
+            return self.ruleset_client.service.Reset()
+
+    def ensure_latest_ruleset(self, official_nodes, deadline=300, poll_interval=2, max_poll_interval=30, max_age=0):
+        """
+        Install the latest ruleset library published by official nodes, if it is not installed already
+
+        official_nodes -> list of EIC codes of OPDM clients responsible for providing Ruleset Library (RSL)
+        deadline -> seconds to wait for downloaded ruleset to become available for installation
+        poll_interval, max_poll_interval -> availability is checked with growing interval between these values
+        max_age -> seconds, if the ruleset was confirmed current within this time no calls are made at all
+
+        Returns result with timing of each phase in seconds
+        result_example = {"latest": "2.0.122", "installed": "2.0.122", "action": "installed",  # "none", "installed" or "failed"
+                          "error": None, "timings": {"query": 0.5, "download": 2.1, "availability_wait": 8.0, "install": 12.3}}
+        """
+
+        result = {"latest": None, "installed": self._installed_ruleset_version, "action": "none", "error": None, "timings": {}}
+
+        if max_age and self._ruleset_checked is not None and time.monotonic() - self._ruleset_checked < max_age:
+            logger.debug("Ruleset checked recently, skipping")
+            result["latest"] = self._installed_ruleset_version
+            return result
+
+        def failed(message):
+            logger.error(message)
+            result["action"] = "failed"
+            result["error"] = message
+            return result
+
+        # Query rulesets from OPDM
+        phase_start = time.monotonic()
+        response = self.query_object("RULESET")
+        result["timings"]["query"] = time.monotonic() - phase_start
+
+        # Remove first part of the response, it is the id of the original query
+        rulesets = [part['opdm:OPDMObject'] for part in as_list(response['sm:QueryResult'].get('sm:part'))[1:] if isinstance(part, dict)]
+        rulesets = [ruleset for ruleset in rulesets if _ruleset_sender(ruleset) in official_nodes and ruleset.get('pmd:version')]
+
+        if not rulesets:
+            return failed("Query returned no official RULESET, use query ID on SP side and Client Elastic/Kibana debugging")
+
+        version_key = lambda ruleset: tuple(int(number) for number in ruleset['pmd:version'].split(".") if number.isdigit())
+        latest = max(rulesets, key=version_key)
+        result["latest"] = latest['pmd:version']
+        logger.info(f"Latest official RSL -> {result['latest']}")
+
+        # Installed version is cached, OPDM client changes it only through this client or manual action
+        if self._installed_ruleset_version is None:
+            try:
+                self._installed_ruleset_version = self.get_installed_ruleset_version()
+            except Exception as error:
+                return failed(f"Could not get currently installed RSL, make sure the OPDM user is with Admin rights -> {error}")
+
+        result["installed"] = self._installed_ruleset_version
+
+        if result["latest"] == result["installed"]:
+            logger.info("Latest RSL already installed")
+            self._ruleset_checked = time.monotonic()
+            return result
+
+        # Download latest ruleset to OPDM client
+        phase_start = time.monotonic()
+        try:
+            self.get_content(latest['opde:Id'], object_type="model")
+        except Exception as error:
+            return failed(f"Could not download RSL {result['latest']} -> {error}")
+        result["timings"]["download"] = time.monotonic() - phase_start
+
+        # Wait until downloaded ruleset is available for installation
+        phase_start = time.monotonic()
+        wait_time = poll_interval
+
+        while True:
+
+            try:
+                available = [ruleset["version"] for ruleset in self.list_available_rulesets() or []]
+            except Exception as error:
+                if not is_transient_error(error):
+                    result["timings"]["availability_wait"] = time.monotonic() - phase_start
+                    return failed(f"Could not list available RSL -> {error}")
+
+                logger.warning(f"Could not list available RSL, checking again in {wait_time}s -> {error}")
+                available = []
+
+            if result["latest"] in available:
+                break
+
+            if time.monotonic() - phase_start + wait_time > deadline:
+                result["timings"]["availability_wait"] = time.monotonic() - phase_start
+                return failed(f"RSL {result['latest']} not available for installation within {deadline}s, check that Elastic Search is well functioning and correctly configured")
+
+            logger.debug(f"RSL {result['latest']} not yet available, checking again in {wait_time}s")
+            time.sleep(wait_time)
+            wait_time = min(max_poll_interval, wait_time * 2)
+
+        result["timings"]["availability_wait"] = time.monotonic() - phase_start
+
+        # Install
+        phase_start = time.monotonic()
+        try:
+            self.install_ruleset(result["latest"])
+        except Exception as error:
+            # Installation might have partially succeeded, do not trust cached version
+            self._installed_ruleset_version = None
+            return failed(f"Could not install RSL, check that OPDM Elastic Search is well functioning and correctly configured -> {error}")
+        result["timings"]["install"] = time.monotonic() - phase_start
+
+        self._installed_ruleset_version = result["installed"] = result["latest"]
+        self._ruleset_checked = time.monotonic()
+        result["action"] = "installed"
+        logger.info(f"RSL {result['latest']} installed")
+
+        return result
 
 
 if __name__ == '__main__':
@@ -1,8 +1,41 @@
-from ._version import get_versions
-__version__ = get_versions()['version']
-del get_versions
-from OPDM.OPDM_SOAP_API import Client
+# Public names are imported on first use (PEP 562), so "import OPDM" and the opdm command start without loading
+# zeep, requests, lxml and other dependencies that are only needed once a client is created
+_LAZY = {"Client": "OPDM.OPDM_SOAP_API",
+         "Prefetcher": "OPDM.prefetch",
+         "build_schedule": "OPDM.prefetch",
+         "PublicationTracker": "OPDM.tracker",
+         "UploadLedger": "OPDM.ledger",
+         "reconcile_subscriptions": "OPDM.reconcile",
+         "plan_subscriptions": "OPDM.reconcile",
+         "format_plan": "OPDM.reconcile",
+         "SubscriptionWatcher": "OPDM.watcher"}
 
 # Deprecated class name
-create_client = Client
+_ALIASES = {"create_client": "Client"}
 
+__all__ = list(_LAZY) + list(_ALIASES) + ["__version__"]
+
+
+def __getattr__(name):
+
+    if name == "__version__":
+        # Static in installed builds, in source checkout computed from git, so only done when asked for
+        from OPDM._version import get_versions
+        value = get_versions()['version']
+
+    elif name in _LAZY or name in _ALIASES:
+        import importlib
+        attribute = _ALIASES.get(name, name)
+        value = getattr(importlib.import_module(_LAZY[attribute]), attribute)
+
+    else:
+        raise AttributeError(f"module 'OPDM' has no attribute '{name}'")
+
+    # Next access does not go through __getattr__
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,5 @@
+import sys
+
+from OPDM.cli import main
+
+sys.exit(main())
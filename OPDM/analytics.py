@@ -0,0 +1,203 @@
+from OPDM.watcher import _timestamp
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Pipeline stages as (name, start timestamp field, end timestamp field), timestamps are set by OPDM on processing of uploaded files
+PIPELINE_STAGES = [
+    ("upload_wait",      "pmd:file-uploaded-time",           "pmd:file-validation-start-time"),
+    ("file_validation",  "pmd:file-validation-start-time",   "pmd:file-validation-end-time"),
+    ("assembly_wait",    "pmd:file-validation-end-time",     "pmd:model-assembly-start-time"),
+    ("model_assembly",   "pmd:model-assembly-start-time",    "pmd:model-assembly-end-time"),
+    ("model_validation", "pmd:model-validation-start-time",  "pmd:model-validation-end-time"),
+    ("submission",       "pmd:model-submission-start-time",  "pmd:model-submission-ack-time"),
+    ("publication_wait", "pmd:model-submission-ack-time",    "pmd:model-publication-start-time"),
+    ("total",            "pmd:file-uploaded-time",           "pmd:model-publication-start-time"),
+]
+
+STAGES = [stage for stage, _, _ in PIPELINE_STAGES]
+
+# First available column is used as TSO
+TSO_COLUMNS = ["pmd:TSO", "pmd:modelPartReference", "pmd:MergingEntity"]
+
+DEFAULT_GROUPING = ("tso", "pmd:timeHorizon", "hour")
+
+
+def _pandas():
+    try:
+        import pandas
+    except ImportError:
+        raise ImportError("OPDM.analytics requires pandas, install it with 'python -m pip install pandas'")
+
+    return pandas
+
+
+def _objects(catalogue):
+    """Accept query response, list of query parts or list of OPDMObject/Profile metadata dictionaries"""
+
+    if isinstance(catalogue, dict) and "sm:QueryResult" in catalogue:
+        # Remove first part of the response, it is the id of the original query
+        catalogue = catalogue["sm:QueryResult"]["sm:part"][1:]
+
+    objects = []
+    for item in catalogue:
+        if not isinstance(item, dict):
+            continue
+        objects.append(item.get("opdm:OPDMObject") or item.get("opdm:Profile") or item)
+
+    return objects
+
+
+def pipeline_frame(catalogue, include_components=True):
+    """
+    Extract pipeline timestamps and grouping columns into DataFrame, one row per object
+
+    catalogue -> query_object/query_profile response, list of its parts or list of metadata dictionaries, or DataFrame of metadata
+    include_components -> timestamps missing on model level are taken from its files (earliest start, latest end)
+    """
+
+    pandas = _pandas()
+
+    if isinstance(catalogue, pandas.DataFrame):
+        frame = catalogue.copy()
+    else:
+        objects = _objects(catalogue)
+        frame = pandas.DataFrame(objects)
+
+        if include_components and "opde:Component" in frame.columns:
+            components = frame["opde:Component"].apply(_component_times)
+            component_times = pandas.DataFrame(list(components), index=frame.index)
+
+            for column in component_times.columns:
+                if column in frame.columns:
+                    frame[column] = frame[column].fillna(component_times[column])
+                else:
+                    frame[column] = component_times[column]
+
+    time_columns = sorted({field for _, start, end in PIPELINE_STAGES for field in (start, end)})
+
+    for column in time_columns:
+        if column in frame.columns:
+            frame[column] = pandas.to_datetime(frame[column], utc=True, errors="coerce", format="ISO8601")
+        else:
+            frame[column] = pandas.NaT
+
+    frame["tso"] = None
+    for column in reversed(TSO_COLUMNS):
+        if column in frame.columns:
+            frame["tso"] = frame[column].where(frame[column].notna(), frame["tso"])
+
+    if "pmd:timeHorizon" not in frame.columns:
+        frame["pmd:timeHorizon"] = None
+
+    scenario = pandas.to_datetime(frame.get("pmd:scenarioDate"), utc=True, errors="coerce", format="ISO8601")
+    frame["hour"] = scenario.dt.hour if scenario is not None else None
+
+    return frame
+
+
+def _component_times(components):
+    """Earliest start and latest end timestamp of files, values are compared as timestamps and returned as they are"""
+
+    if not isinstance(components, list):
+        components = [components] if isinstance(components, dict) else []
+
+    times = {}
+    for component in components:
+        profile = component.get("opdm:Profile", component) if isinstance(component, dict) else {}
+
+        for key, value in profile.items():
+            if not key.endswith("-time") or not isinstance(value, str):
+                continue
+
+            # Offsets, Z and fractional seconds differ between files, so strings do not compare in time order
+            timestamp = _timestamp(value)
+            if timestamp is None:
+                continue
+
+            earliest = key.endswith("start-time") or key.endswith("uploaded-time")
+
+            if key not in times or (timestamp < times[key][0] if earliest else timestamp > times[key][0]):
+                times[key] = (timestamp, value)
+
+    return {key: value for key, (_, value) in times.items()}
+
+
+def stage_durations(frame):
+    """Add duration in seconds of each pipeline stage as column, computed vectorized over the frame"""
+
+    frame = frame.copy()
+
+    for stage, start, end in PIPELINE_STAGES:
+        frame[stage] = (frame[end] - frame[start]).dt.total_seconds()
+
+    return frame
+
+
+def stage_percentiles(durations, by=DEFAULT_GROUPING, percentiles=(0.5, 0.9, 0.95, 0.99)):
+    """Percentiles of stage durations per group, columns are (stage, percentile) and count of objects per group"""
+
+    pandas = _pandas()
+    by = list(by)
+
+    grouped = durations.groupby(by, dropna=False)[STAGES]
+
+    statistics = grouped.quantile(list(percentiles)).unstack(level=-1)
+    statistics.columns = pandas.MultiIndex.from_tuples([(stage, f"p{int(percentile * 100)}") for stage, percentile in statistics.columns])
+    statistics[("count", "")] = grouped.size()
+
+    return statistics
+
+
+def flag_regressions(current, baseline, percentile="p90", threshold=1.25, min_count=5):
+    """
+    Compare two stage_percentiles() tables, returns rows of (group, stage) where current percentile exceeds baseline by threshold factor
+
+    min_count -> groups with less objects in either table are ignored
+    """
+
+    pandas = _pandas()
+    rows = []
+
+    common = current.index.intersection(baseline.index)
+
+    for stage in STAGES:
+        if (stage, percentile) not in current.columns or (stage, percentile) not in baseline.columns:
+            continue
+
+        current_values = current.loc[common, (stage, percentile)]
+        baseline_values = baseline.loc[common, (stage, percentile)]
+        enough = (current.loc[common, ("count", "")] >= min_count) & (baseline.loc[common, ("count", "")] >= min_count)
+        regressed = enough & (current_values > baseline_values * threshold)
+
+        for group in common[regressed.values]:
+            rows.append({"group": group,
+                         "stage": stage,
+                         "baseline": baseline_values[group],
+                         "current": current_values[group],
+                         "ratio": current_values[group] / baseline_values[group] if baseline_values[group] else float("inf")})
+
+    return pandas.DataFrame(rows, columns=["group", "stage", "baseline", "current", "ratio"])
+
+
+def pipeline_report(catalogue, baseline=None, by=DEFAULT_GROUPING, percentiles=(0.5, 0.9, 0.95, 0.99), threshold=1.25):
+    """
+    Stage duration percentiles by TSO, time horizon and scenario hour from cached metadata in one call
+
+    baseline -> catalogue of earlier period, if given regressed stages are flagged
+
+    Returns {"durations": DataFrame, "percentiles": DataFrame, "regressions": DataFrame or None}
+    """
+
+    durations = stage_durations(pipeline_frame(catalogue))
+    statistics = stage_percentiles(durations, by=by, percentiles=percentiles)
+
+    regressions = None
+    if baseline is not None:
+        baseline_statistics = stage_percentiles(stage_durations(pipeline_frame(baseline)), by=by, percentiles=percentiles)
+        regressions = flag_regressions(statistics, baseline_statistics, threshold=threshold)
+
+        if len(regressions):
+            logger.warning(f"{len(regressions)} pipeline stage regressions found")
+
+    return {"durations": durations, "percentiles": statistics, "regressions": regressions}
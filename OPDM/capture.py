@@ -0,0 +1,250 @@
+import os
+import json
+import random
+import threading
+from collections import deque
+from datetime import datetime, timezone
+
+from OPDM.cassette import redact
+
+import logging
+logger = logging.getLogger(__name__)
+
+_SECRET_HEADERS = ("authorization", "proxy-authorization", "cookie", "set-cookie")
+
+
+def _body(content, max_body_bytes):
+    """Keep at most max_body_bytes of message body, streamed bodies are not kept"""
+
+    if content is None:
+        return None, 0
+
+    if isinstance(content, str):
+        content = content.encode("UTF-8")
+
+    return bytes(content[:max_body_bytes]), len(content)
+
+
+def _request_body(content, max_body_bytes):
+    """Same as _body, with WS-Security password and nonce redacted"""
+
+    if content is None:
+        return None, 0
+
+    if isinstance(content, str):
+        content = content.encode("UTF-8")
+
+    # Credentials are short, redacting a bit more than is kept covers the ones cut at the end
+    text = redact(bytes(content[:max_body_bytes + 1024]).decode("UTF-8", errors="replace"))
+
+    return text.encode("UTF-8")[:max_body_bytes], len(content)
+
+
+def _headers(headers):
+    """Headers with credential values replaced"""
+
+    if headers is None:
+        return None
+
+    return {name: "REDACTED" if name.lower() in _SECRET_HEADERS else value for name, value in dict(headers).items()}
+
+
+def _text(body, size):
+
+    if body is None:
+        return None
+
+    text = body.decode("UTF-8", errors="replace")
+
+    if size > len(body):
+        text += f"... [truncated, {size - len(body)} of {size} bytes not captured]"
+
+    return text
+
+
+class CaptureBuffer:
+    """
+    Keep last SOAP exchanges in memory for debugging, bodies are truncated and only formatted when read or dumped.
+    WS-Security password and nonce and credential headers are redacted before exchanges are kept.
+
+    size -> maximum number of exchanges kept
+    max_body_bytes -> request and response bodies are cut to this size
+    max_total_bytes -> oldest exchanges are dropped when captured bodies exceed this size
+    sample_rate -> share of successful exchanges captured, failed exchanges are always captured
+    errors_only -> capture only failed exchanges
+    dump_path -> JSON lines file used by dump(), rotated when it grows over max_dump_bytes, keeping backups older files
+    dump_on_error -> dump the buffer when an operation fails
+
+    service = OPDM.Client(server, capture=OPDM.capture.CaptureBuffer(sample_rate=0.01, dump_path="opdm_capture.jsonl", dump_on_error=True))
+    print(service.capture.format())
+    """
+
+    def __init__(self, size=100, max_body_bytes=64 * 1024, max_total_bytes=16 * 1024 * 1024, sample_rate=1.0, errors_only=False,
+                 dump_path=None, max_dump_bytes=10 * 1024 * 1024, backups=3, dump_on_error=False):
+
+        self.size = size
+        self.max_body_bytes = max_body_bytes
+        self.max_total_bytes = max_total_bytes
+        self.sample_rate = sample_rate
+        self.errors_only = errors_only
+        self.dump_path = dump_path
+        self.max_dump_bytes = max_dump_bytes
+        self.backups = backups
+        self.dump_on_error = dump_on_error
+
+        self.captured = 0
+        self.dropped = 0
+
+        self._entries = deque()
+        self._total_bytes = 0
+        self._sequence = 0
+        self._dumped_sequence = 0
+        self._lock = threading.Lock()
+        self._dump_lock = threading.Lock()
+
+    def start(self, exchange):
+        pass
+
+    def finish(self, exchange):
+
+        if exchange["kind"] != "client":
+            return
+
+        failed = exchange["error"] is not None or (exchange["status_code"] or 0) >= 400
+
+        if not failed and (self.errors_only or random.random() >= self.sample_rate):
+            return
+
+        request, request_size = _request_body(exchange["request"], self.max_body_bytes)
+        response, response_size = _body(exchange["response"], self.max_body_bytes)
+
+        entry = {"time": datetime.now(timezone.utc),
+                 "operation": exchange["operation"],
+                 "attributes": exchange["attributes"],
+                 "duration": exchange["end"] - exchange["start"],
+                 "status_code": exchange["status_code"],
+                 "error": exchange["error"],
+                 "request_headers": _headers(exchange["request_headers"]),
+                 "response_headers": _headers(exchange["response_headers"]),
+                 "request": request,
+                 "request_size": request_size or exchange["request_bytes"],
+                 "response": response,
+                 "response_size": response_size}
+
+        entry_bytes = len(request or b"") + len(response or b"")
+
+        with self._lock:
+            self._sequence += 1
+            entry["sequence"] = self._sequence
+            entry["bytes"] = entry_bytes
+
+            self._entries.append(entry)
+            self._total_bytes += entry_bytes
+            self.captured += 1
+
+            while len(self._entries) > self.size or (self._total_bytes > self.max_total_bytes and len(self._entries) > 1):
+                self._total_bytes -= self._entries.popleft()["bytes"]
+                self.dropped += 1
+
+        if failed and self.dump_on_error and self.dump_path:
+            try:
+                self.dump()
+            except OSError as error:
+                logger.error(f"Capture dump to {self.dump_path} failed -> {error}")
+
+    def entries(self):
+        """Captured exchanges as JSON serializable dictionaries, oldest first"""
+
+        with self._lock:
+            entries = list(self._entries)
+
+        return [self._serialize(entry) for entry in entries]
+
+    @staticmethod
+    def _serialize(entry):
+
+        return {"sequence": entry["sequence"],
+                "time": entry["time"].isoformat(),
+                "operation": entry["operation"],
+                "attributes": {key: str(value) for key, value in entry["attributes"].items()},
+                "duration": round(entry["duration"], 6),
+                "status_code": entry["status_code"],
+                "error": f"{type(entry['error']).__name__}: {entry['error']}" if entry["error"] is not None else None,
+                "request_headers": dict(entry["request_headers"] or {}),
+                "response_headers": dict(entry["response_headers"] or {}),
+                "request": _text(entry["request"], entry["request_size"]) if entry["request"] is not None else f"[streamed, {entry['request_size']} bytes]",
+                "response": _text(entry["response"], entry["response_size"])}
+
+    def last(self):
+        """Last captured exchange or None"""
+
+        with self._lock:
+            entry = self._entries[-1] if self._entries else None
+
+        return self._serialize(entry) if entry else None
+
+    def format(self, entries=None):
+        """Human readable text of captured exchanges"""
+
+        lines = []
+        for entry in entries if entries is not None else self.entries():
+            lines.append("-" * 50)
+            lines.append(f"{entry['time']} {entry['operation']} status={entry['status_code']} duration={entry['duration']}s error={entry['error']}")
+
+            for direction in ("request", "response"):
+                lines.append(f"### {direction.upper()} HTTP HEADER ###")
+                lines.append(str(entry[f"{direction}_headers"]))
+                lines.append(f"### {direction.upper()} BODY ###")
+                lines.append(str(entry[direction]))
+
+        return "\n".join(lines)
+
+    def clear(self):
+
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def _rotate(self):
+
+        if not os.path.exists(self.dump_path) or os.path.getsize(self.dump_path) < self.max_dump_bytes:
+            return
+
+        for number in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.dump_path}.{number}"):
+                os.replace(f"{self.dump_path}.{number}", f"{self.dump_path}.{number + 1}")
+
+        if self.backups > 0:
+            os.replace(self.dump_path, f"{self.dump_path}.1")
+        else:
+            os.remove(self.dump_path)
+
+    def dump(self, path=None):
+        """Append exchanges not dumped yet to path or dump_path as JSON lines, returns number of written exchanges"""
+
+        if path is None:
+            path = self.dump_path
+
+        if path is None:
+            logger.warning("No dump path given for capture buffer")
+            return 0
+
+        with self._lock:
+            entries = [entry for entry in self._entries if entry["sequence"] > self._dumped_sequence]
+            if entries:
+                self._dumped_sequence = entries[-1]["sequence"]
+
+        if not entries:
+            return 0
+
+        with self._dump_lock:
+            if path == self.dump_path:
+                self._rotate()
+
+            with open(path, "a", encoding="utf-8") as file_object:
+                for entry in entries:
+                    file_object.write(json.dumps(self._serialize(entry)) + "\n")
+
+        logger.info(f"Dumped {len(entries)} captured exchanges to {path}")
+
+        return len(entries)
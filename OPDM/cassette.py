@@ -0,0 +1,255 @@
+"""
+Record HTTP exchanges of OPDM client (WSDL, SOAP requests and responses with timing) to cassette file and replay them offline
+
+    service = Client(server, username, password, cassette="production.jsonl.gz")           # records, replays when file exists
+    service = Client(server, cassette=Cassette("production.jsonl.gz", timing=True))       # replays with recorded response times
+
+Cassette is JSON lines file (gzip compressed when path ends with .gz), one exchange per line
+    method, url, soap_action, operation -> used to find response on replay
+    status_code, reason, headers, response -> recorded response, response body is base64 encoded
+    request, request_bytes, response_bytes -> request body (when smaller than max_request_bytes, WS-Security password and nonce redacted) and sizes
+    offset, elapsed -> seconds from start of recording to request and from request to complete response
+
+Responses are replayed in recorded order per method, url, SOAP action and operation name (QueryObject, GetContent...),
+so replayed requests may come in different order than recorded ones as long as the order per operation is the same.
+"""
+import io
+import gzip
+import json
+import re
+import base64
+import binascii
+import threading
+from time import perf_counter, sleep
+from datetime import timedelta
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from OPDM.transport import current_exchange
+
+import logging
+logger = logging.getLogger(__name__)
+
+MODES = ("once", "record", "replay")
+
+# SOAP operation in envelope body and OPDM operation in base64 encoded ExecuteOperation payload
+SOAP_OPERATION = re.compile(rb"<(?:[\w.-]+:)?Body[^>]*>\s*<(?:[\w.-]+:)?([\w.-]+)")
+PAYLOAD = re.compile(rb"<(?:[\w.-]+:)?payload>\s*([A-Za-z0-9+/]{16})")
+OPERATION_NAME = re.compile(rb"<(?:[\w.-]+:)?([A-Za-z][\w.-]*)")
+
+# WS-Security credentials are not stored in cassette
+CREDENTIALS = re.compile(r"(<((?:[\w.-]+:)?(?:Password|Nonce))\b[^>]*>).*?(</\2>)", re.DOTALL)
+
+# Body of recorded response is already decoded by requests
+_DROPPED_HEADERS = ("content-encoding", "transfer-encoding", "content-length")
+
+
+def _open(path, mode):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class Cassette:
+    """
+    Recorded exchanges of one cassette file
+
+    mode -> "record" overwrites the file, "replay" only replays and never connects to server, "once" replays when file exists, otherwise records
+    timing -> on replay wait for recorded response time, True or speed factor (2.0 waits twice as long, 0.5 half)
+    strict -> on replay raise LookupError when there is no recorded response left for request, by default recorded responses are reused from the start
+    max_request_bytes -> larger request bodies (uploads) are not stored, only their size
+    """
+
+    def __init__(self, path, mode="once", timing=False, strict=False, max_request_bytes=64 * 1024):
+
+        if mode not in MODES:
+            raise ValueError(f"Unsupported mode '{mode}', choose from {MODES}")
+
+        if mode == "once":
+            try:
+                with open(path, "rb"):
+                    mode = "replay"
+            except FileNotFoundError:
+                mode = "record"
+
+        self.path = path
+        self.mode = mode
+        self.timing = float(timing)
+        self.strict = strict
+        self.max_request_bytes = max_request_bytes
+
+        self.entries = []
+        self._positions = {}
+        self._lock = threading.Lock()
+        self._start = perf_counter()
+
+        if mode == "record":
+            # Truncate, entries are appended as they are recorded
+            with _open(path, "wt"):
+                pass
+        else:
+            with _open(path, "rt") as file_object:
+                self.entries = [json.loads(line) for line in file_object if line.strip()]
+            logger.info(f"Loaded {len(self.entries)} exchanges from {path}")
+
+    @property
+    def recording(self):
+        return self.mode == "record"
+
+    def record(self, entry):
+        """Append exchange to the cassette file"""
+
+        entry["offset"] = entry.pop("started") - self._start
+
+        with self._lock:
+            self.entries.append(entry)
+            with _open(self.path, "at") as file_object:
+                file_object.write(json.dumps(entry) + "\n")
+
+    def find(self, method, url, soap_action, operation):
+        """Next recorded exchange for the request, or None"""
+
+        key = (method, url, soap_action, operation)
+
+        with self._lock:
+            candidates = [entry for entry in self.entries if _key(entry) == key]
+            position = self._positions.get(key, 0)
+
+            if candidates and position >= len(candidates):
+                if self.strict:
+                    raise LookupError(f"All {len(candidates)} recorded responses for {method} {url} {operation or ''} are used")
+                position = 0
+
+            if candidates:
+                self._positions[key] = position + 1
+                return candidates[position]
+
+        if self.strict:
+            raise LookupError(f"No recorded response for {method} {url} {operation or ''}")
+
+        return None
+
+
+def request_operation(request):
+    """Name of OPDM operation of the request, from the exchange observed in current thread or from the request body"""
+
+    exchange = current_exchange()
+    if exchange is not None:
+        return exchange["operation"]
+
+    body = request.body.encode() if isinstance(request.body, str) else request.body
+    if not isinstance(body, bytes):
+        return None
+
+    operation = SOAP_OPERATION.search(body)
+    if operation is None:
+        return None
+
+    payload = PAYLOAD.search(body, operation.end())
+    if operation.group(1) == b"ExecuteOperation" and payload is not None:
+        # Beginning of payload is enough for the root element name
+        start = body.index(payload.group(1), payload.start())
+        try:
+            name = OPERATION_NAME.search(base64.b64decode(re.sub(rb"\s", b"", body[start:start + 1024])[:1020]))
+        except binascii.Error:
+            name = None
+        if name is not None:
+            return name.group(1).decode()
+
+    return operation.group(1).decode()
+
+
+def redact(body):
+    """Request body with WS-Security password and nonce replaced"""
+    return CREDENTIALS.sub(r"\1REDACTED\3", body)
+
+
+def _key(entry):
+    return entry["method"], entry["url"], entry["soap_action"], entry["operation"]
+
+
+class CassetteAdapter(HTTPAdapter):
+    """requests adapter that records exchanges to cassette or replays them from it, mount it to client session"""
+
+    def __init__(self, cassette, **kwargs):
+        self.cassette = cassette
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+
+        operation = request_operation(request)
+        soap_action = request.headers.get("SOAPAction")
+
+        if self.cassette.recording:
+            return self._record(request, soap_action, operation, **kwargs)
+
+        entry = self.cassette.find(request.method, request.url, soap_action, operation)
+
+        if entry is None:
+            logger.error(f"No recorded response for {request.method} {request.url} {operation or ''} in {self.cassette.path}")
+            return self._response(request, {"status_code": 404, "reason": "No recorded response", "headers": {}, "response": "", "elapsed": 0})
+
+        if self.cassette.timing:
+            sleep(entry["elapsed"] * self.cassette.timing)
+
+        return self._response(request, entry)
+
+    def _record(self, request, soap_action, operation, **kwargs):
+
+        entry = {"method": request.method,
+                 "url": request.url,
+                 "soap_action": soap_action,
+                 "operation": operation,
+                 "request": None,
+                 "request_bytes": 0,
+                 "started": perf_counter()}
+
+        if isinstance(request.body, (bytes, str)):
+            body = request.body.encode() if isinstance(request.body, str) else request.body
+            entry["request_bytes"] = len(body)
+            if len(body) <= self.cassette.max_request_bytes:
+                entry["request"] = redact(body.decode("utf-8", errors="replace"))
+
+        elif request.body is not None:
+            request.body = self._count(request.body, entry)
+
+        response = super().send(request, **kwargs)
+        content = response.content
+
+        entry["elapsed"] = perf_counter() - entry["started"]
+        entry["status_code"] = response.status_code
+        entry["reason"] = response.reason
+        entry["headers"] = {name: value for name, value in response.headers.items() if name.lower() not in _DROPPED_HEADERS}
+        entry["response_bytes"] = len(content)
+        entry["response"] = base64.b64encode(content).decode()
+
+        self.cassette.record(entry)
+
+        return response
+
+    @staticmethod
+    def _count(chunks, entry):
+        """Count bytes of streamed request body"""
+
+        for chunk in chunks:
+            entry["request_bytes"] += len(chunk)
+            yield chunk
+
+    @staticmethod
+    def _response(request, entry):
+
+        response = Response()
+        response.status_code = entry["status_code"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = base64.b64decode(entry["response"])
+        response.raw = io.BytesIO(response._content)
+        response.elapsed = timedelta(seconds=entry["elapsed"])
+        response.url = request.url
+        response.request = request
+        response.reason = entry.get("reason")
+
+        return response
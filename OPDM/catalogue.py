@@ -0,0 +1,67 @@
+import time
+import threading
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class PublicationCatalogue:
+    """
+    Cached list of available publications, refreshed from OPDM when older than ttl seconds
+
+    catalogue = PublicationCatalogue(service, ttl=300)
+    catalogue.object_types      # {"IGM": "<publication id>", "BDS": "<publication id>", ...}
+    catalogue.publication_ids   # ["<publication id>", ...]
+    """
+
+    def __init__(self, service, ttl=300):
+
+        self.service = service
+        self.ttl = ttl
+
+        self._publications = None
+        self._object_types = None
+        self._publication_ids = None
+        self._updated = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Fetch publications from OPDM"""
+
+        response = self.service.publication_list()
+        publications = response['sm:PublicationsSubscriptionListResult']['sm:part'][0]['opdm:PublicationsList']['opdm:Publication']
+
+        # Single publication is not returned as list
+        if isinstance(publications, dict):
+            publications = [publications]
+
+        self._publications = publications
+        self._object_types = {item['opde:messageType']["@v"].split("-")[-1]: item['opde:publicationID']["@v"] for item in publications}
+        self._publication_ids = [item['opde:publicationID']["@v"] for item in publications]
+        self._updated = time.monotonic()
+
+        logger.debug(f"Publication catalogue refreshed, {len(publications)} publications available")
+
+    def invalidate(self):
+        with self._lock:
+            self._updated = None
+
+    def _ensure_fresh(self):
+        with self._lock:
+            if self._updated is None or time.monotonic() - self._updated > self.ttl:
+                self.refresh()
+
+    @property
+    def publications(self):
+        self._ensure_fresh()
+        return self._publications
+
+    @property
+    def object_types(self):
+        self._ensure_fresh()
+        return self._object_types
+
+    @property
+    def publication_ids(self):
+        self._ensure_fresh()
+        return self._publication_ids
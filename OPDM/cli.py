@@ -0,0 +1,458 @@
+"""
+Command line tool for OPDM client, connection is taken from options or OPDM_SERVER, OPDM_USERNAME and OPDM_PASSWORD environment variables
+
+    opdm query IGM --filter pmd:timeHorizon=1D --filter "pmd:scenarioDate is after=2024-01-01T00:00:00" --output models.csv
+    opdm download --query IGM --filter pmd:timeHorizon=1D --output_dir models --workers 8
+    opdm download <profile id> <profile id> --output_dir models
+    opdm upload "C:/IGM/*.zip" --workers 4 --stream
+    opdm subscribe subscriptions.json --prune --dry_run
+    opdm report --filename 20190712T0930Z_1D_ELERING_EQ_001.zip --output report.csv
+    opdm ruleset ensure --nodes 10V1001C--002430 10V1001C--002422
+
+Same as python -m OPDM
+"""
+import os
+import sys
+import csv
+import glob
+import json
+import time
+import base64
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import logging
+logger = logging.getLogger(__name__)
+
+QUERY_COLUMNS = ["opde:Id", "opde:Object-Type", "pmd:fileName", "pmd:modelPartReference", "pmd:timeHorizon", "pmd:scenarioDate", "pmd:version"]
+
+
+def parse_filter(text):
+    """
+    Metadata filter from command line to query_object metadata_dict item
+
+    "pmd:timeHorizon=1D" -> ("pmd:timeHorizon", "1D")
+    "pmd:scenarioDate is after=2024-01-01T00:00:00" -> ("pmd:scenarioDate", {"operator": "is after", "value": "2024-01-01T00:00:00"})
+    """
+
+    key, separator, value = text.partition("=")
+
+    if not separator:
+        raise argparse.ArgumentTypeError(f"Filter '{text}' must be in form key=value or 'key operator=value'")
+
+    key, _, operator = key.strip().partition(" ")
+
+    if operator:
+        return key, {"operator": operator.strip(), "value": value}
+
+    return key, value
+
+
+def retry(function, retries=2, retry_delay=2, description=""):
+    """Call function, retry on transient errors (connection errors, timeouts, HTTP 429/502/503/504) with doubling delay"""
+
+    from OPDM.OPDM_SOAP_API import is_transient_error
+
+    attempt = 0
+
+    while True:
+        attempt += 1
+
+        try:
+            return function()
+
+        except Exception as error:
+
+            if not is_transient_error(error) or attempt > retries:
+                raise
+
+            wait_time = retry_delay * 2 ** (attempt - 1)
+            logger.warning(f"{description} failed on attempt {attempt}, retrying in {wait_time}s -> {error}")
+            time.sleep(wait_time)
+
+
+def write_rows(rows, output=None, output_format=None, columns=None):
+    """
+    Write list of dictionaries as table to stdout or file
+
+    output_format -> "table", "csv", "json" or "parquet" (needs pandas and pyarrow), by default from output file extension
+    columns -> columns to write, by default all columns with single values (nested metadata is left out)
+    """
+
+    if output_format is None:
+        extension = os.path.splitext(output)[1].lower().lstrip(".") if output else ""
+        output_format = extension if extension in ("csv", "json", "parquet") else "table"
+
+    if columns is None:
+        columns = []
+        for row in rows:
+            columns.extend(key for key, value in row.items() if key not in columns and not isinstance(value, (dict, list)))
+
+    rows = [{column: row.get(column) for column in columns} for row in rows]
+
+    if output_format == "parquet":
+        try:
+            import pandas
+        except ImportError:
+            raise ImportError("Parquet output requires pandas and pyarrow, install them with 'python -m pip install pandas pyarrow'")
+
+        pandas.DataFrame(rows, columns=columns).to_parquet(output)
+        return
+
+    file_object = open(output, "w", newline="", encoding="utf-8") if output else sys.stdout
+
+    try:
+        if output_format == "csv":
+            writer = csv.DictWriter(file_object, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+
+        elif output_format == "json":
+            json.dump(rows, file_object, indent=2, default=str)
+            file_object.write("\n")
+
+        else:
+            text = [[str(column) for column in columns]] + [["" if row[column] is None else str(row[column]) for column in columns] for row in rows]
+            widths = [max(len(line[position]) for line in text) for position in range(len(columns))]
+            for line in text:
+                file_object.write("  ".join(value.ljust(width) for value, width in zip(line, widths)).rstrip() + "\n")
+    finally:
+        if output:
+            file_object.close()
+
+
+def _query_parts(service, arguments, object_type, profiles=False):
+    """Query OPDM objects (or profiles), returns list of metadata dictionaries"""
+
+    from OPDM.OPDM_SOAP_API import as_list
+
+    metadata_dict = dict(arguments.filter or [])
+
+    if profiles:
+        response = retry(lambda: service.query_profile(metadata_dict), arguments.retries, arguments.retry_delay, "Query")
+        element = "opdm:Profile"
+    else:
+        response = retry(lambda: service.query_object(object_type, metadata_dict), arguments.retries, arguments.retry_delay, "Query")
+        element = "opdm:OPDMObject"
+
+    # Remove first part of the response, it is the id of the original query
+    parts = as_list(response["sm:QueryResult"].get("sm:part"))[1:]
+
+    return [part[element] for part in parts if isinstance(part, dict) and element in part]
+
+
+def query(service, arguments):
+
+    rows = _query_parts(service, arguments, arguments.object_type, profiles=arguments.profiles)
+    logger.info(f"Query returned {len(rows)} {'profiles' if arguments.profiles else 'objects'}")
+
+    write_rows(rows, arguments.output, arguments.format, arguments.columns or (None if arguments.all_columns else QUERY_COLUMNS))
+
+    return 0
+
+
+def _file_names(service, arguments, ids, object_type, batch_size=100):
+    """
+    File names of profile (object_type "file") or model ids, queried with one "is one of" filter per batch_size ids
+
+    Returns {id: [file name, ...]}, ids that could not be resolved are left out and downloaded again
+    """
+
+    from OPDM.OPDM_SOAP_API import as_list
+
+    file_names = {}
+
+    for position in range(0, len(ids), batch_size):
+        metadata_dict = {"opde:Id": {"operator": "is one of", "value": ",".join(ids[position:position + batch_size])}}
+
+        try:
+            if object_type == "file":
+                response = retry(lambda: service.query_profile(metadata_dict), arguments.retries, arguments.retry_delay, "Query")
+            else:
+                # Model ids can be of any object type
+                metadata_dict["pmd:Object-Type"] = {"operator": "exist", "value": ""}
+                response = retry(lambda: service.query_object(metadata_dict=metadata_dict), arguments.retries, arguments.retry_delay, "Query")
+        except Exception as error:
+            logger.warning(f"Could not resolve file names, existing files are not skipped -> {error}")
+            continue
+
+        # Remove first part of the response, it is the id of the original query
+        for part in as_list(response["sm:QueryResult"].get("sm:part"))[1:]:
+            if not isinstance(part, dict):
+                continue
+
+            if object_type == "file":
+                profiles = [part.get("opdm:Profile") or {}]
+            else:
+                profiles = [component.get("opdm:Profile") or {} for component in as_list((part.get("opdm:OPDMObject") or {}).get("opde:Component")) if isinstance(component, dict)]
+
+            item = part.get("opdm:Profile" if object_type == "file" else "opdm:OPDMObject") or {}
+            names = [profile.get("pmd:fileName") for profile in profiles]
+
+            if item.get("opde:Id") and names and all(names):
+                file_names[item["opde:Id"]] = names
+
+    return file_names
+
+
+def download(service, arguments):
+
+    from OPDM.OPDM_SOAP_API import as_list
+
+    os.makedirs(arguments.output_dir, exist_ok=True)
+
+    if arguments.query:
+        # Download per profile, so files already downloaded by earlier run are known before the download
+        targets = []
+        for item in _query_parts(service, arguments, arguments.query):
+            for component in as_list(item.get("opde:Component")):
+                profile = component.get("opdm:Profile", {}) if isinstance(component, dict) else {}
+                if profile.get("opde:Id"):
+                    targets.append({"id": profile["opde:Id"], "file_names": [profile["pmd:fileName"]] if profile.get("pmd:fileName") else []})
+        object_type = "file"
+    else:
+        file_names = _file_names(service, arguments, arguments.ids, arguments.object_type)
+        targets = [{"id": content_id, "file_names": file_names.get(content_id, [])} for content_id in arguments.ids]
+        object_type = arguments.object_type
+
+    # Files are written under final name only when complete, so existing file is a finished download
+    def downloaded(target):
+        return bool(target["file_names"]) and all(os.path.exists(os.path.join(arguments.output_dir, file_name)) for file_name in target["file_names"])
+
+    pending = [target for target in targets if arguments.overwrite or not downloaded(target)]
+    logger.info(f"Downloading {len(pending)} of {len(targets)} files to {arguments.output_dir}, {len(targets) - len(pending)} already downloaded")
+
+    def fetch(target):
+
+        result = {"id": target["id"], "files": [], "error": None}
+
+        try:
+            response = retry(lambda: service.get_content(target["id"], return_payload=True, object_type=object_type), arguments.retries, arguments.retry_delay, f"Download of {target['id']}")
+
+            # First part is the return mode, rest are profiles with content
+            for part in as_list(response["sm:GetContentResult"].get("sm:part"))[1:]:
+                profile = part.get("opdm:Profile") if isinstance(part, dict) else None
+                if not profile or not profile.get("opde:Content"):
+                    continue
+
+                path = os.path.join(arguments.output_dir, profile.get("pmd:fileName") or f"{profile.get('opde:Id', target['id'])}.zip")
+
+                # Write to temporary file first, interrupted download is not mistaken for complete file
+                with open(f"{path}.part", "wb") as file_object:
+                    file_object.write(base64.b64decode(profile["opde:Content"]))
+                os.replace(f"{path}.part", path)
+
+                result["files"].append(path)
+                logger.info(f"Saved {path}")
+
+        except Exception as error:
+            logger.error(f"Download of {target['id']} failed -> {error}")
+            result["error"] = str(error)
+
+        return result
+
+    with ThreadPoolExecutor(max_workers=arguments.workers) as executor:
+        results = list(executor.map(fetch, pending))
+
+    failed = [result for result in results if result["error"]]
+    logger.info(f"Downloaded {len(results) - len(failed)} of {len(pending)}, {len(failed)} failed")
+
+    return 1 if failed else 0
+
+
+def upload(service, arguments):
+
+    paths = []
+    for pattern in arguments.paths:
+        paths.extend(sorted(glob.glob(pattern)) or [pattern])
+
+    results = service.publish_many(paths, workers=arguments.workers, retries=arguments.retries, retry_delay=arguments.retry_delay, content_type=arguments.content_type,
+                                   stream=arguments.stream, ledger=arguments.ledger, skip_published=not arguments.no_skip_published)
+
+    for result in results:
+        status = f"skipped ({result['skipped']})" if result["skipped"] else "accepted" if result["accepted"] else f"rejected -> {result['error']}"
+        print(f"{result['path']}: {status}")
+
+    return 0 if all(result["accepted"] for result in results) else 1
+
+
+def subscribe(service, arguments):
+
+    from OPDM.reconcile import reconcile_subscriptions, format_plan
+    from OPDM.OPDM_SOAP_API import parse_subscriptions
+
+    if arguments.list:
+        subscriptions = parse_subscriptions(service.subscription_list())
+        write_rows(subscriptions, arguments.output, arguments.format, ["subscription_id", "object_type", "mode", "status", "publication_id", "metadata_dict"])
+        return 0
+
+    if not arguments.spec:
+        logger.error("Subscription spec file or --list is required")
+        return 2
+
+    with open(arguments.spec, encoding="utf-8") as file_object:
+        spec = json.load(file_object)
+
+    result = reconcile_subscriptions(service, spec, prune=arguments.prune, dry_run=arguments.dry_run, workers=arguments.workers)
+    print(format_plan(result["plan"]))
+
+    for item in result["results"]:
+        if not item["ok"]:
+            print(f"{item['subscription_id']}: failed -> {item['error']}")
+
+    return 0 if all(item["ok"] for item in result["results"]) else 1
+
+
+def report(service, arguments):
+
+    if not arguments.filename and not arguments.model_id:
+        logger.error("--filename or --model_id is required")
+        return 2
+
+    table = retry(lambda: service.get_profile_publication_report(model_id=arguments.model_id or [], filename=arguments.filename or []), arguments.retries, arguments.retry_delay, "Report")
+    columns = list(table)
+    rows = [dict(zip(columns, values)) for values in zip(*table.values())]
+
+    write_rows(rows, arguments.output, arguments.format)
+
+    return 0
+
+
+def ruleset(service, arguments):
+
+    if arguments.action == "installed":
+        print(service.get_installed_ruleset_version())
+
+    elif arguments.action == "available":
+        print(service.list_available_rulesets())
+
+    elif arguments.action == "install":
+        print(service.install_ruleset(arguments.version))
+
+    elif arguments.action == "reset":
+        print(service.reset_ruleset())
+
+    elif arguments.action == "ensure":
+        if not arguments.nodes:
+            logger.error("--nodes or RSL_OFFICIAL_NODES environment variable is required")
+            return 2
+
+        result = service.ensure_latest_ruleset(arguments.nodes, deadline=arguments.deadline)
+        print(json.dumps(result, indent=2, default=str))
+        return 1 if result["action"] == "failed" else 0
+
+    return 0
+
+
+def _output_arguments(parser):
+    parser.add_argument("--output", default=None, help="output file, format from extension (.csv, .json, .parquet), by default table is printed")
+    parser.add_argument("--format", default=None, choices=["table", "csv", "json", "parquet"])
+
+
+def parser():
+
+    main_parser = argparse.ArgumentParser(prog="opdm", description="OPDM client command line tool")
+    main_parser.add_argument("--server", default=os.environ.get("OPDM_SERVER"), help="OPDM client address, default from OPDM_SERVER")
+    main_parser.add_argument("--username", default=os.environ.get("OPDM_USERNAME", ""), help="default from OPDM_USERNAME")
+    main_parser.add_argument("--password", default=os.environ.get("OPDM_PASSWORD", ""), help="default from OPDM_PASSWORD")
+    main_parser.add_argument("--verify", action="store_true", help="verify server certificate")
+    main_parser.add_argument("--retries", type=int, default=2, help="retries on network errors and HTTP 429/502/503/504")
+    main_parser.add_argument("--retry_delay", type=float, default=2, help="seconds before first retry, doubled on every next retry")
+    main_parser.add_argument("--catalogue_ttl", type=float, default=300, help="seconds the list of available publications is cached")
+    main_parser.add_argument("--cassette", default=None, help="record exchanges to file, or replay them when the file exists")
+    main_parser.add_argument("--debug", action="store_true")
+    main_parser.add_argument("--quiet", action="store_true", help="only log warnings and errors")
+
+    commands = main_parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("query", help="query OPDM objects or profiles")
+    command.add_argument("object_type", nargs="?", default="IGM", help="IGM, CGM, BDS, RULESET...")
+    command.add_argument("--filter", action="append", type=parse_filter, help="metadata filter 'key=value' or 'key operator=value', can be repeated")
+    command.add_argument("--profiles", action="store_true", help="query profiles (files) instead of objects")
+    command.add_argument("--columns", nargs="+", default=None)
+    command.add_argument("--all_columns", action="store_true")
+    _output_arguments(command)
+    command.set_defaults(function=query)
+
+    command = commands.add_parser("download", help="download files in parallel, files already in output directory are skipped")
+    command.add_argument("ids", nargs="*", help="profile or model ids")
+    command.add_argument("--object_type", default="file", choices=["file", "model"], help="type of given ids")
+    command.add_argument("--query", default=None, metavar="OBJECT_TYPE", help="download all profiles of objects matching --filter")
+    command.add_argument("--filter", action="append", type=parse_filter, help="metadata filter 'key=value' or 'key operator=value', can be repeated")
+    command.add_argument("--output_dir", default=".")
+    command.add_argument("--workers", type=int, default=4)
+    command.add_argument("--overwrite", action="store_true", help="download also files that exist in output directory")
+    command.set_defaults(function=download)
+
+    command = commands.add_parser("upload", help="upload files in parallel, files already uploaded or on OPDM are skipped")
+    command.add_argument("paths", nargs="+", help="files or glob patterns")
+    command.add_argument("--workers", type=int, default=4)
+    command.add_argument("--stream", action="store_true", help="read and send files in chunks, recommended for large files")
+    command.add_argument("--content_type", default="CGMES")
+    command.add_argument("--ledger", default="opdm_upload_ledger.sqlite", help="file recording accepted uploads")
+    command.add_argument("--no_skip_published", action="store_true", help="do not check which file names already exist on OPDM")
+    command.set_defaults(function=upload)
+
+    command = commands.add_parser("subscribe", help="bring subscriptions to state described in JSON file")
+    command.add_argument("spec", nargs="?", help="JSON list of subscriptions, see OPDM.reconcile_subscriptions")
+    command.add_argument("--list", action="store_true", help="list current subscriptions")
+    command.add_argument("--prune", action="store_true", help="delete subscriptions not in spec")
+    command.add_argument("--dry_run", action="store_true", help="only print needed changes")
+    command.add_argument("--workers", type=int, default=8)
+    _output_arguments(command)
+    command.set_defaults(function=subscribe)
+
+    command = commands.add_parser("report", help="publication report of uploaded files")
+    command.add_argument("--filename", nargs="+", default=None)
+    command.add_argument("--model_id", nargs="+", default=None)
+    _output_arguments(command)
+    command.set_defaults(function=report)
+
+    command = commands.add_parser("ruleset", help="manage ruleset library")
+    command.add_argument("action", choices=["installed", "available", "install", "reset", "ensure"])
+    command.add_argument("--version", default=None, help="version to install, required for install")
+    command.add_argument("--nodes", nargs="+", default=[node for node in os.environ.get("RSL_OFFICIAL_NODES", "").split(",") if node],
+                         help="EIC codes of official ruleset nodes, default from RSL_OFFICIAL_NODES")
+    command.add_argument("--deadline", type=float, default=300, help="seconds to wait for downloaded ruleset to become available")
+    command.set_defaults(function=ruleset)
+
+    return main_parser
+
+
+def main(arguments=None):
+
+    main_parser = parser()
+    arguments = main_parser.parse_args(arguments)
+
+    if not arguments.server:
+        main_parser.error("--server or OPDM_SERVER environment variable is required")
+
+    if arguments.command == "ruleset" and arguments.action == "install" and not arguments.version:
+        main_parser.error("ruleset install requires --version")
+
+    if arguments.command == "download" and not arguments.ids and not arguments.query:
+        main_parser.error("download requires ids or --query")
+
+    logging.basicConfig(format='%(asctime)s | %(name)s | %(levelname)s | %(message)s', level=logging.WARNING if arguments.quiet else logging.INFO, stream=sys.stderr)
+
+    from zeep.exceptions import Fault
+    from OPDM.OPDM_SOAP_API import Client
+
+    service = Client(arguments.server, username=arguments.username, password=arguments.password, debug=arguments.debug, verify=arguments.verify,
+                     catalogue_ttl=arguments.catalogue_ttl, cassette=arguments.cassette)
+
+    try:
+        return arguments.function(service, arguments)
+
+    except Fault as error:
+        logger.error(f"OPDM returned fault -> {' '.join(str(error.message).split())}")
+        return 1
+
+    except BrokenPipeError:
+        # Output piped to command that exited early, for example head
+        sys.stdout = open(os.devnull, "w")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime, timezone
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """SHA-256 of file content, read in chunks"""
+
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as file_object:
+        for chunk in iter(lambda: file_object.read(chunk_size), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+class UploadLedger:
+    """
+    Local record of uploaded files, kept in SQLite database
+
+    Files are identified by absolute path, unchanged size and modification time means the file is the same and is not hashed again.
+    If size or modification time changed, the content hash is compared to previous upload.
+    """
+
+    def __init__(self, path="opdm_upload_ledger.sqlite"):
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+
+        with self._lock, self._connection:
+            self._connection.execute("""CREATE TABLE IF NOT EXISTS uploads (
+                                            path TEXT PRIMARY KEY,
+                                            file_name TEXT,
+                                            size INTEGER,
+                                            mtime REAL,
+                                            hash TEXT,
+                                            accepted INTEGER,
+                                            result TEXT,
+                                            uploaded_at TEXT)""")
+
+    def get(self, path):
+        """Returns ledger entry as dictionary or None"""
+
+        with self._lock:
+            row = self._connection.execute("SELECT path, file_name, size, mtime, hash, accepted, result, uploaded_at FROM uploads WHERE path = ?",
+                                           (os.path.abspath(path),)).fetchone()
+
+        if row is None:
+            return None
+
+        keys = ("path", "file_name", "size", "mtime", "hash", "accepted", "result", "uploaded_at")
+        entry = dict(zip(keys, row))
+        entry["accepted"] = bool(entry["accepted"])
+        entry["result"] = json.loads(entry["result"]) if entry["result"] else None
+
+        return entry
+
+    def is_uploaded(self, path):
+        """True if the same content of the file has been accepted before, no network calls are made"""
+
+        entry = self.get(path)
+
+        if entry is None or not entry["accepted"]:
+            return False
+
+        stat = os.stat(path)
+
+        if entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            return True
+
+        if entry["size"] != stat.st_size:
+            return False
+
+        # File was touched, check if the content is still the same
+        if entry["hash"] and entry["hash"] == file_hash(path):
+            self.record(path, accepted=True, result=entry["result"], content_hash=entry["hash"])
+            return True
+
+        return False
+
+    def record(self, path, accepted, result=None, content_hash=None):
+        """Store upload outcome, result must be JSON serializable"""
+
+        stat = os.stat(path)
+        content_hash = content_hash or file_hash(path)
+
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                     (os.path.abspath(path),
+                                      os.path.basename(path),
+                                      stat.st_size,
+                                      stat.st_mtime,
+                                      content_hash,
+                                      int(accepted),
+                                      json.dumps(result) if result is not None else None,
+                                      datetime.now(timezone.utc).isoformat()))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
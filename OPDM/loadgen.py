@@ -0,0 +1,306 @@
+"""
+Load generator running mix of client operations against OPDM client (real or mock) and reporting latency percentiles
+
+    python -m OPDM.loadgen --server https://opdm.client:8443 --username user --password pass --mix query=70,download=30 --rate 5 --duration 300 --report load.json
+    python -m OPDM.loadgen --mock --mix query=50,download=30,upload=10,subscription=10 --concurrency 16 --requests 2000
+
+Operations
+    query -> query_object for IGM of random time horizon and scenario day
+    download -> get_content of random profile found by the initial query, FILE mode
+    upload -> publication_request of synthetic CGMES like file, ONLY USE AGAINST TEST SYSTEMS, uploaded files are published
+    subscription -> subscription_list
+"""
+import io
+import json
+import math
+import time
+import random
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+import logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIX = {"query": 70, "download": 30}
+
+TIME_HORIZONS = ("1D", "2D", "ID")
+
+
+def parse_mix(text):
+    """"query=70,download=30" -> {"query": 70, "download": 30}"""
+
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        mix[name.strip()] = float(weight or 1)
+
+    return mix
+
+
+def percentile(sorted_values, share):
+    """Nearest rank percentile of sorted list, smallest value with at least share of values at or below it"""
+
+    if not sorted_values:
+        return None
+
+    # Rounded, so float error (0.07 * 100 = 7.000000000000001) does not move the rank up
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(round(share * len(sorted_values), 9)) - 1))
+
+    return sorted_values[rank]
+
+
+def summarize(latencies, errors, duration):
+    """Statistics of one operation, latencies in seconds"""
+
+    values = sorted(latencies)
+    count = len(values) + sum(errors.values())
+
+    return {"count": count,
+            "ok": len(values),
+            "errors": dict(errors),
+            "error_rate": sum(errors.values()) / count if count else 0.0,
+            "throughput": len(values) / duration if duration else None,
+            "mean": sum(values) / len(values) if values else None,
+            "p50": percentile(values, 0.50),
+            "p95": percentile(values, 0.95),
+            "p99": percentile(values, 0.99),
+            "max": values[-1] if values else None}
+
+
+class LoadGenerator:
+    """
+    Run operations in proportions of mix, either open loop at target rate (operations per second) or closed loop with concurrency workers
+
+    Latency is measured from the scheduled start, so a server falling behind the target rate is visible in percentiles
+    and not hidden by the generator slowing down.
+
+    duration -> seconds to run, requests -> number of operations to run, whichever is reached first
+    """
+
+    def __init__(self, service, mix=None, rate=None, concurrency=4, duration=60, requests=None, seed=0, payload_size=1_000_000, scenario_days=1):
+
+        self.service = service
+        self.mix = dict(mix or DEFAULT_MIX)
+        self.rate = rate
+        self.concurrency = concurrency
+        self.duration = duration
+        self.requests = requests
+        self.payload_size = payload_size
+        self.scenario_days = scenario_days
+
+        unknown = set(self.mix) - set(self.operations)
+        if unknown:
+            raise ValueError(f"Unknown operations {sorted(unknown)}, supported are {sorted(self.operations)}")
+
+        self.latencies = {name: [] for name in self.mix}
+        self.errors = {name: {} for name in self.mix}
+        self.profile_ids = []
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._issued = 0
+
+    @property
+    def operations(self):
+        return {"query": self._query,
+                "download": self._download,
+                "upload": self._upload,
+                "subscription": self._subscription}
+
+    def _choice(self, values):
+        with self._lock:
+            return self._random.choice(values)
+
+    def _scenario_day(self):
+        with self._lock:
+            offset = self._random.randrange(self.scenario_days)
+        return (datetime.now(timezone.utc) - timedelta(days=offset)).strftime("%Y-%m-%d")
+
+    def _query(self):
+        day = self._scenario_day()
+        return self.service.query_object("IGM", {"pmd:timeHorizon": self._choice(TIME_HORIZONS),
+                                                 "pmd:scenarioDate": {"operator": "is between", "value": f"{day}T00:00:00,{day}T23:59:59"}})
+
+    def _download(self):
+        if not self.profile_ids:
+            raise RuntimeError("No profiles found for download")
+        return self.service.get_content(self._choice(self.profile_ids))
+
+    def _upload(self):
+        from OPDM.synthetic import cgmes_zip
+
+        with self._lock:
+            number = self._issued
+
+        scenario = datetime.now(timezone.utc).replace(minute=30, second=0, microsecond=0)
+        profile = {"opde:Id": f"loadgen-{number}", "pmd:cgmesProfile": "SSH", "pmd:scenarioDate": f"{scenario:%Y-%m-%dT%H:%M:%SZ}",
+                   "pmd:fileName": f"{scenario:%Y%m%dT%H%MZ}_1D_LOADGEN_SSH_{number % 1000:03d}.zip"}
+
+        file_object = io.BytesIO(cgmes_zip(profile, self.payload_size))
+        file_object.name = profile["pmd:fileName"]
+
+        return self.service.publication_request(file_object)
+
+    def _subscription(self):
+        return self.service.subscription_list()
+
+    def prepare(self):
+        """Find profiles for download operations"""
+
+        if "download" not in self.mix:
+            return
+
+        response = self.service.query_object("IGM", {"pmd:scenarioDate": {"operator": "is after", "value": f"{self._scenario_day()}T00:00:00"}})
+
+        # Remove first part of the response, it is the id of the original query
+        for part in response["sm:QueryResult"]["sm:part"][1:]:
+            components = part["opdm:OPDMObject"].get("opde:Component", [])
+            for component in components if isinstance(components, list) else [components]:
+                self.profile_ids.append(component["opdm:Profile"]["opde:Id"])
+
+        logger.info(f"Found {len(self.profile_ids)} profiles for download")
+
+    def _next_operation(self):
+        names, weights = zip(*self.mix.items())
+        with self._lock:
+            return self._random.choices(names, weights)[0]
+
+    def _run_one(self, name, scheduled):
+
+        try:
+            self.operations[name]()
+        except Exception as error:
+            with self._lock:
+                self.errors[name][type(error).__name__] = self.errors[name].get(type(error).__name__, 0) + 1
+            logger.debug(f"{name} failed -> {error}")
+            return
+
+        latency = time.perf_counter() - scheduled
+        with self._lock:
+            self.latencies[name].append(latency)
+
+    def _more(self, start):
+        return (self.requests is None or self._issued < self.requests) and (self.duration is None or time.perf_counter() - start < self.duration)
+
+    def run(self):
+        """Run the load, returns report dictionary"""
+
+        self.prepare()
+
+        started = datetime.now(timezone.utc)
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+
+            if self.rate:
+                # Open loop, operations are started on schedule regardless of how fast previous ones finish
+                interval = 1 / self.rate
+                scheduled = start
+
+                while self._more(start):
+                    delay = scheduled - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+
+                    executor.submit(self._run_one, self._next_operation(), scheduled)
+                    self._issued += 1
+                    scheduled += interval
+
+            else:
+                # Closed loop, every worker starts next operation when previous one is done
+                def worker():
+                    while True:
+                        with self._lock:
+                            if not self._more(start):
+                                return
+                            self._issued += 1
+
+                        self._run_one(self._next_operation(), time.perf_counter())
+
+                for _ in range(self.concurrency):
+                    executor.submit(worker)
+
+        duration = time.perf_counter() - start
+
+        all_latencies = [value for values in self.latencies.values() for value in values]
+        all_errors = {}
+        for errors in self.errors.values():
+            for name, count in errors.items():
+                all_errors[name] = all_errors.get(name, 0) + count
+
+        return {"started": started.isoformat(),
+                "duration": duration,
+                "settings": {"mix": self.mix, "rate": self.rate, "concurrency": self.concurrency, "duration": self.duration, "requests": self.requests},
+                "operations": {name: summarize(self.latencies[name], self.errors[name], duration) for name in self.mix},
+                "total": summarize(all_latencies, all_errors, duration)}
+
+
+def format_report(report):
+    """Human readable table of the report, latencies in milliseconds"""
+
+    milliseconds = lambda value: f"{value * 1000:9.1f}" if value is not None else f"{'-':>9}"
+    lines = [f"{'operation':<14}{'count':>8}{'errors':>8}{'ops/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+
+    for name, statistics in list(report["operations"].items()) + [("total", report["total"])]:
+        lines.append(f"{name:<14}{statistics['count']:>8}{sum(statistics['errors'].values()):>8}{statistics['throughput']:>9.2f}"
+                     f" {milliseconds(statistics['p50'])} {milliseconds(statistics['p95'])} {milliseconds(statistics['p99'])} {milliseconds(statistics['max'])}")
+
+    return "\n".join(lines)
+
+
+def main(arguments=None):
+
+    parser = argparse.ArgumentParser(description="Run load against OPDM client and report latency percentiles")
+    parser.add_argument("--server", help="OPDM client address, for example https://opdm.client:8443")
+    parser.add_argument("--username", default="")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--mock", action="store_true", help="start local mock server and run against it")
+    parser.add_argument("--mix", default="query=70,download=30", help="operations with weights, from query, download, upload, subscription")
+    parser.add_argument("--rate", type=float, default=None, help="operations per second (open loop), by default closed loop")
+    parser.add_argument("--concurrency", type=int, default=4, help="maximum parallel operations")
+    parser.add_argument("--duration", type=float, default=60, help="seconds to run")
+    parser.add_argument("--requests", type=int, default=None, help="number of operations to run")
+    parser.add_argument("--payload_size", type=int, default=1_000_000, help="bytes of uploaded files")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", default=None, help="path of JSON report")
+    arguments = parser.parse_args(arguments)
+
+    logging.basicConfig(format='%(asctime)s | %(name)s | %(levelname)s | %(message)s', level=logging.INFO)
+
+    from OPDM import Client
+
+    mock = None
+    server = arguments.server
+
+    if arguments.mock:
+        from OPDM.mock_server import MockServer
+        mock = MockServer().start()
+        server = mock.url
+
+    if not server:
+        parser.error("--server or --mock is required")
+
+    try:
+        service = Client(server, username=arguments.username, password=arguments.password)
+        generator = LoadGenerator(service, mix=parse_mix(arguments.mix), rate=arguments.rate, concurrency=arguments.concurrency,
+                                  duration=arguments.duration, requests=arguments.requests, seed=arguments.seed, payload_size=arguments.payload_size)
+        report = generator.run()
+        report["server"] = server
+    finally:
+        if mock is not None:
+            mock.stop()
+
+    print(format_report(report))
+
+    if arguments.report:
+        with open(arguments.report, "w", encoding="utf-8") as file_object:
+            json.dump(report, file_object, indent=2)
+        logger.info(f"Report written to {arguments.report}")
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
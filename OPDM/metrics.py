@@ -0,0 +1,179 @@
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import logging
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+SIZE_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7, 5e7, 1e8, 5e8, 1e9)
+
+
+def _format_labels(labels):
+
+    if not labels:
+        return ""
+
+    escape = lambda value: str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels) + "}"
+
+
+def _format_value(value):
+
+    if value == math.inf:
+        return "+Inf"
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+
+        with self._lock:
+            for labels, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+
+        return lines
+
+
+class Histogram:
+
+    def __init__(self, name, documentation, buckets=DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+
+        with self._lock:
+            counts, total = self.values.get(key, ([0] * len(self.buckets), 0.0))
+
+            for position, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[position] += 1
+                    break
+
+            self.values[key] = (counts, total + value)
+
+    def summary(self, **labels):
+        """Count and sum of observations for given labels"""
+
+        counts, total = self.values.get(tuple(sorted(labels.items())), ([0], 0.0))
+
+        return {"count": sum(counts), "sum": total}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+
+        with self._lock:
+            for labels, (counts, total) in sorted(self.values.items()):
+                cumulative = 0
+
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(labels + (('le', _format_value(bound)),))} {cumulative}")
+
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+
+        return lines
+
+
+class MetricsRegistry:
+    """
+    In-process registry of SOAP operation metrics, labelled by operation type (Query, GetContent, CreateSubscription, PublicationRequest...)
+
+    opdm_operation_duration_seconds{operation, phase} -> phase is total, serialization (envelope build), network (HTTP) or parsing (zeep and xmltodict)
+    opdm_request_bytes{operation}, opdm_response_bytes{operation} -> HTTP body sizes
+    opdm_operation_errors_total{operation, error} -> failed operations by exception type
+
+    service = OPDM.Client(server, metrics=True)
+    print(service.metrics.render())
+    """
+
+    def __init__(self):
+
+        self.duration = Histogram("opdm_operation_duration_seconds", "Duration of OPDM SOAP operations by phase")
+        self.request_bytes = Histogram("opdm_request_bytes", "Size of OPDM SOAP request body", buckets=SIZE_BUCKETS)
+        self.response_bytes = Histogram("opdm_response_bytes", "Size of OPDM SOAP response body", buckets=SIZE_BUCKETS)
+        self.errors = Counter("opdm_operation_errors_total", "Failed OPDM SOAP operations")
+
+        self.metrics = [self.duration, self.request_bytes, self.response_bytes, self.errors]
+
+    def start(self, exchange):
+        pass
+
+    def finish(self, exchange):
+
+        # Client methods and user spans only group SOAP operations, those are measured on their own
+        if exchange["kind"] != "client":
+            return
+
+        operation = exchange["operation"]
+
+        self.duration.observe(exchange["end"] - exchange["start"], operation=operation, phase="total")
+
+        if exchange["http_start"] is not None and exchange["http_end"] is not None:
+            self.duration.observe(exchange["http_start"] - exchange["start"], operation=operation, phase="serialization")
+            self.duration.observe(exchange["http_end"] - exchange["http_start"], operation=operation, phase="network")
+            self.duration.observe(exchange["end"] - exchange["http_end"], operation=operation, phase="parsing")
+            self.request_bytes.observe(exchange["request_bytes"], operation=operation)
+            self.response_bytes.observe(exchange["response_bytes"], operation=operation)
+
+        if exchange["error"] is not None:
+            self.errors.inc(operation=operation, error=type(exchange["error"]).__name__)
+
+    def render(self):
+        """Metrics in Prometheus text exposition format"""
+
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+
+        return "\n".join(lines) + "\n"
+
+    def start_http_server(self, port=9464, address=""):
+        """Serve metrics at http://<address>:<port>/metrics in background thread, returns the server (call shutdown() to stop)"""
+
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        server = ThreadingHTTPServer((address, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="OPDM-metrics-server", daemon=True).start()
+        logger.info(f"Serving metrics on port {server.server_address[1]}")
+
+        return server
@@ -0,0 +1,708 @@
+"""
+Local stand-in for OPDM client SOAP interface, for tests and benchmarks without live OPDM node
+
+Serves both WSDL-s and implements ExecuteOperation (Query, GetContent, subscriptions, publication list and reports),
+PublicationRequest and RuleSetManagementService from synthetic catalogue, with configurable latency, bandwidth and error injection.
+
+    with MockServer(latency=0.05, bandwidth=10_000_000) as server:
+        service = OPDM.Client(server.url)
+
+From command line
+    python -m OPDM.mock_server --port 8080 --latency 0.05 --error_rate 0.01
+"""
+import re
+import time
+import base64
+import random
+import fnmatch
+import functools
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+from xml.sax.saxutils import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import aniso8601
+from lxml import etree
+
+from OPDM.synthetic import SyntheticCatalogue, to_xml, cgmes_zip, NAMESPACES, NAMESPACE_DECLARATIONS
+
+import logging
+logger = logging.getLogger(__name__)
+
+SERVICE_PATH = "/opdm/cxf/OPDMSoapInterface"
+RULESET_PATH = "/opdm/cxf/OPDMSoapInterface/RuleSetManagementService"
+
+MOCK_VERSION = "mock"
+
+SOAP_NAMESPACE = "http://soap.interfaces.application.components.opdm.entsoe.eu/"
+
+SERVICE_WSDL = """<?xml version="1.0" encoding="UTF-8"?>
+<wsdl:definitions name="OPDMSoapInterface" targetNamespace="http://opde.entsoe.eu/opdm/Message#v1"
+                  xmlns:wsdl="http://schemas.xmlsoap.org/wsdl/" xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+                  xmlns:xsd="http://www.w3.org/2001/XMLSchema" xmlns:tns="http://opde.entsoe.eu/opdm/Message#v1"
+                  xmlns:ns0="http://soap.interfaces.application.components.opdm.entsoe.eu/">
+  <wsdl:types>
+    <xsd:schema targetNamespace="http://soap.interfaces.application.components.opdm.entsoe.eu/" elementFormDefault="unqualified">
+      <xsd:element name="ExecuteOperation" type="ns0:ExecuteOperation"/>
+      <xsd:element name="ExecuteOperationResponse" type="ns0:ExecuteOperationResponse"/>
+      <xsd:element name="PublicationRequest" type="ns0:PublicationRequest"/>
+      <xsd:element name="PublicationRequestResponse" type="ns0:PublicationRequestResponse"/>
+      <xsd:complexType name="ExecuteOperation"><xsd:sequence><xsd:element name="payload" type="xsd:base64Binary" minOccurs="0"/></xsd:sequence></xsd:complexType>
+      <xsd:complexType name="ExecuteOperationResponse"><xsd:sequence><xsd:element name="return" type="ns0:resultDto" minOccurs="0"/></xsd:sequence></xsd:complexType>
+      <xsd:complexType name="PublicationRequest"><xsd:sequence><xsd:element name="dataset" type="ns0:opdeFileDto" minOccurs="0"/></xsd:sequence></xsd:complexType>
+      <xsd:complexType name="PublicationRequestResponse"><xsd:sequence><xsd:element name="return" type="ns0:resultDto" minOccurs="0"/></xsd:sequence></xsd:complexType>
+      <xsd:complexType name="opdeFileDto"><xsd:sequence>
+        <xsd:element name="id" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="type" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="content" type="xsd:base64Binary" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+      <xsd:complexType name="resultDto"><xsd:sequence><xsd:any processContents="skip" namespace="##other"/></xsd:sequence></xsd:complexType>
+    </xsd:schema>
+  </wsdl:types>
+  <wsdl:message name="ExecuteOperation"><wsdl:part name="parameters" element="ns0:ExecuteOperation"/></wsdl:message>
+  <wsdl:message name="ExecuteOperationResponse"><wsdl:part name="parameters" element="ns0:ExecuteOperationResponse"/></wsdl:message>
+  <wsdl:message name="PublicationRequest"><wsdl:part name="parameters" element="ns0:PublicationRequest"/></wsdl:message>
+  <wsdl:message name="PublicationRequestResponse"><wsdl:part name="parameters" element="ns0:PublicationRequestResponse"/></wsdl:message>
+  <wsdl:portType name="OPDMSoapInterface">
+    <wsdl:operation name="ExecuteOperation"><wsdl:input message="tns:ExecuteOperation"/><wsdl:output message="tns:ExecuteOperationResponse"/></wsdl:operation>
+    <wsdl:operation name="PublicationRequest"><wsdl:input message="tns:PublicationRequest"/><wsdl:output message="tns:PublicationRequestResponse"/></wsdl:operation>
+  </wsdl:portType>
+  <wsdl:binding name="OPDMSoapInterfaceSoapBinding" type="tns:OPDMSoapInterface">
+    <soap:binding style="document" transport="http://schemas.xmlsoap.org/soap/http"/>
+    <wsdl:operation name="ExecuteOperation"><soap:operation soapAction=""/><wsdl:input><soap:body use="literal"/></wsdl:input><wsdl:output><soap:body use="literal"/></wsdl:output></wsdl:operation>
+    <wsdl:operation name="PublicationRequest"><soap:operation soapAction=""/><wsdl:input><soap:body use="literal"/></wsdl:input><wsdl:output><soap:body use="literal"/></wsdl:output></wsdl:operation>
+  </wsdl:binding>
+  <wsdl:service name="OPDMSoapInterface">
+    <wsdl:port name="OPDMSoapInterfacePort" binding="tns:OPDMSoapInterfaceSoapBinding"><soap:address location="{address}"/></wsdl:port>
+  </wsdl:service>
+</wsdl:definitions>"""
+
+RULESET_WSDL = """<?xml version="1.0" encoding="UTF-8"?>
+<wsdl:definitions name="RuleSetManagementService" targetNamespace="http://soap.interfaces.application.components.opdm.entsoe.eu/"
+                  xmlns:wsdl="http://schemas.xmlsoap.org/wsdl/" xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+                  xmlns:xsd="http://www.w3.org/2001/XMLSchema" xmlns:tns="http://soap.interfaces.application.components.opdm.entsoe.eu/">
+  <wsdl:types>
+    <xsd:schema targetNamespace="http://soap.interfaces.application.components.opdm.entsoe.eu/" elementFormDefault="unqualified">
+      <xsd:element name="GetInstalledRuleSetVersion"><xsd:complexType><xsd:sequence/></xsd:complexType></xsd:element>
+      <xsd:element name="GetInstalledRuleSetVersionResponse"><xsd:complexType><xsd:sequence><xsd:element name="return" type="xsd:string" minOccurs="0"/></xsd:sequence></xsd:complexType></xsd:element>
+      <xsd:element name="ListAvailableRuleSets"><xsd:complexType><xsd:sequence/></xsd:complexType></xsd:element>
+      <xsd:element name="ListAvailableRuleSetsResponse"><xsd:complexType><xsd:sequence><xsd:element name="return" type="tns:ruleSetDto" minOccurs="0" maxOccurs="unbounded"/></xsd:sequence></xsd:complexType></xsd:element>
+      <xsd:element name="Install"><xsd:complexType><xsd:sequence><xsd:element name="Version" type="xsd:string" minOccurs="0"/></xsd:sequence></xsd:complexType></xsd:element>
+      <xsd:element name="InstallResponse"><xsd:complexType><xsd:sequence><xsd:element name="return" type="xsd:string" minOccurs="0"/></xsd:sequence></xsd:complexType></xsd:element>
+      <xsd:element name="Reset"><xsd:complexType><xsd:sequence/></xsd:complexType></xsd:element>
+      <xsd:element name="ResetResponse"><xsd:complexType><xsd:sequence><xsd:element name="return" type="xsd:string" minOccurs="0"/></xsd:sequence></xsd:complexType></xsd:element>
+      <xsd:complexType name="ruleSetDto"><xsd:sequence>
+        <xsd:element name="version" type="xsd:string" minOccurs="0"/>
+        <xsd:element name="installed" type="xsd:boolean" minOccurs="0"/>
+      </xsd:sequence></xsd:complexType>
+    </xsd:schema>
+  </wsdl:types>
+  <wsdl:message name="GetInstalledRuleSetVersion"><wsdl:part name="parameters" element="tns:GetInstalledRuleSetVersion"/></wsdl:message>
+  <wsdl:message name="GetInstalledRuleSetVersionResponse"><wsdl:part name="parameters" element="tns:GetInstalledRuleSetVersionResponse"/></wsdl:message>
+  <wsdl:message name="ListAvailableRuleSets"><wsdl:part name="parameters" element="tns:ListAvailableRuleSets"/></wsdl:message>
+  <wsdl:message name="ListAvailableRuleSetsResponse"><wsdl:part name="parameters" element="tns:ListAvailableRuleSetsResponse"/></wsdl:message>
+  <wsdl:message name="Install"><wsdl:part name="parameters" element="tns:Install"/></wsdl:message>
+  <wsdl:message name="InstallResponse"><wsdl:part name="parameters" element="tns:InstallResponse"/></wsdl:message>
+  <wsdl:message name="Reset"><wsdl:part name="parameters" element="tns:Reset"/></wsdl:message>
+  <wsdl:message name="ResetResponse"><wsdl:part name="parameters" element="tns:ResetResponse"/></wsdl:message>
+  <wsdl:portType name="RuleSetManagementService">
+    <wsdl:operation name="GetInstalledRuleSetVersion"><wsdl:input message="tns:GetInstalledRuleSetVersion"/><wsdl:output message="tns:GetInstalledRuleSetVersionResponse"/></wsdl:operation>
+    <wsdl:operation name="ListAvailableRuleSets"><wsdl:input message="tns:ListAvailableRuleSets"/><wsdl:output message="tns:ListAvailableRuleSetsResponse"/></wsdl:operation>
+    <wsdl:operation name="Install"><wsdl:input message="tns:Install"/><wsdl:output message="tns:InstallResponse"/></wsdl:operation>
+    <wsdl:operation name="Reset"><wsdl:input message="tns:Reset"/><wsdl:output message="tns:ResetResponse"/></wsdl:operation>
+  </wsdl:portType>
+  <wsdl:binding name="RuleSetManagementServiceSoapBinding" type="tns:RuleSetManagementService">
+    <soap:binding style="document" transport="http://schemas.xmlsoap.org/soap/http"/>
+    <wsdl:operation name="GetInstalledRuleSetVersion"><soap:operation soapAction=""/><wsdl:input><soap:body use="literal"/></wsdl:input><wsdl:output><soap:body use="literal"/></wsdl:output></wsdl:operation>
+    <wsdl:operation name="ListAvailableRuleSets"><soap:operation soapAction=""/><wsdl:input><soap:body use="literal"/></wsdl:input><wsdl:output><soap:body use="literal"/></wsdl:output></wsdl:operation>
+    <wsdl:operation name="Install"><soap:operation soapAction=""/><wsdl:input><soap:body use="literal"/></wsdl:input><wsdl:output><soap:body use="literal"/></wsdl:output></wsdl:operation>
+    <wsdl:operation name="Reset"><soap:operation soapAction=""/><wsdl:input><soap:body use="literal"/></wsdl:input><wsdl:output><soap:body use="literal"/></wsdl:output></wsdl:operation>
+  </wsdl:binding>
+  <wsdl:service name="RuleSetManagementService">
+    <wsdl:port name="RuleSetManagementServicePort" binding="tns:RuleSetManagementServiceSoapBinding"><soap:address location="{address}"/></wsdl:port>
+  </wsdl:service>
+</wsdl:definitions>"""
+
+ENVELOPE = '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"><soap:Body>{body}</soap:Body></soap:Envelope>'
+
+FAULT = '<soap:Fault><faultcode>soap:Server</faultcode><faultstring>{message}</faultstring></soap:Fault>'
+
+def mock_content(content_id, size):
+    """Deterministic content of given size for profile ID"""
+
+    pattern = hashlib.sha256(content_id.encode()).digest()
+
+    return (pattern * (size // len(pattern) + 1))[:size]
+
+
+def _local_name(element):
+    return etree.QName(element).localname
+
+
+def _children(element):
+    """Child elements without comments and processing instructions"""
+    return [child for child in element if isinstance(child.tag, str)]
+
+
+@functools.lru_cache(maxsize=65536)
+def _normalize_date(value):
+    """Timestamp in any ISO 8601 form used in OPDM metadata as aware UTC datetime, naive values are UTC, None if value is not a date"""
+
+    value = (value or "").strip()
+
+    # Metadata values are mostly not dates, skip parsing those
+    if not value[:4].isdigit():
+        return None
+
+    try:
+        timestamp = aniso8601.parse_datetime(value)
+    except (ValueError, NotImplementedError):
+        try:
+            timestamp = datetime.combine(aniso8601.parse_date(value), datetime.min.time())
+        except (ValueError, NotImplementedError):
+            return None
+
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+
+    return timestamp.astimezone(timezone.utc)
+
+
+def _same(value, expected):
+    """Equal as text or, when both are timestamps, as points in time ("2024-01-01T00:30" is "2024-01-01T00:30:00Z")"""
+
+    if value == expected:
+        return True
+
+    value_date, expected_date = _normalize_date(value), _normalize_date(expected)
+
+    return value_date is not None and value_date == expected_date
+
+
+def _ordered(*values):
+    """Values as datetimes when all are timestamps, otherwise as text"""
+
+    dates = [_normalize_date(value) for value in values]
+
+    return values if None in dates else dates
+
+
+def _matches(value, operator, expected):
+    """Evaluate OPDM metadata operator, see Client.query_object"""
+
+    operator = (operator or "is").lower()
+
+    if operator == "exist":
+        return value is not None
+
+    if operator == "does not exist":
+        return value is None
+
+    if value is None:
+        return operator in ("is not", "is not one of", "is not between")
+
+    values = [item.strip() for item in (expected or "").split(",")]
+
+    if operator == "is":
+        return _same(value, expected)
+    if operator == "is not":
+        return not _same(value, expected)
+    if operator == "is one of":
+        return any(_same(value, item) for item in values)
+    if operator == "is not one of":
+        return not any(_same(value, item) for item in values)
+    if operator == "is after":
+        value, expected = _ordered(value, expected)
+        return value > expected
+    if operator == "is before":
+        value, expected = _ordered(value, expected)
+        return value < expected
+    if operator in ("is between", "is not between"):
+        start, value, end = _ordered(values[0], value, values[-1])
+        inside = start <= value <= end
+        return inside if operator == "is between" else not inside
+    if operator == "contains":
+        return expected in value
+    if operator == "match regex":
+        return re.search(expected, value) is not None
+    if operator == "match wildcard":
+        return fnmatch.fnmatchcase(value, expected)
+
+    raise ValueError(f"Unsupported operator '{operator}'")
+
+
+def _metadata_lookup(item):
+    """Metadata values of OPDMObject or Profile by lowercase local name"""
+    return {key.split(":")[-1].lower(): value for key, value in item.items() if isinstance(value, str)}
+
+
+class MockServer:
+    """
+    OPDM client stand-in running in background thread
+
+    catalogue -> OPDMObject dictionaries, by default small OPDM.synthetic.SyntheticCatalogue, profiles are taken from their opde:Component
+    latency, jitter -> seconds added to every response, jitter is uniformly distributed extra delay
+    bandwidth -> bytes per second for reading requests and writing responses, unlimited by default
+    error_rate -> share of requests answered with HTTP error_status (transient error)
+    fault_rate -> share of requests answered with SOAP fault
+    processing_time -> seconds each publication step of uploaded file takes before report shows next step
+    seed -> seed of random generator used for error injection
+    """
+
+    def __init__(self, catalogue=None, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, bandwidth=None, error_rate=0.0, error_status=503,
+                 fault_rate=0.0, processing_time=1.0, installed_ruleset="2.0.1", seed=0):
+
+        if catalogue is None:
+            catalogue = SyntheticCatalogue(start=datetime.now(timezone.utc).strftime("%Y-%m-%d"), model_size=400_000).objects()
+
+        self.catalogue = list(catalogue)
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.fault_rate = fault_rate
+        self.processing_time = processing_time
+        self.installed_ruleset = installed_ruleset
+        self.available_rulesets = {installed_ruleset}
+
+        self.subscriptions = {}
+        self.uploads = {}
+        self.requests = {}
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._index()
+
+    def _index(self):
+
+        self.objects = {item["opde:Id"]: item for item in self.catalogue}
+        self.profiles = {}
+
+        for item in self.catalogue:
+            for component in item.get("opde:Component", []):
+                self.profiles[component["opdm:Profile"]["opde:Id"]] = component["opdm:Profile"]
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self._server.server_address[1]}"
+
+    def start(self):
+
+        self._server = ThreadingHTTPServer((self.host, self.port), _handler(self))
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="OPDM-mock-server", daemon=True).start()
+        logger.info(f"Mock OPDM server running at {self.url}")
+
+        return self
+
+    def stop(self):
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def serve_forever(self):
+
+        self.start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            self.stop()
+
+    # Injection
+
+    def _delay(self):
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _injected_error(self):
+        """Returns "error", "fault" or None"""
+
+        with self._lock:
+            draw = self._random.random()
+
+        if draw < self.error_rate:
+            return "error"
+
+        if draw < self.error_rate + self.fault_rate:
+            return "fault"
+
+        return None
+
+    # SOAP operations
+
+    def handle(self, path, body):
+        """Returns (HTTP status, response body bytes) for SOAP request body"""
+
+        # Uploads are single base64 text nodes, larger than lxml allows without huge tree
+        envelope = etree.fromstring(body, etree.XMLParser(huge_tree=True))
+        request = _children(next(child for child in envelope.iter() if isinstance(child.tag, str) and _local_name(child) == "Body"))[0]
+        operation = _local_name(request)
+
+        with self._lock:
+            self.requests[operation] = self.requests.get(operation, 0) + 1
+
+        try:
+            if operation == "ExecuteOperation":
+                payload = base64.b64decode(request.find("payload").text or "")
+                result = self.execute_operation(etree.fromstring(payload))
+                response = f'<ns2:ExecuteOperationResponse xmlns:ns2="{SOAP_NAMESPACE}"><return>{result}</return></ns2:ExecuteOperationResponse>'
+
+            elif operation == "PublicationRequest":
+                dataset = request.find("dataset")
+                result = self.publication_request(dataset.findtext("id"), dataset.findtext("type"), base64.b64decode(dataset.findtext("content") or ""))
+                response = f'<ns2:PublicationRequestResponse xmlns:ns2="{SOAP_NAMESPACE}"><return>{result}</return></ns2:PublicationRequestResponse>'
+
+            elif path.startswith(RULESET_PATH):
+                response = self.ruleset_operation(operation, request)
+
+            else:
+                raise ValueError(f"Unknown operation {operation}")
+
+        except Exception as error:
+            logger.debug(f"Mock operation {operation} failed -> {error}")
+            return 500, ENVELOPE.format(body=FAULT.format(message=escape(str(error)))).encode()
+
+        return 200, ENVELOPE.format(body=response).encode()
+
+    def _result(self, name, parts):
+        return f'<sm:{name}Result opdm-version="{MOCK_VERSION}" {NAMESPACE_DECLARATIONS}>{"".join(parts)}</sm:{name}Result>'
+
+    def execute_operation(self, operation):
+
+        name = _local_name(operation)
+        handler = {"Query": self.query,
+                   "GetContent": self.get_content,
+                   "CreateSubscription": self.create_subscription,
+                   "StartSubscription": self.change_subscription,
+                   "StopSubscription": self.change_subscription,
+                   "DeleteSubscription": self.change_subscription,
+                   "GetSubscriptions": self.get_subscriptions,
+                   "PublicationsSubscriptionList": self.publications_list,
+                   "GetProfilePublicationReport": self.publication_report}.get(name)
+
+        if handler is None:
+            raise ValueError(f"Operation {name} not supported by mock server")
+
+        return self._result(name, handler(operation))
+
+    @staticmethod
+    def _parts(operation):
+        return [part for part in _children(operation) if _local_name(part) == "part"]
+
+    @staticmethod
+    def _filters(pattern):
+        """Metadata filters of query pattern as list of (local name, operator, value)"""
+
+        filters = []
+        for element in _children(pattern):
+            if _local_name(element) in ("Components", "Dependencies"):
+                continue
+            filters.append((_local_name(element).lower(), element.get("operator"), element.text))
+
+        return filters
+
+    @staticmethod
+    def _select(items, filters):
+        return [item for item in items if all(_matches(lookup.get(name), operator, value) for lookup in [_metadata_lookup(item)] for name, operator, value in filters)]
+
+    def query(self, operation):
+
+        parts = self._parts(operation)
+        query_id = parts[0].text
+        pattern = _children(parts[1])[0]
+        filters = self._filters(pattern)
+
+        if _local_name(pattern) == "Profile":
+            found = [to_xml("sm:part", {"opdm:Profile": profile}) for profile in self._select(self.profiles.values(), filters)]
+
+        else:
+            components = [element.text for container in _children(pattern) if _local_name(container) == "Components" for element in _children(container)]
+            objects = self._select(self.objects.values(), filters)
+
+            if components:
+                objects = [item for item in objects if set(components) <= {component["opdm:Profile"]["opde:Id"] for component in item.get("opde:Component", [])}]
+
+            found = [to_xml("sm:part", {"opdm:OPDMObject": item}) for item in objects]
+
+        return [f'<sm:part name="name">{escape(query_id or "")}</sm:part>'] + found
+
+    def get_content(self, operation):
+
+        parts = self._parts(operation)
+        return_mode = parts[0].text.strip()
+        result = [f'<sm:part name="content-return-mode">{return_mode}</sm:part>']
+
+        for part in parts[1:]:
+            identifier = _children(part)[0]
+            content_id = identifier.findtext(f"{{{NAMESPACES['opde']}}}Id")
+
+            if _local_name(identifier) == "OPDMObject":
+                item = self.objects.get(content_id)
+                if item is None:
+                    raise ValueError(f"Object {content_id} not found")
+
+                if item.get("opde:Object-Type") == "RULESET":
+                    with self._lock:
+                        self.available_rulesets.add(item["pmd:version"])
+
+                profiles = [component["opdm:Profile"] for component in item.get("opde:Component", [])]
+            else:
+                profile = self.profiles.get(content_id)
+                if profile is None:
+                    raise ValueError(f"Profile {content_id} not found")
+                profiles = [profile]
+
+            for profile in profiles:
+                profile = dict(profile)
+
+                if return_mode == "PAYLOAD":
+                    content = cgmes_zip(profile) if profile.get("pmd:cgmesProfile") else mock_content(profile["opde:Id"], int(profile.get("pmd:profileSize", 1000)))
+                    profile["opde:Content"] = base64.b64encode(content).decode()
+
+                result.append(to_xml("sm:part", {"opdm:Profile": profile}))
+
+        return result
+
+    def create_subscription(self, operation):
+
+        subscription = operation.find(f".//{{{NAMESPACES['opdm']}}}Subscription")
+        subscription_id = subscription.findtext(f"{{{NAMESPACES['opdm']}}}SubscriptionID")
+        pattern = subscription.find(f".//{{{NAMESPACES['opdm']}}}OPDMObject")
+
+        metadata = {}
+        for element in _children(pattern):
+            value = element.text if element.get("operator") is None else {"@operator": element.get("operator"), "#text": element.text}
+            metadata[f"{element.prefix}:{_local_name(element)}"] = value
+
+        with self._lock:
+            self.subscriptions[subscription_id] = {"opdm:SubscriptionID": subscription_id,
+                                                   "opdm:PublicationID": subscription.findtext(f"{{{NAMESPACES['opdm']}}}PublicationID") or "",
+                                                   "opdm:Mode": subscription.findtext(f"{{{NAMESPACES['opdm']}}}Mode"),
+                                                   "opdm:MetadataPattern": {"opdm:OPDMObject": metadata},
+                                                   "opdm:Status": "Subscribed"}
+
+        return [f'<sm:part name="subscriptionID">{escape(subscription_id)}</sm:part>']
+
+    def change_subscription(self, operation):
+
+        subscription_id = self._parts(operation)[0].text
+        status = {"StartSubscription": "Subscribed", "StopSubscription": "Not subscribed", "DeleteSubscription": "Deleted"}[_local_name(operation)]
+
+        with self._lock:
+            if subscription_id not in self.subscriptions:
+                raise ValueError(f"Subscription {subscription_id} not found")
+            self.subscriptions[subscription_id]["opdm:Status"] = status
+
+        return [f'<sm:part name="subscriptionID">{escape(subscription_id)}</sm:part>']
+
+    def get_subscriptions(self, operation):
+
+        status_filter = self._parts(operation)[0].text.strip()
+
+        with self._lock:
+            subscriptions = [dict(item) for item in self.subscriptions.values()]
+
+        if status_filter != "ALL":
+            subscriptions = [item for item in subscriptions if item["opdm:Status"].upper().replace(" ", "_") == status_filter]
+
+        return [to_xml("sm:part", {"opdm:Subscriptions": {"opdm:Subscription": subscriptions}})]
+
+    def publications_list(self, operation):
+
+        object_types = sorted({item.get("opde:Object-Type") for item in self.catalogue if item.get("opde:Object-Type")})
+        publications = [{"opde:publicationID": {"@v": f"publication-{object_type}"}, "opde:messageType": {"@v": f"OPDM-PUBLICATION-{object_type}"}} for object_type in object_types]
+
+        return [to_xml("sm:part", {"opdm:PublicationsList": {"opdm:Publication": publications}})]
+
+    def publication_request(self, file_name, content_type, content):
+
+        model_id = hashlib.md5(file_name.encode()).hexdigest()
+
+        with self._lock:
+            self.uploads[file_name] = {"model_id": model_id, "content_type": content_type, "size": len(content), "received": time.monotonic(),
+                                       "time": datetime.now(timezone.utc)}
+
+        return self._result("PublicationRequest", [f'<sm:part name="modelId">{model_id}</sm:part>'])
+
+    def _report(self, file_name, upload):
+
+        steps = ["RECEIVED", "FILE_VALIDATION", "MODEL_ASSEMBLY", "MODEL_VALIDATION", "PUBLISHED"]
+        elapsed = time.monotonic() - upload["received"]
+        done = min(len(steps), 1 + int(elapsed / self.processing_time)) if self.processing_time else len(steps)
+
+        history = [{"publication:name": step,
+                    "publication:status": "SUCCESS" if step == "PUBLISHED" else "OK" if number + 1 < done else "IN_PROGRESS",
+                    "publication:time": f"{upload['time'] + timedelta(seconds=number * self.processing_time):%Y-%m-%dT%H:%M:%SZ}"}
+                   for number, step in enumerate(steps[:done])]
+
+        return {"publication:filename": file_name, "publication:modelId": upload["model_id"], "publication:history": {"publication:step": history}}
+
+    def publication_report(self, operation):
+
+        pattern = operation.find(f".//{{{NAMESPACES['opdm']}}}Profile")
+        filters = [("filename" if name == "filename" else "modelid", operator, value) for name, operator, value in self._filters(pattern)]
+
+        with self._lock:
+            uploads = dict(self.uploads)
+
+        reports = [self._report(file_name, upload) for file_name, upload in uploads.items()
+                   if all(_matches({"filename": file_name, "modelid": upload["model_id"]}.get(name), operator, value) for name, operator, value in filters)]
+
+        return [to_xml("sm:part", {"opdm:PublicationReport": report}) for report in reports]
+
+    def ruleset_operation(self, operation, request):
+
+        ns = f'xmlns:ns2="{SOAP_NAMESPACE}"'
+
+        if operation == "GetInstalledRuleSetVersion":
+            return f'<ns2:GetInstalledRuleSetVersionResponse {ns}><return>{self.installed_ruleset or ""}</return></ns2:GetInstalledRuleSetVersionResponse>'
+
+        if operation == "ListAvailableRuleSets":
+            with self._lock:
+                versions = sorted(self.available_rulesets)
+            items = "".join(f"<return><version>{version}</version><installed>{str(version == self.installed_ruleset).lower()}</installed></return>" for version in versions)
+            return f'<ns2:ListAvailableRuleSetsResponse {ns}>{items}</ns2:ListAvailableRuleSetsResponse>'
+
+        if operation == "Install":
+            version = request.findtext("Version")
+            if version not in self.available_rulesets:
+                raise ValueError(f"Ruleset {version} not available")
+            self.installed_ruleset = version
+            return f'<ns2:InstallResponse {ns}><return>OK</return></ns2:InstallResponse>'
+
+        if operation == "Reset":
+            self.installed_ruleset = None
+            return f'<ns2:ResetResponse {ns}><return>OK</return></ns2:ResetResponse>'
+
+        raise ValueError(f"Unknown ruleset operation {operation}")
+
+
+def _handler(mock):
+
+    class MockHandler(BaseHTTPRequestHandler):
+
+        protocol_version = "HTTP/1.1"
+
+        def _throttle(self, size):
+            if mock.bandwidth:
+                time.sleep(size / mock.bandwidth)
+
+        def _read_body(self):
+
+            chunks = []
+
+            if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                while True:
+                    size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                    if size == 0:
+                        self.rfile.readline()
+                        break
+                    chunks.append(self.rfile.read(size))
+                    self.rfile.readline()
+                    self._throttle(size)
+            else:
+                remaining = int(self.headers.get("Content-Length", 0))
+                while remaining:
+                    chunk = self.rfile.read(min(remaining, 64 * 1024))
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+                    remaining -= len(chunk)
+                    self._throttle(len(chunk))
+
+            return b"".join(chunks)
+
+        def _send(self, status, body, content_type="text/xml; charset=utf-8"):
+
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+
+            view = memoryview(body)
+            for position in range(0, len(view), 64 * 1024):
+                chunk = view[position:position + 64 * 1024]
+                self._throttle(len(chunk))
+                self.wfile.write(chunk)
+
+        def do_GET(self):
+
+            path, _, query = self.path.partition("?")
+
+            if query.lower() != "wsdl" or path not in (SERVICE_PATH, RULESET_PATH):
+                self.send_error(404)
+                return
+
+            address = f"http://{self.headers.get('Host', mock.host)}{path}"
+            wsdl = RULESET_WSDL if path == RULESET_PATH else SERVICE_WSDL
+
+            self._send(200, wsdl.replace("{address}", address).encode())
+
+        def do_POST(self):
+
+            body = self._read_body()
+            mock._delay()
+
+            injected = mock._injected_error()
+
+            if injected == "error":
+                self._send(mock.error_status, b"Service temporarily unavailable", "text/plain")
+                return
+
+            if injected == "fault":
+                self._send(500, ENVELOPE.format(body=FAULT.format(message="Injected fault")).encode())
+                return
+
+            status, response = mock.handle(self.path, body)
+            self._send(status, response)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return MockHandler
+
+
+def main(arguments=None):
+
+    parser = argparse.ArgumentParser(description="Mock OPDM client SOAP server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="maximum random extra seconds added to every response")
+    parser.add_argument("--bandwidth", type=float, default=None, help="bytes per second")
+    parser.add_argument("--error_rate", type=float, default=0.0, help="share of requests answered with HTTP 503")
+    parser.add_argument("--fault_rate", type=float, default=0.0, help="share of requests answered with SOAP fault")
+    parser.add_argument("--tsos", type=int, default=3, help="number of TSO-s in synthetic catalogue")
+    parser.add_argument("--time_horizons", default="1D,ID", help="comma separated time horizons in synthetic catalogue")
+    parser.add_argument("--start", default=None, help="first scenario day of synthetic catalogue, by default today")
+    parser.add_argument("--days", type=int, default=1, help="number of scenario days in synthetic catalogue")
+    arguments = parser.parse_args(arguments)
+
+    logging.basicConfig(format='%(asctime)s | %(name)s | %(levelname)s | %(message)s', level=logging.INFO)
+
+    start = arguments.start or datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    catalogue = SyntheticCatalogue(tsos=arguments.tsos, time_horizons=arguments.time_horizons.split(","), start=start, days=arguments.days).objects()
+
+    server = MockServer(catalogue, host=arguments.host, port=arguments.port, latency=arguments.latency, jitter=arguments.jitter,
+                        bandwidth=arguments.bandwidth, error_rate=arguments.error_rate, fault_rate=arguments.fault_rate)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+def format_scenario_date(timestamp):
+    """Convert timezone aware datetime to UTC scenarioDate query value, strings are passed through as they are"""
+
+    if isinstance(timestamp, str):
+        return timestamp
+
+    if timestamp.tzinfo is None:
+        raise ValueError(f"Scenario date {timestamp} has no timezone, use timezone aware datetime, for example datetime.now(timezone.utc)")
+
+    return timestamp.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M")
+
+
+def build_schedule(time_horizons, timestamps, object_types=("IGM", "CGM")):
+    """
+    Create prefetch schedule from time horizons and scenario timestamps
+
+    time_horizons -> ["ID", "1D"]
+    timestamps -> list of timezone aware datetimes or strings, for example generated by TIME_HELPER.timestamp_range(start, end, "PT1H")
+    object_types -> IGM, CGM, BDS
+
+    Returns list of {"object_type": ..., "metadata_dict": {...}} items, that can be passed to Prefetcher
+    """
+
+    schedule = []
+
+    for object_type in object_types:
+        for time_horizon in time_horizons:
+            for timestamp in timestamps:
+                schedule.append({"object_type": object_type,
+                                 "metadata_dict": {"pmd:timeHorizon": time_horizon,
+                                                   "pmd:scenarioDate": {"operator": "is", "value": format_scenario_date(timestamp)}}})
+
+    return schedule
+
+
+def _scenario_date(item):
+    """scenarioDate value of schedule item"""
+
+    scenario_date = item["metadata_dict"].get("pmd:scenarioDate")
+
+    if isinstance(scenario_date, dict):
+        scenario_date = scenario_date.get("value")
+
+    return scenario_date
+
+
+class TokenBucket:
+    """Simple bytes per second budget, rate None means unlimited"""
+
+    def __init__(self, rate=None, burst=None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self.tokens = self.capacity
+        self.timestamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, amount, stop_event=None):
+        """Block until amount of bytes fits into the budget, returns False if stop_event was set while waiting"""
+
+        if not self.rate:
+            return True
+
+        # Single request bigger than the bucket is allowed to go once the bucket is full
+        amount = min(amount, self.capacity)
+
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.timestamp) * self.rate)
+                self.timestamp = now
+
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return True
+
+                wait_time = (amount - self.tokens) / self.rate
+
+            if stop_event is not None:
+                if stop_event.wait(wait_time):
+                    return False
+            else:
+                time.sleep(wait_time)
+
+
+class Prefetcher:
+    """
+    Background prefetcher, that asks the OPDM client to retrieve upcoming models from the Service Provider before users open them.
+
+    Models are downloaded in FILE mode, so the content ends up in OPDM client local storage and later GetContent calls are served locally.
+    The schedule can be a list created with build_schedule() or a callable returning such list on every cycle (useful for rolling windows).
+    Additionally the prefetcher learns from observe() calls, which scenario hour offsets and time horizons are opened by the users.
+
+    service -> OPDM.Client
+    interval -> seconds between prefetch cycles
+    max_workers -> concurrent downloads, queries and downloads are submitted with BACKGROUND priority to client scheduler
+    max_bytes_per_second -> download budget based on pmd:modelSize, None means unlimited
+    min_observations -> how many times an offset must be observed before it is prefetched
+    """
+
+    def __init__(self, service, schedule=None, interval=300, max_workers=1, max_bytes_per_second=None, min_observations=3):
+
+        self.service = service
+        self.schedule = schedule or []
+        self.interval = interval
+        self.max_workers = max_workers
+        self.min_observations = min_observations
+        self.budget = TokenBucket(max_bytes_per_second)
+
+        self.observations = Counter()
+        # Model id -> scenarioDate of the schedule item it was found with, only ids of items still in the schedule are kept
+        self.prefetched = {}
+        self.statistics = Counter()
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def observe(self, object_type, metadata_dict, now=None):
+        """Record a model opened by user, so the same time horizon and scenario hour offset can be prefetched in the future"""
+
+        scenario_date = metadata_dict.get("pmd:scenarioDate")
+        time_horizon = metadata_dict.get("pmd:timeHorizon")
+
+        if isinstance(scenario_date, dict):
+            scenario_date = scenario_date.get("value")
+
+        if not scenario_date or not time_horizon:
+            return
+
+        try:
+            scenario_date = datetime.fromisoformat(scenario_date.replace("Z", "+00:00"))
+        except ValueError:
+            logger.debug(f"Could not parse scenarioDate {scenario_date}, not learning from it")
+            return
+
+        if scenario_date.tzinfo is None:
+            scenario_date = scenario_date.replace(tzinfo=timezone.utc)
+
+        now = now or datetime.now(timezone.utc)
+        offset_hours = round((scenario_date - now).total_seconds() / 3600)
+
+        with self._lock:
+            self.observations[(object_type, time_horizon, offset_hours)] += 1
+
+    def learned_schedule(self, now=None):
+        """Schedule derived from observed user requests"""
+
+        now = (now or datetime.now(timezone.utc)).replace(minute=0, second=0, microsecond=0)
+
+        with self._lock:
+            observations = [key for key, count in self.observations.items() if count >= self.min_observations]
+
+        schedule = []
+        for object_type, time_horizon, offset_hours in observations:
+
+            # Only prefetch the future, past scenarios are already opened
+            if offset_hours < 0:
+                continue
+
+            # Scenarios are usually at half hour
+            timestamp = now + timedelta(hours=offset_hours, minutes=30)
+            schedule.extend(build_schedule([time_horizon], [timestamp], object_types=[object_type]))
+
+        return schedule
+
+    def current_schedule(self):
+        schedule = self.schedule() if callable(self.schedule) else list(self.schedule)
+        return schedule + self.learned_schedule()
+
+    def run_once(self):
+        """Run single prefetch cycle, returns number of models requested to OPDM client local storage"""
+
+        models = []
+        schedule = self.current_schedule()
+
+        # Models of scenarios that left the schedule window are not queried again, forget them
+        window = {_scenario_date(item) for item in schedule}
+        with self._lock:
+            for model_id in [model_id for model_id, scenario_date in self.prefetched.items() if scenario_date not in window]:
+                del self.prefetched[model_id]
+
+        for item in schedule:
+
+            if self._stop.is_set():
+                break
+
+            try:
+                # Queries wait behind interactive calls as well, same as downloads
+                response = self.service.submit("query_object", item["object_type"], metadata_dict=dict(item["metadata_dict"]), priority="BACKGROUND").result()
+            except Exception as error:
+                logger.warning(f"Prefetch query failed for {item} -> {error}")
+                self.statistics["query_errors"] += 1
+                continue
+
+            self.statistics["queries"] += 1
+
+            parts = response['sm:QueryResult']['sm:part']
+
+            # Remove first part of the response, it is the id of the original query
+            for part in parts[1:]:
+                model = part.get('opdm:OPDMObject') if isinstance(part, dict) else None
+
+                if model is None:
+                    continue
+
+                with self._lock:
+                    if model['opde:Id'] in self.prefetched:
+                        continue
+                    self.prefetched[model['opde:Id']] = _scenario_date(item)
+
+                models.append(model)
+
+        if models:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                list(executor.map(self._download, models))
+
+        return len(models)
+
+    def _download(self, model):
+
+        model_id = model['opde:Id']
+        size = int(model.get('pmd:modelSize') or 0)
+
+        if not self.budget.consume(size, stop_event=self._stop):
+            with self._lock:
+                self.prefetched.pop(model_id, None)
+            return
+
+        try:
+            logger.debug(f"Prefetching {model.get('pmd:fileName', model_id)}")
+            # Lowest priority class, so interactive calls submitted to the same client are always served first
+            self.service.submit("get_content", model_id, object_type="model", priority="BACKGROUND").result()
+
+            with self._lock:
+                self.statistics["downloads"] += 1
+                self.statistics["bytes"] += size
+
+        except Exception as error:
+            logger.warning(f"Prefetch download failed for {model_id} -> {error}")
+
+            # Allow retry in next cycle
+            with self._lock:
+                self.statistics["download_errors"] += 1
+                self.prefetched.pop(model_id, None)
+
+    def _run(self):
+
+        while not self._stop.is_set():
+
+            try:
+                count = self.run_once()
+                logger.info(f"Prefetch cycle requested {count} models")
+            except Exception as error:
+                logger.error(f"Prefetch cycle failed -> {error}")
+
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start prefetching in background thread"""
+
+        if self._thread is not None and self._thread.is_alive():
+            return self
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="OPDM-prefetcher", daemon=True)
+        self._thread.start()
+
+        return self
+
+    def stop(self, timeout=None):
+        """Stop background prefetching, in-flight downloads are allowed to finish"""
+
+        self._stop.set()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
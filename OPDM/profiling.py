@@ -0,0 +1,241 @@
+import os
+import io
+import atexit
+import pstats
+import random
+import cProfile
+import fnmatch
+import threading
+import tracemalloc
+from collections import Counter
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Limits for collapsed stack output, profiles of recursive code would explode otherwise
+MAX_STACK_DEPTH = 64
+
+
+def _function_name(function):
+    file_name, line, name = function
+
+    if file_name == "~":
+        return name
+
+    return f"{name} ({os.path.basename(file_name)}:{line})"
+
+
+def collapsed_stacks(stats):
+    """
+    Convert pstats.Stats to collapsed stack lines "root;child;grandchild microseconds" used by flamegraph.pl and speedscope.
+    cProfile keeps only caller -> callee pairs, so time of function called from several places is split by share of each caller.
+    """
+
+    entries = stats.stats
+    callees = {}
+
+    for function, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((function, edge[3]))
+
+    roots = [function for function, (_, _, _, _, callers) in entries.items() if not callers]
+    stacks = Counter()
+
+    def walk(function, stack, scale):
+
+        if len(stack) >= MAX_STACK_DEPTH:
+            return
+
+        self_time = entries[function][2]
+        stack = stack + [_function_name(function)]
+
+        stacks[";".join(stack)] += self_time * scale
+
+        for callee, edge_cumulative_time in callees.get(function, []):
+            callee_cumulative_time = entries[callee][3]
+
+            if not callee_cumulative_time or _function_name(callee) in stack:
+                continue
+
+            # Share of callee time spent under this caller, scaled by share of the caller time on this stack
+            walk(callee, stack, scale * edge_cumulative_time / callee_cumulative_time)
+
+    for root in roots:
+        walk(root, [], 1.0)
+
+    return [f"{stack} {int(seconds * 1e6)}" for stack, seconds in stacks.items() if int(seconds * 1e6) > 0]
+
+
+class Profiler:
+    """
+    Profile selected client operations with cProfile and tracemalloc, results are aggregated per operation name.
+    Only one operation is profiled at a time, operations started meanwhile in other threads are not profiled.
+
+    operations -> operation names or wildcards, SOAP operations (Query, GetContent, PublicationRequest...) and client methods (query_object, get_content...), all by default
+    sample_rate -> share of selected operations profiled
+    memory -> take tracemalloc snapshots before and after operation, slows operations down considerably
+    output_dir -> if set, profiles are written there on interpreter exit, see write()
+
+    Without code change, set environment variables before starting python:
+    OPDM_PROFILE=Query,GetContent  OPDM_PROFILE_RATE=0.1  OPDM_PROFILE_MEMORY=1  OPDM_PROFILE_DIR=/tmp/opdm_profiles
+    """
+
+    def __init__(self, operations=("*",), sample_rate=1.0, memory=False, output_dir=None):
+
+        if isinstance(operations, str):
+            operations = [operations]
+
+        self.operations = list(operations)
+        self.sample_rate = sample_rate
+        self.memory = memory
+        self.output_dir = output_dir
+
+        self.stats = {}
+        self.counts = Counter()
+        self.allocations = {}
+        self.peak_memory = Counter()
+
+        self._active = threading.Lock()
+        self._lock = threading.Lock()
+
+        if output_dir:
+            atexit.register(self.write, output_dir)
+
+    @classmethod
+    def from_environment(cls, environ=os.environ):
+        """Profiler configured by OPDM_PROFILE* environment variables or None when OPDM_PROFILE is not set"""
+
+        operations = environ.get("OPDM_PROFILE")
+
+        if not operations:
+            return None
+
+        return cls(operations=[name.strip() for name in operations.split(",") if name.strip()],
+                   sample_rate=float(environ.get("OPDM_PROFILE_RATE", 1.0)),
+                   memory=environ.get("OPDM_PROFILE_MEMORY", "0").lower() in ("1", "true", "yes"),
+                   output_dir=environ.get("OPDM_PROFILE_DIR"))
+
+    def selected(self, operation):
+        return any(fnmatch.fnmatchcase(operation, pattern) for pattern in self.operations)
+
+    def start(self, exchange):
+
+        if not self.selected(exchange["operation"]) or random.random() >= self.sample_rate:
+            return
+
+        if not self._active.acquire(blocking=False):
+            return
+
+        state = {}
+
+        if self.memory:
+            # Tracing started here is stopped in finish, tracing started by the application is left running
+            state["stop_tracing"] = not tracemalloc.is_tracing()
+            if state["stop_tracing"]:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            state["memory_start"] = tracemalloc.get_traced_memory()[0]
+            state["snapshot"] = self._snapshot()
+
+        profile = cProfile.Profile()
+        state["profile"] = profile
+        exchange["profile"] = state
+
+        try:
+            profile.enable()
+        except ValueError as error:
+            # Another profiler is active in this process
+            logger.warning(f"Profiling of {exchange['operation']} not possible -> {error}")
+            exchange.pop("profile")
+            if state.get("stop_tracing"):
+                tracemalloc.stop()
+            self._active.release()
+
+    @staticmethod
+    def _snapshot():
+        """Snapshot without allocations of tracemalloc itself"""
+        return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+    def finish(self, exchange):
+
+        state = exchange.pop("profile", None)
+
+        if state is None:
+            return
+
+        try:
+            state["profile"].disable()
+            operation = exchange["operation"]
+
+            if self.memory:
+                peak = tracemalloc.get_traced_memory()[1] - state["memory_start"]
+                differences = self._snapshot().compare_to(state["snapshot"], "lineno")
+
+            with self._lock:
+                self.counts[operation] += 1
+
+                if operation in self.stats:
+                    self.stats[operation].add(state["profile"])
+                else:
+                    self.stats[operation] = pstats.Stats(state["profile"])
+
+                if self.memory:
+                    self.peak_memory[operation] = max(self.peak_memory[operation], peak)
+                    allocations = self.allocations.setdefault(operation, Counter())
+
+                    for difference in differences:
+                        if difference.size_diff > 0:
+                            frame = difference.traceback[0]
+                            allocations[f"{frame.filename}:{frame.lineno}"] += difference.size_diff
+        finally:
+            if state.get("stop_tracing"):
+                tracemalloc.stop()
+            self._active.release()
+
+    def report(self, operation, sort="cumulative", limit=30):
+        """pstats text report of operation"""
+
+        with self._lock:
+            stats = self.stats.get(operation)
+
+            if stats is None:
+                return ""
+
+            output = io.StringIO()
+            stats.stream = output
+            stats.sort_stats(sort).print_stats(limit)
+
+        return output.getvalue()
+
+    def summary(self):
+        """Per operation number of profiles, total profiled seconds, peak memory growth and top allocating lines"""
+
+        with self._lock:
+            return {operation: {"count": self.counts[operation],
+                                "total_time": stats.total_tt,
+                                "peak_memory": self.peak_memory.get(operation),
+                                "top_allocations": self.allocations.get(operation, Counter()).most_common(10)}
+                    for operation, stats in self.stats.items()}
+
+    def write(self, output_dir=None):
+        """Write <operation>.pstats (open with pstats, snakeviz) and <operation>.collapsed (flamegraph.pl, speedscope) per operation, returns list of paths"""
+
+        output_dir = output_dir or self.output_dir or "."
+        os.makedirs(output_dir, exist_ok=True)
+        paths = []
+
+        with self._lock:
+            for operation, stats in self.stats.items():
+                path = os.path.join(output_dir, operation)
+
+                stats.dump_stats(f"{path}.pstats")
+
+                with open(f"{path}.collapsed", "w", encoding="utf-8") as file_object:
+                    file_object.write("\n".join(collapsed_stacks(stats)) + "\n")
+
+                paths.extend([f"{path}.pstats", f"{path}.collapsed"])
+
+        if paths:
+            logger.info(f"Profiles written to {output_dir}")
+
+        return paths
@@ -0,0 +1,146 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from OPDM.OPDM_SOAP_API import parse_subscriptions, _metadata_value
+
+import logging
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("SUBSCRIBED", "PENDING")
+
+
+def _normalize_spec(item):
+
+    spec = {"subscription_id": item["subscription_id"],
+            "object_type": item.get("object_type", "BDS"),
+            "mode": item.get("mode", "DIRECT_CONTENT"),
+            "metadata_dict": item.get("metadata_dict") or {},
+            "publication_id": item.get("publication_id", ""),
+            "active": item.get("active", True)}
+
+    return spec
+
+
+def _same_definition(spec, current):
+
+    if spec["object_type"] != current["object_type"] or spec["mode"] != current["mode"]:
+        return False
+
+    if spec["publication_id"] and spec["publication_id"] != current["publication_id"]:
+        return False
+
+    normalize = lambda metadata_dict: {key: _metadata_value(value) for key, value in metadata_dict.items()}
+
+    return normalize(spec["metadata_dict"]) == normalize(current["metadata_dict"])
+
+
+def plan_subscriptions(service, spec, prune=False):
+    """
+    Compare desired subscriptions to subscriptions on OPDM client, returns list of changes
+
+    spec -> list of subscriptions, same arguments as publication_subscribe, subscription_id is mandatory
+    spec_example = [{"subscription_id": "IGM-1D", "object_type": "IGM", "mode": "DIRECT_CONTENT", "metadata_dict": {'pmd:timeHorizon': '1D'}},
+                    {"subscription_id": "BDS", "object_type": "BDS", "active": False}]
+    prune -> delete subscriptions that are not in spec
+
+    change_example = {"subscription_id": "IGM-1D", "steps": ["stop", "delete", "create"], "reason": "definition changed", "spec": {...}}
+    """
+
+    current = {item["subscription_id"]: item for item in parse_subscriptions(service.subscription_list("ALL")) if item["status"] != "DELETED"}
+    plan = []
+
+    for item in spec:
+        desired = _normalize_spec(item)
+        subscription_id = desired["subscription_id"]
+        existing = current.get(subscription_id)
+
+        if existing is None:
+            steps = ["create"] if desired["active"] else ["create", "stop"]
+            plan.append({"subscription_id": subscription_id, "steps": steps, "reason": "missing", "spec": desired})
+
+        elif not _same_definition(desired, existing):
+            steps = ["stop", "delete", "create"] if existing["status"] in ACTIVE_STATUSES else ["delete", "create"]
+
+            if not desired["active"]:
+                steps.append("stop")
+
+            plan.append({"subscription_id": subscription_id, "steps": steps, "reason": "definition changed", "spec": desired})
+
+        elif desired["active"] and existing["status"] not in ACTIVE_STATUSES:
+            plan.append({"subscription_id": subscription_id, "steps": ["start"], "reason": f"status {existing['status']}", "spec": desired})
+
+        elif not desired["active"] and existing["status"] in ACTIVE_STATUSES:
+            plan.append({"subscription_id": subscription_id, "steps": ["stop"], "reason": f"status {existing['status']}", "spec": desired})
+
+    if prune:
+        desired_ids = {item["subscription_id"] for item in spec}
+
+        for subscription_id, existing in current.items():
+            if subscription_id not in desired_ids:
+                steps = ["stop", "delete"] if existing["status"] in ACTIVE_STATUSES else ["delete"]
+                plan.append({"subscription_id": subscription_id, "steps": steps, "reason": "not in spec", "spec": None})
+
+    return plan
+
+
+def format_plan(plan):
+    """Human readable diff of the plan"""
+
+    if not plan:
+        return "No changes, subscriptions are up to date"
+
+    lines = []
+    for change in plan:
+        symbol = "+" if "create" in change["steps"] and "delete" not in change["steps"] else "-" if change["spec"] is None else "~"
+        lines.append(f"{symbol} {change['subscription_id']}: {' -> '.join(change['steps'])} ({change['reason']})")
+
+    return "\n".join(lines)
+
+
+def _apply_change(service, change):
+
+    result = {"subscription_id": change["subscription_id"], "steps": change["steps"], "ok": True, "error": None}
+    subscription_id = change["subscription_id"]
+
+    for step in change["steps"]:
+        try:
+            if step == "create":
+                spec = {key: value for key, value in change["spec"].items() if key != "active"}
+                if service.publication_subscribe(**spec) is None:
+                    raise ValueError("Subscription not valid for available publications")
+
+            elif step == "start":
+                service.publication_start_subscription(subscription_id)
+
+            elif step == "stop":
+                service.publication_stop_subscription(subscription_id)
+
+            elif step == "delete":
+                service.publication_delete_subscription(subscription_id)
+
+        except Exception as error:
+            logger.error(f"Subscription {subscription_id} step {step} failed -> {error}")
+            result["ok"] = False
+            result["error"] = f"{step}: {error}"
+            break
+
+    return result
+
+
+def reconcile_subscriptions(service, spec, prune=False, dry_run=False, workers=8):
+    """
+    Bring subscriptions on OPDM client to state described by spec, only needed create, start, stop and delete operations are executed.
+    Changes of different subscriptions are applied in parallel, steps of one subscription in order.
+
+    Returns {"plan": [...], "results": [...]}, with dry_run=True only the plan is made, use format_plan(plan) to print it
+    """
+
+    plan = plan_subscriptions(service, spec, prune=prune)
+    logger.info(f"Subscription changes:\n{format_plan(plan)}")
+
+    if dry_run or not plan:
+        return {"plan": plan, "results": []}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lambda change: _apply_change(service, change), plan))
+
+    return {"plan": plan, "results": results}
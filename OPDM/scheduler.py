@@ -0,0 +1,260 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import logging
+logger = logging.getLogger(__name__)
+
+# From most to least urgent, weight defines the share of worker slots a class gets when all classes have queued work
+PRIORITY_WEIGHTS = {
+    "RT": 32,
+    "ID": 16,
+    "DA": 8,
+    "WA": 4,
+    "YR": 2,
+    "BACKGROUND": 1,
+}
+
+DEFAULT_PRIORITY = "DA"
+
+# Object types that are not bound to a time horizon
+OBJECT_TYPE_PRIORITIES = {
+    "BDS": "DA",
+    "RULESET": "WA",
+}
+
+
+def priority_class(metadata_dict=None, object_type=None):
+    """
+    Derive priority class from pmd:timeHorizon or object type
+
+    RT -> RT
+    ID -> ID
+    1D, 2D -> DA
+    01...31 -> WA
+    YR, MO and other long term horizons -> YR
+    """
+
+    time_horizon = (metadata_dict or {}).get("pmd:timeHorizon")
+
+    if isinstance(time_horizon, dict):
+        time_horizon = time_horizon.get("value")
+
+    if time_horizon:
+        if time_horizon in ("RT", "ID"):
+            return time_horizon
+
+        if time_horizon in ("1D", "2D"):
+            return "DA"
+
+        if time_horizon.isdigit():
+            return "WA"
+
+        return "YR"
+
+    if isinstance(object_type, str):
+        return OBJECT_TYPE_PRIORITIES.get(object_type, DEFAULT_PRIORITY)
+
+    return DEFAULT_PRIORITY
+
+
+class _QueueClass:
+
+    def __init__(self, name, weight):
+        self.name = name
+        self.weight = weight
+        self.queue = deque()
+        self.pass_value = 0.0
+
+        # Metrics
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+
+class PriorityScheduler:
+    """
+    Run callables on a fixed pool of worker threads, ordering queued work by priority class.
+
+    Classes share workers by weight (stride scheduling), so urgent classes are served first but long backfills still progress.
+    Work that is already running is never interrupted, only queued work can be overtaken or cancelled.
+    """
+
+    def __init__(self, max_workers=4, weights=None):
+
+        self.max_workers = max_workers
+        self.classes = {name: _QueueClass(name, weight) for name, weight in (weights or PRIORITY_WEIGHTS).items()}
+
+        self._condition = threading.Condition()
+        self._workers = []
+        self._shutdown = False
+        self._in_flight = 0
+        self._virtual_time = 0.0
+
+    def submit(self, function, *args, priority=DEFAULT_PRIORITY, **kwargs):
+        """Queue function call under priority class, returns concurrent.futures.Future"""
+
+        if priority not in self.classes:
+            raise ValueError(f"Unsupported priority '{priority}', supported priorities are: {list(self.classes.keys())}")
+
+        future = Future()
+
+        with self._condition:
+
+            if self._shutdown:
+                raise RuntimeError("Cannot submit to scheduler after shutdown")
+
+            queue_class = self.classes[priority]
+
+            # Class that was idle must not collect credit nor carry debt from the idle period
+            if not queue_class.queue:
+                queue_class.pass_value = self._virtual_time
+
+            queue_class.queue.append((future, function, args, kwargs, time.monotonic()))
+            queue_class.submitted += 1
+
+            self._start_workers()
+            self._condition.notify()
+
+        return future
+
+    def cancel(self, priority=None, predicate=None):
+        """
+        Cancel queued (not in-flight) work, returns number of cancelled calls
+
+        priority -> class name or list of class names, None means all classes
+        predicate -> optional function(function, args, kwargs) returning True for calls to cancel
+        """
+
+        if priority is None:
+            names = list(self.classes.keys())
+        elif isinstance(priority, str):
+            names = [priority]
+        else:
+            names = list(priority)
+
+        cancelled = 0
+
+        with self._condition:
+            for name in names:
+                queue_class = self.classes[name]
+                kept = deque()
+
+                for item in queue_class.queue:
+                    future, function, args, kwargs, _ = item
+
+                    if predicate is None or predicate(function, args, kwargs):
+                        future.cancel()
+                        cancelled += 1
+                        queue_class.cancelled += 1
+                    else:
+                        kept.append(item)
+
+                queue_class.queue = kept
+
+        logger.debug(f"Cancelled {cancelled} queued calls")
+
+        return cancelled
+
+    def metrics(self):
+        """Per class queue depth, throughput and wait time metrics"""
+
+        with self._condition:
+            metrics = {}
+
+            for name, queue_class in self.classes.items():
+                started = queue_class.completed + queue_class.failed
+                metrics[name] = {
+                    "queue_depth": len(queue_class.queue),
+                    "submitted": queue_class.submitted,
+                    "completed": queue_class.completed,
+                    "failed": queue_class.failed,
+                    "cancelled": queue_class.cancelled,
+                    "wait_time_avg": queue_class.wait_time_total / started if started else 0.0,
+                    "wait_time_max": queue_class.wait_time_max,
+                    "oldest_wait": time.monotonic() - queue_class.queue[0][4] if queue_class.queue else 0.0,
+                }
+
+            metrics["in_flight"] = self._in_flight
+
+        return metrics
+
+    def shutdown(self, wait=True, cancel_queued=False):
+
+        if cancel_queued:
+            self.cancel()
+
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def _start_workers(self):
+        self._workers = [worker for worker in self._workers if worker.is_alive()]
+
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(target=self._work, name=f"OPDM-scheduler-{len(self._workers)}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _next(self):
+        """Pick next call from the non empty class with lowest pass value, must be called with condition held"""
+
+        queue_class = min((queue_class for queue_class in self.classes.values() if queue_class.queue), key=lambda item: item.pass_value, default=None)
+
+        if queue_class is None:
+            return None, None
+
+        self._virtual_time = queue_class.pass_value
+        queue_class.pass_value += 1.0 / queue_class.weight
+
+        return queue_class, queue_class.queue.popleft()
+
+    def _work(self):
+
+        while True:
+            with self._condition:
+                queue_class, item = self._next()
+
+                while item is None:
+                    if self._shutdown:
+                        return
+                    self._condition.wait()
+                    queue_class, item = self._next()
+
+                future, function, args, kwargs, queued_time = item
+
+                wait_time = time.monotonic() - queued_time
+                queue_class.wait_time_total += wait_time
+                queue_class.wait_time_max = max(queue_class.wait_time_max, wait_time)
+                self._in_flight += 1
+
+            if not future.set_running_or_notify_cancel():
+                with self._condition:
+                    self._in_flight -= 1
+                    queue_class.cancelled += 1
+                continue
+
+            try:
+                result = function(*args, **kwargs)
+            except BaseException as error:
+                future.set_exception(error)
+                succeeded = False
+            else:
+                future.set_result(result)
+                succeeded = True
+
+            with self._condition:
+                self._in_flight -= 1
+
+                if succeeded:
+                    queue_class.completed += 1
+                else:
+                    queue_class.failed += 1
@@ -0,0 +1,431 @@
+"""
+Deterministic synthetic OPDM catalogue and payloads for benchmarks and the mock server
+
+Objects are generated lazily, so catalogues of millions of profiles can be streamed to disk without holding them in memory.
+Same arguments and seed always produce the same ID-s, metadata and file content.
+
+    catalogue = SyntheticCatalogue(tsos=40, time_horizons=("1D", "2D", "ID"), start="2024-01-01", days=30)
+    print(catalogue.count())
+    catalogue.write_query_result("query_result.xml")
+    catalogue.write_payloads("payloads", limit=100)
+
+From command line
+    python -m OPDM.synthetic --tsos 40 --days 30 --output synthetic
+"""
+import io
+import os
+import uuid
+import base64
+import random
+import zipfile
+import argparse
+from itertools import islice
+from datetime import datetime, timedelta, timezone
+from xml.sax.saxutils import escape, quoteattr
+
+import logging
+logger = logging.getLogger(__name__)
+
+NAMESPACES = {"sm": "http://entsoe.eu/opde/ServiceModel/1/0",
+              "opde": "http://entsoe.eu/opde/ObjectModel/1/0",
+              "opdm": "http://entsoe.eu/opdm/ObjectModel/1/0",
+              "pmd": "http://entsoe.eu/opdm/ProfileMetaData/1/0",
+              "publication": "http://entsoe.eu/opdm/PublicationReport/1/0"}
+
+NAMESPACE_DECLARATIONS = " ".join(f'xmlns:{prefix}="{uri}"' for prefix, uri in NAMESPACES.items())
+
+CGMES_PROFILES = {"EQ": "http://entsoe.eu/CIM/EquipmentCore/3/1",
+                  "SSH": "http://entsoe.eu/CIM/SteadyStateHypothesis/1/1",
+                  "TP": "http://entsoe.eu/CIM/Topology/4/1",
+                  "SV": "http://entsoe.eu/CIM/StateVariables/4/1"}
+
+# Share of model size per profile
+PROFILE_SHARES = {"EQ": 0.5, "SSH": 0.15, "TP": 0.15, "SV": 0.2}
+
+OFFICIAL_NODE = "10V1001C--00100Q"
+
+# Processing steps of uploaded file in order, as (start field, end field, typical seconds)
+PIPELINE = [("pmd:file-uploaded-time", "pmd:file-validation-start-time", 5),
+            ("pmd:file-validation-start-time", "pmd:file-validation-end-time", 30),
+            ("pmd:file-validation-end-time", "pmd:model-assembly-start-time", 10),
+            ("pmd:model-assembly-start-time", "pmd:model-assembly-end-time", 20),
+            ("pmd:model-assembly-end-time", "pmd:model-validation-start-time", 2),
+            ("pmd:model-validation-start-time", "pmd:model-validation-end-time", 60),
+            ("pmd:model-validation-end-time", "pmd:model-submission-start-time", 2),
+            ("pmd:model-submission-start-time", "pmd:model-submission-ack-time", 15),
+            ("pmd:model-submission-ack-time", "pmd:model-publication-start-time", 10)]
+
+
+def to_xml(name, value):
+    """Serialize xmltodict style structure to XML string, "@name" keys are attributes and "#text" is element text"""
+
+    if isinstance(value, list):
+        return "".join(to_xml(name, item) for item in value)
+
+    if not isinstance(value, dict):
+        return f"<{name}>{escape(str(value))}</{name}>"
+
+    attributes = "".join(f" {key[1:]}={quoteattr(str(item))}" for key, item in value.items() if key.startswith("@"))
+    content = escape(str(value["#text"])) if "#text" in value else ""
+    content += "".join(to_xml(key, item) for key, item in value.items() if not key.startswith("@") and key != "#text")
+
+    return f"<{name}{attributes}>{content}</{name}>"
+
+
+def _time(value):
+    return f"{value:%Y-%m-%dT%H:%M:%SZ}"
+
+
+def _uuid(generator):
+    return str(uuid.UUID(int=generator.getrandbits(128), version=4))
+
+
+def cgmes_xml(profile, size):
+    """CGMES like RDF/XML document of about size bytes, content is derived from profile ID"""
+
+    generator = random.Random(profile["opde:Id"])
+    name = profile.get("pmd:cgmesProfile", "EQ")
+
+    header = (f'<?xml version="1.0" encoding="UTF-8"?>\n'
+              f'<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns:cim="http://iec.ch/TC57/2013/CIM-schema-cim16#" '
+              f'xmlns:md="http://iec.ch/TC57/61970-552/ModelDescription/1#">\n'
+              f'<md:FullModel rdf:about="urn:uuid:{profile.get("pmd:modelid", profile["opde:Id"])}">'
+              f'<md:Model.scenarioTime>{profile.get("pmd:scenarioDate", "")}</md:Model.scenarioTime>'
+              f'<md:Model.profile>{CGMES_PROFILES.get(name, "")}</md:Model.profile></md:FullModel>\n')
+    footer = "</rdf:RDF>\n"
+
+    elements = []
+    length = len(header) + len(footer)
+    number = 0
+
+    while length < size:
+        number += 1
+        element = (f'<cim:ACLineSegment rdf:ID="_{_uuid(generator)}"><cim:IdentifiedObject.name>LINE {number}</cim:IdentifiedObject.name>'
+                   f'<cim:ACLineSegment.r>{generator.uniform(0.1, 10):.4f}</cim:ACLineSegment.r>'
+                   f'<cim:ACLineSegment.x>{generator.uniform(1, 100):.4f}</cim:ACLineSegment.x></cim:ACLineSegment>\n')
+        elements.append(element)
+        length += len(element)
+
+    return (header + "".join(elements) + footer).encode()
+
+
+def cgmes_zip(profile, size=None):
+    """Zip file bytes with one CGMES like XML file, size is size of the XML (by default pmd:profileSize)"""
+
+    size = int(profile.get("pmd:profileSize", 10_000)) if size is None else size
+    file_name = profile.get("pmd:fileName", f"{profile['opde:Id']}.zip")
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        # Fixed date keeps the zip bytes deterministic
+        info = zipfile.ZipInfo(file_name.replace(".zip", ".xml"), date_time=(2020, 1, 1, 0, 0, 0))
+        info.compress_type = zipfile.ZIP_DEFLATED
+        archive.writestr(info, cgmes_xml(profile, size))
+
+    return buffer.getvalue()
+
+
+class SyntheticCatalogue:
+    """
+    IGM OPDMObjects for every TSO, time horizon and scenario hour with several versions, plus boundary and ruleset objects
+
+    tsos -> number of TSO-s or list of TSO names
+    time_horizons -> pmd:timeHorizon values, all hourly
+    start, days -> scenario date range, start is date string or datetime (UTC)
+    hours -> scenario hours of day
+    max_versions -> every model has 1 to max_versions versions, each newer version supersedes the previous one
+    model_size -> bytes of all profiles of a model together, written as pmd:modelSize and split to pmd:profileSize
+    rulesets -> ruleset library versions, published by official_node
+    seed -> changes all generated ID-s and values
+    """
+
+    def __init__(self, tsos=3, time_horizons=("1D", "ID"), start="2024-01-01", days=1, hours=range(24), max_versions=2, model_size=5_000_000,
+                 rulesets=("2.0.1", "2.0.2"), official_node=OFFICIAL_NODE, seed=0):
+
+        self.tsos = [f"TSO{number:02d}" for number in range(1, tsos + 1)] if isinstance(tsos, int) else list(tsos)
+        self.time_horizons = list(time_horizons)
+        self.start = datetime.fromisoformat(start) if isinstance(start, str) else start
+        self.start = self.start.replace(tzinfo=timezone.utc) if self.start.tzinfo is None else self.start
+        self.days = days
+        self.hours = list(hours)
+        self.max_versions = max_versions
+        self.model_size = model_size
+        self.rulesets = list(rulesets)
+        self.official_node = official_node
+        self.seed = seed
+
+    def _generator(self, *key):
+        return random.Random("-".join(str(item) for item in (self.seed,) + key))
+
+    def boundary_id(self, scenario):
+        return str(uuid.UUID(int=self._generator("BDS", scenario.year, scenario.month).getrandbits(128), version=4))
+
+    def count(self):
+        """Number of (IGM objects, profiles), counted without generating them"""
+
+        objects = 0
+        for day in range(self.days):
+            for tso in self.tsos:
+                for time_horizon in self.time_horizons:
+                    for hour in self.hours:
+                        objects += self._versions(tso, time_horizon, self._scenario(day, hour))
+
+        return objects, objects * len(CGMES_PROFILES)
+
+    def _scenario(self, day, hour):
+        return self.start + timedelta(days=day, hours=hour, minutes=30)
+
+    def _versions(self, tso, time_horizon, scenario):
+        return self._generator("versions", tso, time_horizon, scenario).randint(1, self.max_versions)
+
+    def _pipeline(self, generator, uploaded):
+        """Processing timestamps of the pipeline with random durations around typical values"""
+
+        times = {}
+        current = uploaded
+
+        for start_field, end_field, seconds in PIPELINE:
+            times.setdefault(start_field, _time(current))
+            current += timedelta(seconds=generator.expovariate(1 / seconds))
+            times[end_field] = _time(current)
+
+        return times
+
+    def _profile(self, generator, model, name, pipeline):
+
+        tso, time_horizon, scenario, version = model["pmd:TSO"], model["pmd:timeHorizon"], model["pmd:scenarioDate"], model["pmd:version"]
+        scenario_time = datetime.strptime(scenario, "%Y-%m-%dT%H:%M:%SZ")
+        file_name = f"{scenario_time:%Y%m%dT%H%MZ}_{time_horizon}_{tso}_{name}_{version}.zip"
+
+        profile = {"opde:Id": _uuid(generator),
+                   "opde:Object-Type": "IGM",
+                   "pmd:fileName": file_name,
+                   "pmd:cgmesProfile": name,
+                   "pmd:modelProfile": CGMES_PROFILES[name],
+                   "pmd:TSO": tso,
+                   "pmd:modelPartReference": tso,
+                   "pmd:modelingAuthoritySet": f"http://www.{tso.lower()}.eu/OperationalPlanning",
+                   "pmd:timeHorizon": time_horizon,
+                   "pmd:scenarioDate": scenario,
+                   "pmd:validFrom": f"{scenario_time:%Y%m%dT%H%MZ}",
+                   "pmd:creationDate": model["pmd:creationDate"],
+                   "pmd:version": version,
+                   "pmd:versionNumber": version,
+                   "pmd:contentType": "CGMES",
+                   "pmd:isFullModel": "true",
+                   "pmd:modelid": _uuid(generator),
+                   "pmd:fullModel_ID": model["opde:Id"],
+                   "pmd:description": f"{tso} {name} {time_horizon}",
+                   "pmd:profileSize": str(int(self.model_size * PROFILE_SHARES[name])),
+                   "pmd:conversationId": str(generator.randint(-2 ** 31, 2 ** 31)),
+                   "pmd:content-reference": f"CGMES/{time_horizon}/{tso}/{scenario_time:%Y%m%d}/{scenario_time:%H%M%S}/{name}/{file_name}",
+                   "opde:Context": model["opde:Context"]}
+        profile.update(pipeline)
+
+        return {"opdm:Profile": profile}
+
+    def _model(self, tso, time_horizon, scenario, version, previous_id):
+
+        generator = self._generator("IGM", tso, time_horizon, scenario, version)
+        version_text = f"{version:03d}"
+
+        # Models are created before the scenario, day ahead models about a day before and intraday models some hours before
+        lead_hours = {"ID": 2, "1D": 20, "2D": 44}.get(time_horizon, 24 * 7)
+        created = scenario - timedelta(hours=lead_hours - version, minutes=generator.randint(0, 59))
+        pipeline = self._pipeline(generator, created)
+
+        model = {"opde:Id": _uuid(generator),
+                 "opde:Object-Type": "IGM",
+                 "pmd:TSO": tso,
+                 "pmd:modelPartReference": tso,
+                 "pmd:modelingAuthoritySet": f"http://www.{tso.lower()}.eu/OperationalPlanning",
+                 "pmd:timeHorizon": time_horizon,
+                 "pmd:scenarioDate": _time(scenario),
+                 "pmd:validFrom": f"{scenario:%Y%m%dT%H%MZ}",
+                 "pmd:creationDate": _time(created),
+                 "pmd:version": version_text,
+                 "pmd:versionNumber": version_text,
+                 "pmd:fileName": f"{scenario:%Y%m%dT%H%MZ}_{time_horizon}_{tso}_{version_text}",
+                 "pmd:contentType": "CGMES",
+                 "pmd:isFullModel": "true",
+                 "pmd:modelSize": str(self.model_size),
+                 "pmd:RulesetLibraryVersion": self.rulesets[-1] if self.rulesets else "",
+                 "pmd:qualityIndicator": generator.choice(["Valid", "Valid", "Valid", "Warning"]),
+                 "pmd:description": f"{tso} individual grid model",
+                 "opde:Context": {"opde:IsOfficial": "true",
+                                  "opde:EDXContext": {"opde:SenderToolboxCode": f"10V-{tso}",
+                                                      "opde:MessageID": _uuid(generator)}}}
+        model.update(pipeline)
+
+        dependencies = {"opde:DependsOn": self.boundary_id(scenario)}
+        if previous_id:
+            dependencies["opde:Supersedes"] = previous_id
+
+        model["opde:Component"] = [self._profile(generator, model, name, pipeline) for name in CGMES_PROFILES]
+        model["opde:Dependencies"] = dependencies
+
+        return model
+
+    def iter_models(self):
+        """IGM OPDMObjects ordered by day, TSO, time horizon, hour and version"""
+
+        for day in range(self.days):
+            for tso in self.tsos:
+                for time_horizon in self.time_horizons:
+                    for hour in self.hours:
+                        scenario = self._scenario(day, hour)
+                        previous_id = None
+
+                        for version in range(1, self._versions(tso, time_horizon, scenario) + 1):
+                            model = self._model(tso, time_horizon, scenario, version, previous_id)
+                            previous_id = model["opde:Id"]
+                            yield model
+
+    def iter_boundaries(self):
+        """One boundary set per month of the date range"""
+
+        months = sorted({(day.year, day.month) for day in (self.start + timedelta(days=number) for number in range(self.days))})
+
+        for year, month in months:
+            scenario = datetime(year, month, 1, tzinfo=timezone.utc)
+            generator = self._generator("BDS", year, month, "profiles")
+            boundary = {"opde:Id": self.boundary_id(scenario),
+                        "opde:Object-Type": "BDS",
+                        "pmd:scenarioDate": _time(scenario),
+                        "pmd:creationDate": _time(scenario - timedelta(days=5)),
+                        "pmd:version": "001",
+                        "pmd:versionNumber": "001",
+                        "pmd:fileName": f"{scenario:%Y%m%dT%H%MZ}__ENTSOE_BD_001",
+                        "opde:Context": {"opde:IsOfficial": "true"}}
+            boundary["opde:Component"] = [{"opdm:Profile": {"opde:Id": _uuid(generator),
+                                                            "opde:Object-Type": "BDS",
+                                                            "pmd:fileName": f"{scenario:%Y%m%dT%H%MZ}__ENTSOE_{name}_001.zip",
+                                                            "pmd:cgmesProfile": name,
+                                                            "pmd:scenarioDate": _time(scenario),
+                                                            "pmd:version": "001",
+                                                            "pmd:profileSize": "200000"}} for name in ("EQBD", "TPBD")]
+            yield boundary
+
+    def iter_rulesets(self):
+
+        for version in self.rulesets:
+            generator = self._generator("RULESET", version)
+            yield {"opde:Id": _uuid(generator),
+                   "opde:Object-Type": "RULESET",
+                   "pmd:version": version,
+                   "pmd:fileName": f"QAS_RSL_{version}",
+                   "pmd:creationDate": _time(self.start),
+                   "opde:Component": [{"opdm:Profile": {"opde:Id": _uuid(generator),
+                                                        "opde:Object-Type": "RULESET",
+                                                        "pmd:fileName": f"QAS_RSL_{version}.zip",
+                                                        "pmd:version": version,
+                                                        "pmd:profileSize": "100000",
+                                                        "opde:Context": {"opde:EDXContext": {"opde:SenderToolboxCode": self.official_node}}}}]}
+
+    def objects(self):
+        """All OPDMObjects: models, boundaries and rulesets"""
+
+        yield from self.iter_models()
+        yield from self.iter_boundaries()
+        yield from self.iter_rulesets()
+
+    def profiles(self):
+        for item in self.objects():
+            for component in item["opde:Component"]:
+                yield component["opdm:Profile"]
+
+    def write_query_result(self, path_or_file, query_id="synthetic", limit=None, profiles=False):
+        """
+        Stream QueryResult XML as returned by query_object (or query_profile with profiles=True) to file, returns number of parts written
+
+        limit -> maximum number of objects or profiles
+        """
+
+        if isinstance(path_or_file, (str, os.PathLike)):
+            with open(path_or_file, "w", encoding="utf-8") as file_object:
+                return self.write_query_result(file_object, query_id, limit, profiles)
+
+        items = islice(self.profiles() if profiles else self.objects(), limit)
+        element = "opdm:Profile" if profiles else "opdm:OPDMObject"
+
+        path_or_file.write(f'<sm:QueryResult opdm-version="synthetic" {NAMESPACE_DECLARATIONS}><sm:part name="name">{escape(query_id)}</sm:part>')
+
+        written = 0
+        for item in items:
+            path_or_file.write(to_xml("sm:part", {element: item}))
+            written += 1
+
+        path_or_file.write("</sm:QueryResult>")
+
+        return written
+
+    def write_get_content_result(self, path_or_file, profiles, return_mode="PAYLOAD"):
+        """Stream GetContentResult XML for given profiles, with base64 encoded zip content in PAYLOAD mode"""
+
+        if isinstance(path_or_file, (str, os.PathLike)):
+            with open(path_or_file, "w", encoding="utf-8") as file_object:
+                return self.write_get_content_result(file_object, profiles, return_mode)
+
+        path_or_file.write(f'<sm:GetContentResult opdm-version="synthetic" {NAMESPACE_DECLARATIONS}><sm:part name="content-return-mode">{return_mode}</sm:part>')
+
+        for profile in profiles:
+            profile = dict(profile)
+
+            if return_mode == "PAYLOAD":
+                profile["opde:Content"] = base64.b64encode(cgmes_zip(profile)).decode()
+
+            path_or_file.write(to_xml("sm:part", {"opdm:Profile": profile}))
+
+        path_or_file.write("</sm:GetContentResult>")
+
+    def write_payloads(self, directory, limit=None):
+        """Write CGMES like zip file of every profile to directory, returns list of paths"""
+
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+
+        for profile in islice(self.profiles(), limit):
+            path = os.path.join(directory, profile["pmd:fileName"])
+
+            with open(path, "wb") as file_object:
+                file_object.write(cgmes_zip(profile))
+
+            paths.append(path)
+
+        return paths
+
+
+def main(arguments=None):
+
+    parser = argparse.ArgumentParser(description="Generate synthetic OPDM catalogue and payloads")
+    parser.add_argument("--tsos", type=int, default=3)
+    parser.add_argument("--time_horizons", default="1D,ID", help="comma separated time horizons")
+    parser.add_argument("--start", default="2024-01-01")
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--max_versions", type=int, default=2)
+    parser.add_argument("--model_size", type=int, default=5_000_000, help="bytes of all profiles of a model")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="synthetic", help="output directory")
+    parser.add_argument("--payloads", type=int, default=0, help="number of profile zip files to write")
+    arguments = parser.parse_args(arguments)
+
+    logging.basicConfig(format='%(asctime)s | %(name)s | %(levelname)s | %(message)s', level=logging.INFO)
+
+    catalogue = SyntheticCatalogue(tsos=arguments.tsos, time_horizons=arguments.time_horizons.split(","), start=arguments.start, days=arguments.days,
+                                   max_versions=arguments.max_versions, model_size=arguments.model_size, seed=arguments.seed)
+
+    os.makedirs(arguments.output, exist_ok=True)
+    objects, profiles = catalogue.count()
+    logger.info(f"Generating {objects} models with {profiles} profiles")
+
+    catalogue.write_query_result(os.path.join(arguments.output, "query_object_result.xml"))
+    catalogue.write_query_result(os.path.join(arguments.output, "query_profile_result.xml"), profiles=True)
+
+    if arguments.payloads:
+        catalogue.write_payloads(os.path.join(arguments.output, "payloads"), limit=arguments.payloads)
+
+    logger.info(f"Synthetic catalogue written to {arguments.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import os
+import json
+import time
+import threading
+from time import perf_counter
+from datetime import datetime, timezone
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Span kinds as named in OpenTelemetry
+SPAN_KINDS = {"client": "SpanKind.CLIENT", "internal": "SpanKind.INTERNAL"}
+
+
+def _new_id(size):
+    return "0x" + os.urandom(size).hex()
+
+
+def _attribute_value(value):
+    """OpenTelemetry attributes can only be primitives or lists of primitives"""
+
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+
+    if isinstance(value, (list, tuple, set)):
+        return [item if isinstance(item, (bool, int, float, str)) else str(item) for item in value]
+
+    return str(value)
+
+
+class FileExporter:
+    """Append finished spans as JSON lines to a file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, spans):
+
+        lines = "".join(json.dumps(span, default=str) + "\n" for span in spans)
+
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as file_object:
+                file_object.write(lines)
+
+
+class Tracer:
+    """
+    Build spans from observed client operations and pass them to exporter, span fields follow OpenTelemetry span JSON format
+    (name, context.trace_id, context.span_id, parent_id, kind, start_time, end_time, status, attributes, resource).
+
+    Client methods are INTERNAL spans, SOAP operations CLIENT spans with children for serialize (envelope build), http,
+    deserialize (zeep, including base64 decoding of binary fields) and parse (xmltodict).
+
+    exporter -> path of JSON lines file or callable that receives list of finished span dictionaries
+    service_name -> resource attribute service.name
+
+    service = OPDM.Client(server, tracing="opdm_spans.jsonl")
+
+    with service.span("download_closure", model_id=model_id):
+        ...
+    """
+
+    def __init__(self, exporter, service_name="OPDM"):
+
+        if isinstance(exporter, (str, os.PathLike)):
+            exporter = FileExporter(exporter)
+
+        self.exporter = exporter
+        self.resource = {"attributes": {"service.name": service_name}, "schema_url": ""}
+
+        # perf_counter is used for durations, this converts it to wall clock time
+        self._offset = time.time() - perf_counter()
+
+    def _timestamp(self, counter):
+        return datetime.fromtimestamp(self._offset + counter, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+    def _span(self, name, kind, trace_id, span_id, parent_id, start, end, attributes, error=None):
+
+        status = {"status_code": "UNSET"}
+        if error is not None:
+            status = {"status_code": "ERROR", "description": f"{type(error).__name__}: {error}"}
+
+        return {"name": name,
+                "context": {"trace_id": trace_id, "span_id": span_id, "trace_state": "[]"},
+                "kind": SPAN_KINDS.get(kind, "SpanKind.INTERNAL"),
+                "parent_id": parent_id,
+                "start_time": self._timestamp(start),
+                "end_time": self._timestamp(end),
+                "status": status,
+                "attributes": {key: _attribute_value(value) for key, value in attributes.items() if value is not None},
+                "events": [],
+                "links": [],
+                "resource": self.resource}
+
+    def start(self, exchange):
+
+        parent = exchange["parent"]
+
+        exchange["trace_id"] = parent["trace_id"] if parent and "trace_id" in parent else _new_id(16)
+        exchange["span_id"] = _new_id(8)
+
+    def finish(self, exchange):
+
+        parent = exchange["parent"]
+        parent_id = parent.get("span_id") if parent else None
+        trace_id, span_id = exchange["trace_id"], exchange["span_id"]
+
+        attributes = dict(exchange["attributes"])
+        children = []
+
+        def child(name, start, end, child_attributes=None):
+            if start is not None and end is not None:
+                children.append(self._span(name, "internal", trace_id, _new_id(8), span_id, start, end, child_attributes or {}))
+
+        if exchange["kind"] == "client":
+            attributes.update({"rpc.system": "soap", "rpc.method": exchange["operation"]})
+
+        if exchange["http_start"] is not None:
+            attributes.update({"http.request.body.size": exchange["request_bytes"],
+                               "http.response.body.size": exchange["response_bytes"],
+                               "http.response.status_code": exchange["status_code"]})
+
+            child("serialize", exchange["start"], exchange["http_start"])
+            child("http", exchange["http_start"], exchange["http_end"], {"http.request.body.size": exchange["request_bytes"],
+                                                                         "http.response.body.size": exchange["response_bytes"]})
+            child("deserialize", exchange["http_end"], exchange["deserialized"] or exchange["end"])
+
+        for step in exchange["phases"]:
+            child(step["name"], step["start"], step["end"], step["attributes"])
+
+        span = self._span(exchange["operation"], exchange["kind"], trace_id, span_id, parent_id, exchange["start"], exchange["end"], attributes, exchange["error"])
+
+        try:
+            self.exporter(children + [span])
+        except Exception as error:
+            logger.error(f"Span export failed -> {error}")
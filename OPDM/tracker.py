@@ -0,0 +1,186 @@
+import threading
+from concurrent.futures import Future
+
+from OPDM.OPDM_SOAP_API import parse_publication_report
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Status keywords of the last publication step that mean the processing of the file has ended
+FINAL_STATUSES = ("PUBLISHED", "SUCCESS", "COMPLETED", "REJECTED", "FAILED", "ERROR", "INVALID")
+
+
+def is_final(report):
+    """Default check, if publication report has reached final state"""
+
+    status = (report.get("status") or "").upper()
+
+    return any(final_status in status for final_status in FINAL_STATUSES)
+
+
+class PublicationTracker:
+    """
+    Follow publication of many uploaded files with batched GetProfilePublicationReport queries.
+
+    All pending files of the same kind (file name or model ID) are queried with one "is one of" filter per batch_size files,
+    so the number of report calls does not grow with the number of files. When nothing changes between polls the polling
+    interval grows by backoff factor up to max_interval and is reset to interval on any change.
+
+    callback -> function(report), called when a file reaches final state
+    final_check -> function(report) returning True for final reports, by default checks status against FINAL_STATUSES
+    """
+
+    def __init__(self, service, callback=None, interval=5, max_interval=60, backoff=1.5, batch_size=50, final_check=is_final):
+
+        self.service = service
+        self.callback = callback
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.batch_size = batch_size
+        self.final_check = final_check
+
+        self.current_interval = interval
+        self.report_calls = 0
+
+        # {("filename"|"model_id", value): {"future": Future, "report": last report or None}}
+        self.pending = {}
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def track(self, filename=None, model_id=None):
+        """Start tracking uploaded file by file name or model ID, returns Future resolved with the final report"""
+
+        if filename:
+            key = ("filename", filename)
+        elif model_id:
+            key = ("model_id", model_id)
+        else:
+            raise ValueError("filename or model_id needs to be defined to track publication")
+
+        with self._lock:
+            if key not in self.pending:
+                self.pending[key] = {"future": Future(), "report": None}
+
+            future = self.pending[key]["future"]
+
+        # New file, poll soon
+        self.current_interval = self.interval
+        self._wakeup.set()
+
+        return future
+
+    def track_many(self, filenames=(), model_ids=()):
+        """Track multiple files, returns dictionary of {filename or model_id: Future}"""
+
+        futures = {filename: self.track(filename=filename) for filename in filenames}
+        futures.update({model_id: self.track(model_id=model_id) for model_id in model_ids})
+
+        return futures
+
+    def poll_once(self):
+        """Query reports for all pending files, returns number of files that reached final state"""
+
+        with self._lock:
+            keys = list(self.pending.keys())
+
+        changed = False
+        finished = 0
+
+        for kind in ("filename", "model_id"):
+            values = [value for key_kind, value in keys if key_kind == kind]
+
+            for position in range(0, len(values), self.batch_size):
+                batch = values[position:position + self.batch_size]
+                value = batch[0] if len(batch) == 1 else {"operator": "is one of", "value": ",".join(batch)}
+
+                try:
+                    response = self.service.get_profile_publication_report(**{kind: value})
+                    self.report_calls += 1
+                except Exception as error:
+                    logger.warning(f"Publication report query failed for {len(batch)} files -> {error}")
+                    continue
+
+                if response is None:
+                    continue
+
+                for report in parse_publication_report(response):
+                    key = (kind, report[kind])
+
+                    # Single file query might not echo back the identifier
+                    if report[kind] is None and len(batch) == 1:
+                        key = (kind, batch[0])
+
+                    with self._lock:
+                        item = self.pending.get(key)
+
+                        if item is None:
+                            continue
+
+                        if item["report"] is None or item["report"]["steps"] != report["steps"]:
+                            changed = True
+
+                        item["report"] = report
+
+                        if not self.final_check(report):
+                            continue
+
+                        del self.pending[key]
+
+                    finished += 1
+                    logger.info(f"Publication of {key[1]} finished with status {report['status']}")
+                    item["future"].set_result(report)
+
+                    if self.callback:
+                        try:
+                            self.callback(report)
+                        except Exception as error:
+                            logger.error(f"Publication tracker callback failed for {key[1]} -> {error}")
+
+        if changed:
+            self.current_interval = self.interval
+        else:
+            self.current_interval = min(self.max_interval, self.current_interval * self.backoff)
+
+        return finished
+
+    def _run(self):
+
+        while not self._stop.is_set():
+
+            self._wakeup.clear()
+
+            if self.pending:
+                self.poll_once()
+
+            self._wakeup.wait(self.current_interval if self.pending else None)
+
+    def start(self):
+        """Start polling in background thread"""
+
+        if self._thread is not None and self._thread.is_alive():
+            return self
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="OPDM-publication-tracker", daemon=True)
+        self._thread.start()
+
+        return self
+
+    def stop(self, cancel_pending=False, timeout=None):
+
+        self._stop.set()
+        self._wakeup.set()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+        if cancel_pending:
+            with self._lock:
+                for item in self.pending.values():
+                    item["future"].cancel()
+                self.pending.clear()
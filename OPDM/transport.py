@@ -0,0 +1,122 @@
+import threading
+from time import perf_counter
+from contextlib import contextmanager, nullcontext
+
+from zeep.transports import Transport
+
+_local = threading.local()
+
+
+def current_exchange():
+    """Exchange of the operation running in current thread or None, when no observers are registered"""
+    return getattr(_local, "exchange", None)
+
+
+@contextmanager
+def observe(observers, operation, kind="client", **attributes):
+    """
+    Track one client operation for observers (metrics, tracing, capture, profiling)
+
+    Observers get start(exchange) before and finish(exchange) after the operation, the exchange dictionary contains
+    operation name, attributes, perf_counter timestamps (start, http_start, http_end, end), request and response bytes and error.
+
+    kind -> "client" for SOAP operations, "internal" for client methods and user defined spans grouping several operations
+    """
+
+    exchange = {"operation": operation,
+                "kind": kind,
+                "attributes": attributes,
+                "start": perf_counter(),
+                "http_start": None,
+                "http_end": None,
+                "deserialized": None,
+                "end": None,
+                "phases": [],
+                "request_bytes": 0,
+                "response_bytes": 0,
+                "request": None,
+                "response": None,
+                "request_headers": None,
+                "response_headers": None,
+                "status_code": None,
+                "error": None}
+
+    parent = current_exchange()
+    exchange["parent"] = parent
+    _local.exchange = exchange
+
+    for observer in observers:
+        observer.start(exchange)
+
+    try:
+        yield exchange
+
+    except BaseException as error:
+        exchange["error"] = error
+        raise
+
+    finally:
+        exchange["end"] = perf_counter()
+        _local.exchange = parent
+
+        for observer in reversed(observers):
+            observer.finish(exchange)
+
+
+@contextmanager
+def _phase(exchange, name, attributes):
+
+    start = perf_counter()
+
+    try:
+        yield
+    finally:
+        exchange["phases"].append({"name": name, "start": start, "end": perf_counter(), "attributes": attributes})
+
+
+def phase(name, **attributes):
+    """Record named step (parse, decode...) of the operation running in current thread, does nothing when it is not observed"""
+
+    exchange = current_exchange()
+
+    if exchange is None:
+        return nullcontext()
+
+    return _phase(exchange, name, attributes)
+
+
+class InstrumentedTransport(Transport):
+    """zeep transport that records timing, size and content of HTTP exchanges to the exchange of the current operation"""
+
+    def post(self, address, message, headers):
+
+        exchange = current_exchange()
+
+        if exchange is None:
+            return super().post(address, message, headers)
+
+        if isinstance(message, (bytes, str)):
+            exchange["request_bytes"] += len(message)
+            exchange["request"] = message
+        else:
+            message = self._count(message, exchange)
+
+        exchange["request_headers"] = headers
+        exchange["http_start"] = perf_counter()
+        response = super().post(address, message, headers)
+        exchange["http_end"] = perf_counter()
+
+        exchange["response_bytes"] += len(response.content)
+        exchange["response"] = response.content
+        exchange["response_headers"] = response.headers
+        exchange["status_code"] = response.status_code
+
+        return response
+
+    @staticmethod
+    def _count(chunks, exchange):
+        """Count bytes of streamed request body"""
+
+        for chunk in chunks:
+            exchange["request_bytes"] += len(chunk)
+            yield chunk
@@ -0,0 +1,278 @@
+import time
+import asyncio
+import threading
+from datetime import datetime, timezone
+
+import aniso8601
+
+from OPDM.OPDM_SOAP_API import as_list
+from OPDM.scheduler import priority_class
+
+import logging
+logger = logging.getLogger(__name__)
+
+# (minimum, maximum) polling interval in seconds per priority class derived from pmd:timeHorizon
+POLL_INTERVALS = {
+    "RT": (15, 120),
+    "ID": (30, 300),
+    "DA": (60, 900),
+    "WA": (300, 3600),
+    "YR": (900, 6 * 3600),
+    "BACKGROUND": (900, 6 * 3600),
+}
+
+# Watermark used when since is not a parseable timestamp
+_EARLIEST = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def _timestamp(value):
+    """pmd:creationDate string as aware UTC datetime, naive values are UTC, None if missing or not a timestamp"""
+
+    if not value:
+        return None
+
+    try:
+        timestamp = aniso8601.parse_datetime(value)
+    except (ValueError, NotImplementedError):
+        return None
+
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+
+    return timestamp.astimezone(timezone.utc)
+
+
+class _Watch:
+
+    def __init__(self, name, object_type, metadata_dict, callback, since, min_interval, max_interval):
+        self.name = name
+        self.object_type = object_type
+        self.metadata_dict = metadata_dict
+        self.callback = callback
+        self.watermark = since
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.next_poll = 0.0
+
+        # Objects with creation date equal to watermark, to filter out duplicates on next poll
+        self.seen_at_watermark = set()
+
+        # Objects without parseable creation date can not be compared to watermark, they are reported once
+        self.seen_without_date = set()
+
+        # Arrival cadence
+        self.last_arrival = None
+        self.cadence = None
+
+
+class SubscriptionWatcher:
+    """
+    Detect newly arrived models on OPDM client by polling query_object with pmd:creationDate watermark per filter,
+    so every poll returns only objects created after the previous poll.
+
+    Polling interval is adapted per watch: it starts from the minimum of the time horizon class (see POLL_INTERVALS),
+    grows when nothing arrives, resets on arrival and is aligned to the observed arrival cadence.
+
+    watcher = SubscriptionWatcher(service)
+    watcher.watch("IGM", {"pmd:timeHorizon": "1D"}, callback=lambda model: print(model["pmd:fileName"]))
+    watcher.start()
+
+    async for model in watcher.arrivals():
+        print(model["pmd:fileName"])
+    """
+
+    def __init__(self, service, backoff=1.5):
+
+        self.service = service
+        self.backoff = backoff
+        self.watches = {}
+        self.query_calls = 0
+
+        self._async_queues = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def watch(self, object_type="IGM", metadata_dict=None, callback=None, name=None, since=None, min_interval=None, max_interval=None):
+        """
+        Register filter to watch, returns name of the watch
+
+        since -> pmd:creationDate watermark string, by default current time so only new objects are reported
+        min_interval, max_interval -> override polling interval limits derived from pmd:timeHorizon
+        """
+
+        metadata_dict = dict(metadata_dict or {})
+        default_min, default_max = POLL_INTERVALS[priority_class(metadata_dict, object_type)]
+
+        if since is None:
+            since = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        name = name or f"{object_type}-{len(self.watches)}"
+
+        with self._lock:
+            self.watches[name] = _Watch(name, object_type, metadata_dict, callback, since, min_interval or default_min, max_interval or default_max)
+
+        self._wakeup.set()
+
+        return name
+
+    def unwatch(self, name):
+        with self._lock:
+            self.watches.pop(name, None)
+
+    def poll(self, name):
+        """Poll single watch, returns list of new objects"""
+
+        watch = self.watches[name]
+
+        query = dict(watch.metadata_dict)
+        query["pmd:creationDate"] = {"operator": "is after", "value": watch.watermark}
+
+        response = self.service.query_object(watch.object_type, metadata_dict=query)
+        self.query_calls += 1
+
+        new_objects = []
+        # Remove first part of the response, it is the id of the original query
+        for part in as_list(response['sm:QueryResult'].get('sm:part'))[1:]:
+            if isinstance(part, dict) and isinstance(part.get('opdm:OPDMObject'), dict):
+                new_objects.append(part['opdm:OPDMObject'])
+
+        # Server side filter is done on dates that might be rounded or in other format, filter out anything already reported.
+        # Dates are compared as timestamps, watermark string is kept as it is for the next query
+        watermark = _timestamp(watch.watermark) or _EARLIEST
+        created = lambda item: _timestamp(item.get('pmd:creationDate'))
+
+        without_date = [item for item in new_objects if created(item) is None and item.get('opde:Id') not in watch.seen_without_date]
+        new_objects = [item for item in new_objects if created(item) is not None and created(item) >= watermark and item.get('opde:Id') not in watch.seen_at_watermark]
+        new_objects.sort(key=created)
+
+        if without_date:
+            logger.warning(f"{len(without_date)} objects of watch {name} without valid pmd:creationDate, reporting them once")
+            watch.seen_without_date.update(item.get('opde:Id') for item in without_date)
+
+        if new_objects:
+            latest = new_objects[-1]
+
+            if created(latest) > watermark:
+                watch.watermark = latest['pmd:creationDate']
+                watch.seen_at_watermark = set()
+                watermark = created(latest)
+
+            watch.seen_at_watermark.update(item.get('opde:Id') for item in new_objects if created(item) == watermark)
+
+        new_objects += without_date
+
+        self._schedule(watch, arrived=bool(new_objects))
+
+        return new_objects
+
+    def _schedule(self, watch, arrived):
+
+        now = time.monotonic()
+
+        if arrived:
+            if watch.last_arrival is not None:
+                gap = now - watch.last_arrival
+                watch.cadence = gap if watch.cadence is None else 0.7 * watch.cadence + 0.3 * gap
+            watch.last_arrival = now
+            watch.interval = watch.min_interval
+        else:
+            watch.interval = min(watch.max_interval, watch.interval * self.backoff)
+
+        delay = watch.interval
+
+        # Wake up shortly before next expected publication
+        if watch.cadence is not None and watch.last_arrival is not None:
+            expected = watch.last_arrival + watch.cadence - now
+            if watch.min_interval < expected < delay:
+                delay = expected - watch.min_interval / 2
+
+        watch.next_poll = now + max(delay, watch.min_interval / 2)
+
+    def _dispatch(self, watch, new_object):
+
+        if watch.callback:
+            try:
+                watch.callback(new_object)
+            except Exception as error:
+                logger.error(f"Watcher callback failed for {watch.name} -> {error}")
+
+        with self._lock:
+            queues = list(self._async_queues)
+
+        for loop, queue in queues:
+            loop.call_soon_threadsafe(queue.put_nowait, new_object)
+
+    def run_once(self):
+        """Poll all watches that are due, returns time in seconds until next poll is due"""
+
+        with self._lock:
+            watches = list(self.watches.values())
+
+        for watch in watches:
+
+            if self._stop.is_set():
+                break
+
+            if watch.next_poll > time.monotonic():
+                continue
+
+            try:
+                new_objects = self.poll(watch.name)
+            except Exception as error:
+                logger.warning(f"Watcher poll failed for {watch.name} -> {error}")
+                self._schedule(watch, arrived=False)
+                continue
+
+            for new_object in new_objects:
+                self._dispatch(watch, new_object)
+
+        with self._lock:
+            next_polls = [watch.next_poll for watch in self.watches.values()]
+
+        return max(0.0, min(next_polls) - time.monotonic()) if next_polls else None
+
+    def _run(self):
+
+        while not self._stop.is_set():
+            self._wakeup.clear()
+            delay = self.run_once()
+            self._wakeup.wait(delay)
+
+    def start(self):
+        """Start polling in background thread"""
+
+        if self._thread is not None and self._thread.is_alive():
+            return self
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="OPDM-subscription-watcher", daemon=True)
+        self._thread.start()
+
+        return self
+
+    def stop(self, timeout=None):
+
+        self._stop.set()
+        self._wakeup.set()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    async def arrivals(self):
+        """Async iterator of new objects from all watches, background polling must be started with start()"""
+
+        item = (asyncio.get_running_loop(), asyncio.Queue())
+
+        with self._lock:
+            self._async_queues.append(item)
+
+        try:
+            while True:
+                yield await item[1].get()
+        finally:
+            with self._lock:
+                self._async_queues.remove(item)
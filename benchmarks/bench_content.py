@@ -0,0 +1,32 @@
+"""Payload extraction from get_content(..., return_payload=True) response"""
+import base64
+
+from lxml import etree
+
+from OPDM.OPDM_SOAP_API import parse_response
+
+from benchmarks.data import get_content_result
+
+MB = 1024 * 1024
+
+
+def extract_payload(response):
+    """Same steps as examples use to get file bytes from PAYLOAD response"""
+
+    content = parse_response(response)['sm:GetContentResult']['sm:part'][1]['opdm:Profile']['opde:Content']
+
+    return base64.b64decode(content.encode())
+
+
+class GetContentPayload:
+
+    params = [1, 10, 100, 500]
+    param_names = ["megabytes"]
+    timeout = 900
+
+    def setup(self, megabytes):
+        # Large base64 text nodes need huge_tree, same as zeep with xml_huge_tree setting
+        self.response = etree.fromstring(get_content_result(megabytes * MB), etree.XMLParser(huge_tree=True))
+
+    def time_extract_payload(self, megabytes):
+        extract_payload(self.response)
@@ -0,0 +1,14 @@
+"""Package import in fresh interpreter, as paid by every opdm command and short script"""
+
+
+class Import:
+    """Public names are loaded on first use, import OPDM alone must not load zeep, requests or lxml"""
+
+    def timeraw_import_package(self):
+        return "import OPDM"
+
+    def timeraw_import_cli(self):
+        return "import OPDM.cli"
+
+    def timeraw_import_client(self):
+        return "from OPDM import Client"
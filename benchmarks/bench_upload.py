@@ -0,0 +1,37 @@
+"""PublicationRequest envelope building"""
+import io
+import base64
+
+from zeep import Client as SOAPClient
+from zeep.wsdl.utils import etree_to_string
+
+from OPDM.OPDM_SOAP_API import iter_base64_chunks
+from OPDM.mock_server import mock_content
+
+from benchmarks.data import service_wsdl
+
+MB = 1024 * 1024
+
+
+class PublicationEnvelope:
+
+    params = [1, 10, 100]
+    param_names = ["megabytes"]
+    timeout = 600
+
+    def setup(self, megabytes):
+        self.client = SOAPClient(service_wsdl())
+        self.content = mock_content("benchmark", megabytes * MB)
+
+    def time_publication_request(self, megabytes):
+        # Envelope of publication_request, zeep encodes content to base64 in memory
+        envelope = self.client.create_message(self.client.service, "PublicationRequest", {"id": "benchmark.zip", "type": "CGMES", "content": self.content})
+        etree_to_string(envelope)
+
+    def time_publication_request_stream(self, megabytes):
+        # Envelope of publication_request_stream, content is encoded in chunks while sent
+        envelope = self.client.create_message(self.client.service, "PublicationRequest", {"id": "benchmark.zip", "type": "CGMES", "content": b"placeholder"})
+        etree_to_string(envelope).split(base64.b64encode(b"placeholder"))
+
+        for _ in iter_base64_chunks(io.BytesIO(self.content)):
+            pass
@@ -0,0 +1,45 @@
+"""Query building and response conversion"""
+from lxml import etree
+
+from OPDM.OPDM_SOAP_API import Client, add_xml_elements, parse_response
+
+from benchmarks.data import query_result
+
+
+class AddXmlElements:
+    """Query with growing component list, as built by query_object"""
+
+    params = [10, 100, 1000]
+    param_names = ["components"]
+
+    def setup(self, components):
+        self.query = Client.Operations.QueryObject.format(query_id="benchmark")
+        self.metadata = {"pmd:timeHorizon": "1D", "pmd:scenarioDate": {"operator": "is after", "value": "2024-01-01T00:00:00"}}
+        self.components = [{"opde:Component": f"{number:08d}-0000-4000-8000-000000000000"} for number in range(components)]
+
+    def time_query_object(self, components):
+        query = add_xml_elements(self.query, ".//opdm:OPDMObject", self.metadata)
+        for component in self.components:
+            query = add_xml_elements(query, ".//opde:Components", component)
+
+
+class ParseResponse:
+    """Conversion of ExecuteOperation result to dictionary in execute_operation"""
+
+    params = [100, 1000, 10000, 100000]
+    param_names = ["objects"]
+    timeout = 600
+
+    def setup_cache(self):
+        return {objects: query_result(objects) for objects in self.params}
+
+    def setup(self, results, objects):
+        self.response = etree.fromstring(results[objects])
+
+    def time_parse_response(self, results, objects):
+        parse_response(self.response)
+
+    def track_response_bytes(self, results, objects):
+        return len(results[objects])
+
+    track_response_bytes.unit = "bytes"
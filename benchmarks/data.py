@@ -0,0 +1,70 @@
+"""Response and payload builders shared by benchmarks"""
+import os
+import base64
+import tempfile
+from datetime import datetime, timedelta
+
+from OPDM.mock_server import to_xml, mock_content, NAMESPACE_DECLARATIONS, SERVICE_WSDL
+
+PROFILES = ("EQ", "SSH", "TP", "SV")
+
+
+def opdm_object(number):
+    """OPDMObject with metadata and four profiles, similar in size to real query results"""
+
+    scenario = datetime(2024, 1, 1, 0, 30) + timedelta(hours=number)
+    tso = f"TSO{number % 40}"
+    object_id = f"{number:08d}-0000-4000-8000-000000000000"
+
+    def profile(name):
+        return {"opdm:Profile": {"opde:Id": f"{object_id}-{name}",
+                                 "pmd:fileName": f"{scenario:%Y%m%dT%H%MZ}_1D_{tso}_{name}_001.zip",
+                                 "pmd:cgmesProfile": name,
+                                 "pmd:modelPartReference": tso,
+                                 "pmd:timeHorizon": "1D",
+                                 "pmd:scenarioDate": f"{scenario:%Y-%m-%dT%H:%M:%SZ}",
+                                 "pmd:version": "001",
+                                 "pmd:profileSize": "1282790"}}
+
+    return {"opde:Id": object_id,
+            "opde:Object-Type": "IGM",
+            "pmd:modelPartReference": tso,
+            "pmd:timeHorizon": "1D",
+            "pmd:scenarioDate": f"{scenario:%Y-%m-%dT%H:%M:%SZ}",
+            "pmd:validFrom": f"{scenario:%Y%m%dT%H%MZ}",
+            "pmd:creationDate": f"{scenario - timedelta(hours=12):%Y-%m-%dT%H:%M:%SZ}",
+            "pmd:version": "001",
+            "pmd:versionNumber": "001",
+            "pmd:modelSize": "5131160",
+            "pmd:isFullModel": "true",
+            "pmd:contentType": "CGMES",
+            "opde:Context": {"opde:IsOfficial": "true"},
+            "opde:Component": [profile(name) for name in PROFILES]}
+
+
+def query_result(count):
+    """QueryResult XML bytes with count OPDMObjects"""
+
+    parts = ['<sm:part name="name">benchmark</sm:part>'] + [to_xml("sm:part", {"opdm:OPDMObject": opdm_object(number)}) for number in range(count)]
+
+    return f'<sm:QueryResult opdm-version="benchmark" {NAMESPACE_DECLARATIONS}>{"".join(parts)}</sm:QueryResult>'.encode()
+
+
+def get_content_result(size):
+    """GetContentResult XML bytes with one profile of size bytes in PAYLOAD mode"""
+
+    content = base64.b64encode(mock_content("benchmark", size)).decode()
+    profile = to_xml("sm:part", {"opdm:Profile": {"opde:Id": "benchmark", "pmd:fileName": "benchmark.zip", "opde:Content": content}})
+
+    return f'<sm:GetContentResult opdm-version="benchmark" {NAMESPACE_DECLARATIONS}><sm:part name="content-return-mode">PAYLOAD</sm:part>{profile}</sm:GetContentResult>'.encode()
+
+
+def service_wsdl():
+    """Path of OPDM service WSDL in temporary directory, for zeep clients without server"""
+
+    path = os.path.join(tempfile.gettempdir(), "opdm_benchmark_service.wsdl")
+
+    with open(path, "w", encoding="utf-8") as file_object:
+        file_object.write(SERVICE_WSDL.replace("{address}", "http://localhost/opdm/cxf/OPDMSoapInterface"))
+
+    return path
@@ -0,0 +1,97 @@
+"""
+Import time of the package in fresh interpreter, exits with error when over budget or when heavy dependencies are loaded too early
+
+    python -m benchmarks.import_budget
+    python -m benchmarks.import_budget --repeat 10 --report import.json
+
+Time is median of repeated runs measured around the import statement, slowest modules are taken from python -X importtime.
+"""
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+# Milliseconds, set with headroom over measured times, lower them when import time is improved
+BUDGETS = {"import OPDM": 20,
+           "import OPDM.cli": 60,
+           "from OPDM import Client": 600}
+
+# Modules that must not be loaded by the statement, these are needed only when client is created
+HEAVY_MODULES = ("zeep", "requests", "lxml", "xmltodict", "urllib3", "sqlite3", "asyncio", "pandas")
+
+FORBIDDEN = {"import OPDM": HEAVY_MODULES,
+             "import OPDM.cli": HEAVY_MODULES,
+             "from OPDM import Client": ()}
+
+CHILD = """
+import sys, json, time
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "loaded": [name for name in {modules!r} if name in sys.modules]}}))
+"""
+
+
+def measure(statement):
+    """Import time and loaded heavy modules of statement in new interpreter, slowest modules from -X importtime"""
+
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD.format(statement=statement, modules=HEAVY_MODULES)], capture_output=True, text=True)
+
+    if process.returncode != 0:
+        raise RuntimeError(f"'{statement}' failed\n{process.stderr[-4000:]}")
+
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+
+    # import time: self [us] | cumulative | imported package
+    modules = []
+    for line in process.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, cumulative, name = line.split("|")
+            modules.append((int(cumulative), name.rstrip()))
+
+    result["slowest"] = [f"{name.strip()} {cumulative / 1000:.1f} ms" for cumulative, name in sorted(modules, reverse=True)[:5]]
+
+    return result
+
+
+def main(arguments=None):
+
+    parser = argparse.ArgumentParser(description="Check import time of the package against budgets")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per statement, median is compared to budget")
+    parser.add_argument("--report", default=None, help="path of JSON report")
+    arguments = parser.parse_args(arguments)
+
+    results = {}
+    failed = []
+
+    for statement, budget in BUDGETS.items():
+
+        runs = [measure(statement) for _ in range(arguments.repeat)]
+        milliseconds = statistics.median(run["seconds"] for run in runs) * 1000
+        loaded = sorted(set(name for run in runs for name in run["loaded"]) & set(FORBIDDEN[statement]))
+
+        results[statement] = {"milliseconds": milliseconds, "budget": budget, "loaded": loaded, "slowest": runs[-1]["slowest"]}
+
+        if milliseconds > budget:
+            failed.append(f"'{statement}' took {milliseconds:.1f} ms, budget {budget} ms, slowest: {', '.join(runs[-1]['slowest'])}")
+
+        if loaded:
+            failed.append(f"'{statement}' loaded {', '.join(loaded)}")
+
+    print(f"{'statement':<28}{'ms':>8}{'budget':>8}  loaded")
+    for statement, result in results.items():
+        print(f"{statement:<28}{result['milliseconds']:>8.1f}{result['budget']:>8}  {', '.join(result['loaded'])}")
+
+    if arguments.report:
+        with open(arguments.report, "w", encoding="utf-8") as file_object:
+            json.dump({"statements": results, "failed": failed}, file_object, indent=2)
+
+    for message in failed:
+        print(f"FAILED {message}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+Peak memory of large payload paths as multiple of payload size, exits with error when a scenario is over its budget
+
+    python -m benchmarks.memory_budget                                  # 20 MB payloads
+    python -m benchmarks.memory_budget --size 200000000 --report memory.json
+    python -m benchmarks.memory_budget --scenarios download upload --rss
+
+Scenarios
+    download -> get_content(return_payload=True) of one profile, payload is the file size
+    upload -> publication_request of file object in memory, payload is the file size
+    upload_stream -> publication_request_stream of file on disk, payload is the file size
+    query -> query_object with many results, payload is the size of the response
+
+Every scenario runs in separate process against local mock server. Peak is measured with tracemalloc (Python allocations,
+enforced) and as growth of peak RSS (all allocations including lxml and allocator overhead, enforced with --rss, Unix only).
+Budgets are in BUDGETS and RSS_BUDGETS.
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+from OPDM.mock_server import MockServer
+
+# Peak memory above the state before the call as multiple of payload size, measured with tracemalloc and as growth of peak RSS.
+# Set from measured peaks with some headroom, lower them when memory use is improved. Streamed upload uses constant memory,
+# so its ratio is only valid for the default size and larger payloads.
+BUDGETS = {"download": 6.0,
+           "upload": 2.5,
+           "upload_stream": 0.25,
+           "query": 5.5}
+
+RSS_BUDGETS = {"download": 7.5,
+               "upload": 6.0,
+               "upload_stream": 0.25,
+               "query": 12.0}
+
+
+def catalogue(size):
+    """Mock server objects, one profile of size bytes for download and query results of about size bytes"""
+
+    from benchmarks.data import opdm_object, query_result
+
+    count = max(1, size // (len(query_result(10)) // 10))
+    payload = {"opde:Id": "memory", "opde:Object-Type": "BDS",
+               "opde:Component": [{"opdm:Profile": {"opde:Id": f"memory-{size}", "pmd:fileName": "memory.zip", "pmd:profileSize": str(size)}}]}
+
+    return [payload] + [opdm_object(number) for number in range(count)]
+
+
+class ResponseSize:
+    """Observer keeping size of the last SOAP response"""
+
+    response_bytes = 0
+
+    def start(self, exchange):
+        pass
+
+    def finish(self, exchange):
+        if exchange["kind"] == "client":
+            self.response_bytes = exchange["response_bytes"]
+
+
+def reset_peak_rss():
+    """Reset peak RSS of this process on Linux, peak of the parent process is otherwise kept over exec"""
+
+    try:
+        with open("/proc/self/clear_refs", "w") as file_object:
+            file_object.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, None when not available"""
+
+    try:
+        with open("/proc/self/status") as file_object:
+            for line in file_object:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    # Kilobytes on Linux, bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+def measure(scenario, server, size, metric):
+    """Run scenario in this process, returns payload size and peak memory growth in bytes"""
+
+    from OPDM import Client
+
+    observer = ResponseSize()
+    service = Client(server, metrics=observer, profiling=False)
+
+    # Imports and caches done on first call are not part of the measured peak
+    service.query_object("IGM", {"pmd:timeHorizon": "WARMUP"})
+
+    payload = size
+    path = None
+
+    if scenario == "download":
+        operation = lambda: service.get_content(f"memory-{size}", return_payload=True)
+
+    elif scenario == "upload":
+        import io
+        file_object = io.BytesIO(os.urandom(size))
+        file_object.name = "memory.zip"
+        operation = lambda: service.publication_request(file_object)
+
+    elif scenario == "upload_stream":
+        with tempfile.NamedTemporaryFile(suffix=".zip", delete=False) as file_object:
+            for _ in range(0, size, 1024 * 1024):
+                file_object.write(os.urandom(min(1024 * 1024, size - file_object.tell())))
+            path = file_object.name
+        operation = lambda: service.publication_request_stream(path)
+
+    elif scenario == "query":
+        operation = lambda: service.query_object("IGM", {"pmd:timeHorizon": "1D"})
+
+    else:
+        raise ValueError(f"Unknown scenario {scenario}, choose from {sorted(BUDGETS)}")
+
+    try:
+        if metric == "traced":
+            import tracemalloc
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+            result = operation()
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+            tracemalloc.stop()
+        else:
+            reset_peak_rss()
+            baseline = peak_rss()
+            result = operation()
+            peak = peak_rss() - baseline
+    finally:
+        if path is not None:
+            os.remove(path)
+
+    if scenario == "query":
+        payload = observer.response_bytes
+
+    del result
+
+    return {"payload": payload, "peak": peak}
+
+
+def run(scenario, server, size, metric):
+    """Measure scenario in separate process, so earlier scenarios do not affect peak"""
+
+    process = subprocess.run([sys.executable, "-m", "benchmarks.memory_budget", "--child", scenario, "--server", server, "--size", str(size), "--metric", metric],
+                             capture_output=True, text=True)
+
+    if process.returncode != 0:
+        raise RuntimeError(f"Scenario {scenario} failed\n{process.stderr[-4000:]}")
+
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def main(arguments=None):
+
+    parser = argparse.ArgumentParser(description="Check peak memory of large payload paths against budgets")
+    parser.add_argument("--size", type=int, default=20_000_000, help="payload size in bytes")
+    parser.add_argument("--scenarios", nargs="+", default=list(BUDGETS), choices=list(BUDGETS))
+    parser.add_argument("--rss", action="store_true", help="enforce budgets also on peak RSS growth")
+    parser.add_argument("--report", default=None, help="path of JSON report")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--server", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--metric", default="traced", help=argparse.SUPPRESS)
+    arguments = parser.parse_args(arguments)
+
+    if arguments.child:
+        print(json.dumps(measure(arguments.child, arguments.server, arguments.size, arguments.metric)))
+        return 0
+
+    metrics = ["traced"] + (["rss"] if peak_rss() is not None else [])
+    results = {}
+    failed = []
+
+    with MockServer(catalogue(arguments.size)) as server:
+        for scenario in arguments.scenarios:
+
+            results[scenario] = {}
+
+            for metric in metrics:
+                measured = run(scenario, server.url, arguments.size, metric)
+                ratio = measured["peak"] / measured["payload"]
+                budget = RSS_BUDGETS[scenario] if metric == "rss" else BUDGETS[scenario]
+
+                results[scenario]["payload"] = measured["payload"]
+                results[scenario][metric] = {"peak": measured["peak"], "ratio": ratio, "budget": budget}
+
+                if ratio > budget and (metric == "traced" or arguments.rss):
+                    failed.append(f"{scenario} {metric} peak is {ratio:.2f}x payload, budget {budget:.2f}x")
+
+    print(f"{'scenario':<16}{'payload MB':>12}{'traced MB':>12}{'traced x':>10}{'budget x':>10}{'rss MB':>10}{'rss x':>8}{'budget x':>10}")
+    for scenario, result in results.items():
+        traced, rss = result["traced"], result.get("rss", {"peak": float("nan"), "ratio": float("nan"), "budget": float("nan")})
+        print(f"{scenario:<16}{result['payload'] / 1e6:>12.1f}{traced['peak'] / 1e6:>12.1f}{traced['ratio']:>10.2f}{traced['budget']:>10.2f}"
+              f"{rss['peak'] / 1e6:>10.1f}{rss['ratio']:>8.2f}{rss['budget']:>10.2f}")
+
+    if arguments.report:
+        with open(arguments.report, "w", encoding="utf-8") as file_object:
+            json.dump({"size": arguments.size, "scenarios": results, "failed": failed}, file_object, indent=2)
+
+    for message in failed:
+        print(f"FAILED {message}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
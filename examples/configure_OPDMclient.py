@@ -29,7 +29,7 @@ from subscribe_for_RSL import subscribe_for_rsl
 from download_all_BDS import download_all_bds
 from install_latest_RSL import install_latest_rsl
 from subscribe_for_CGMs import subscribe_for_cgms
-from subscribe_for_IGMs import subscribe_for_igms
+from subscribe_for_IGMs import subscribe_for_igms, igm_subscriptions
 from settings import RSL_OFFICIAL_NODES
 
 def yes_no(question=""):
@@ -53,6 +53,7 @@ parser.add_argument('--install_rsl', action='store_true', help=install_latest_rs
 parser.add_argument('--download_bds', action='store_true', help=download_all_bds.__doc__)
 parser.add_argument('--subscribe_igm', action='store_true', help=subscribe_for_igms.__doc__)
 parser.add_argument('--subscribe_cgm', action='store_true', help=subscribe_for_cgms.__doc__)
+parser.add_argument('--dry_run', action='store_true', help='Only print subscription changes, without applying them')
 parser.add_argument('--silent', action='store_true', help='Set flag to use this tool in a automated manner without interactive user input')
 
 parser.print_usage()
@@ -83,7 +84,10 @@ if arg.install_rsl: install_latest_rsl(service, RSL_OFFICIAL_NODES)
 if arg.subscribe_rsl == False and arg.silent == False:
     arg.subscribe_rsl = yes_no("Would you like to add subscription for QoCDC rulests?")
 
-if arg.subscribe_rsl: subscribe_for_rsl(service)
+# Subscriptions are collected and applied at the end, so re-running the tool does not create duplicates
+subscriptions = []
+
+if arg.subscribe_rsl: subscriptions.append({"object_type": "RULESET", "subscription_id": "RSL"})
 
 
 if arg.download_bds == False and arg.silent == False:
@@ -95,19 +99,27 @@ if arg.download_bds: download_all_bds(service)
 if arg.subscribe_bds == False and arg.silent == False:
     arg.subscribe_bds = yes_no("Would you like to add subscription for BDS?")
 
-if arg.subscribe_bds: subscribe_for_bds(service)
+if arg.subscribe_bds: subscriptions.append({"object_type": "BDS", "subscription_id": "BDS"})
 
 
 if arg.subscribe_igm == False and arg.silent == False:
     arg.subscribe_igm = yes_no("Would you like to add subscription for all IGM-s except RT (real time) [Relevant for RSC-s]?")
 
-if arg.subscribe_igm: subscribe_for_igms(service)
+if arg.subscribe_igm: subscriptions.extend(igm_subscriptions())
 
 
 if arg.subscribe_cgm == False and arg.silent == False:
     arg.subscribe_cgm = yes_no("Would you like to add subscription for CGM-s?")
 
-if arg.subscribe_cgm: subscribe_for_cgms(service)
+if arg.subscribe_cgm: subscriptions.append({"object_type": "CGM", "subscription_id": "CGM"})
+
+
+if subscriptions:
+    result = OPDM.reconcile_subscriptions(service, subscriptions, dry_run=arg.dry_run)
+    print(OPDM.format_plan(result["plan"]))
+
+    for change in result["results"]:
+        print(f"{change['subscription_id']} -> {'OK' if change['ok'] else change['error']}")
 
 
 print("All done")
@@ -30,6 +30,7 @@
 import os
 import base64
 import OPDM
+import OPDM.analytics
 import settings
 import pandas
 import TIME_HELPER
@@ -140,6 +141,10 @@ print(models[columns_to_export])
 
 models[columns_to_export].to_csv(f"model-stat_{target_date}.csv")
 
+# Stage durations and percentiles by TSO, time horizon and scenario hour
+pipeline = OPDM.analytics.pipeline_report(responses)
+pipeline["percentiles"].to_csv(f"pipeline-stat_{target_date}.csv")
+
 
 query_stat = pandas.DataFrame(query_log)
 query_stat["duration"] = (query_stat["end"] - query_stat["start"]).td.total_seconds()
@@ -41,25 +41,15 @@ print(f"Connection created to OPDM at {settings.OPDM_SERVER} as {settings.OPDM_U
 
 # Create list of files that were uploaded
 uploaded_files = glob.glob(os.path.join(settings.IGM_SOURCE_FOLDER, "*.zip"))
+file_names = [os.path.basename(cimxml_file_path) for cimxml_file_path in uploaded_files]
 
-for cimxml_file_path in uploaded_files:
+# Reports of all files are requested in batches and returned as one table of publication steps
+print(f"Requesting reports for {len(file_names)} files")
+publication_reports = pandas.DataFrame(service.get_profile_publication_report(filename=file_names))
 
-    file_name = os.path.basename(cimxml_file_path)
-
-    print(f"Requesting report for {cimxml_file_path}")
-    publication_report = service.get_profile_publication_report(filename=file_name)
+for file_name, publication_report in publication_reports.groupby("filename"):
 
     response_file_path = os.path.join(settings.EXPORT_FOLDER, f"report_{file_name.replace('.zip', '.xlsx')}")
 
-    pandas.DataFrame(publication_report["sm:GetProfilePublicationReportResult"]['sm:part']['opdm:PublicationReport']['publication:history']['publication:step']).to_excel(response_file_path)
+    publication_report.to_excel(response_file_path)
     print(f"Report saved at {response_file_path}")
-
-
-
-
-
-
-
-
-
-
@@ -30,7 +30,6 @@
 import OPDM
 import logging
 import sys
-from time import sleep
 
 # create logger
 logger = logging.getLogger(__name__)
@@ -53,69 +52,18 @@ logger.addHandler(ch)
 def install_latest_rsl(service, list_of_rsl_nodes_eic):
     """Installs the lates available (On remote SP) ruleset library to local client"""
 
-    ## Process
-    # Query data from OPDM
+    result = service.ensure_latest_ruleset(list_of_rsl_nodes_eic, deadline=120)
 
-    response = service.query_object("RULESET")
+    if result["action"] == "failed":
+        logger.error(f"RSL installation failed -> {result['error']}")
 
-    # Remove first part of the response, it is the id of the original query
-    ruleset = response['sm:QueryResult']['sm:part'][1:]
-    logger.info(f"Query returned {len(ruleset)} RULESET")
-
-    if len(ruleset) == 0:
-        logger.error(f"Empty Query returned for RULESET, use this query ID on SP side and Client Elastic/Kibana debugging")
-        return
-
-    # Sort out the highest version number RSL
-    version_dict = {int(item['opdm:OPDMObject']['pmd:version'].replace(".", "")):{"version":item['opdm:OPDMObject']['pmd:version'], "id":item['opdm:OPDMObject']['opde:Id']} for item in ruleset if item ['opdm:OPDMObject']["opde:Component"]["opdm:Profile"]["opde:Context"]["opde:EDXContext"]["opde:SenderToolboxCode"] in list_of_rsl_nodes_eic}
-    latest_RSL = version_dict[max(version_dict.keys())]
-    logger.info(f"Latest Official RSL -> {latest_RSL}")
-
-    # Check if the installed version is not the latest already
-    try:
-        installed_RSL = service.get_installed_ruleset_version()
-        logger.info(f"INFO - Currently installed RSL -> {installed_RSL}")
-    except Exception as error:
-        logger.error("Could not get Currently installed RSL, possible fix - make sure the OPDM user is with Admin rights")
-        logger.error(f"Trace -> {error}")
-        return
-
-
-    if latest_RSL["version"] != installed_RSL:
-
-        # Download latest RSL
-        try:
-            response = service.get_content(latest_RSL["id"], object_type="model")
-            logger.info(f"Downloaded {response['sm:GetContentResult']['sm:part'][1]['opdm:OPDMObject']['pmd:fileName']}")
-
-        except KeyError:
-            logger.error("Could not get GetContent response from OPDM SP")
-            return
-
-
-        if latest_RSL["version"] not in [rsl["version"] for rsl in service.list_available_rulesets()]:
-            wait_time = 10 #s
-            logger.warning(f"RSL {latest_RSL['version']} not available for installation, waiting {wait_time}s to try once more")
-            sleep(wait_time)
-
-
-        if latest_RSL["version"] in [rsl["version"] for rsl in service.list_available_rulesets()]:
-
-            # Install latest RSL
-            try:
-                response = service.install_ruleset(latest_RSL["version"])
-                logger.info(f"RSL {latest_RSL['version']} Installed {response}")
-            except Exception as error:
-                logger.error("Could not install RSL, possible fix - check that OPDM Ealsitc Search is well functioning and correctly configured")
-                logger.error(f"Trace -> {error}")
-                return
-
-
-        else:
-            logger.error(f"RSL {latest_RSL['version']} not available for installation, possible fix - check that Ealsitc Search is well functioning and correctly configured")
+    elif result["action"] == "installed":
+        logger.info(f"RSL {result['latest']} installed")
 
     else:
-        logger.info(f"Latest RSL allready installed")
+        logger.info(f"Latest RSL {result['latest']} allready installed")
+
+    logger.info(f"Timings -> {result['timings']}")
 
 
 if __name__ == '__main__':
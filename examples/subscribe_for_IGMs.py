@@ -29,16 +29,21 @@
 
 import OPDM
 
-def subscribe_for_igms(service):
-    """Add subscription for all IGM-s exept for RT (real time)"""
+def igm_subscriptions():
+    """Subscription definitions for all IGM-s exept for RT (real time)"""
     # Create list of all time horizons
     time_horizons = [f"{item:02d}" for item in list(range(1,32))] + ["ID", "1D", "2D", "YR"]
 
     # Create subscription for each time horizon
-    for time_horizon in time_horizons:
-        print(f"Adding subscription IGM-{time_horizon}")
-        response = service.publication_subscribe("IGM", subscription_id=f"IGM-{time_horizon}", metadata_dict={'pmd:timeHorizon': time_horizon})
-        print(response)
+    return [{"object_type": "IGM", "subscription_id": f"IGM-{time_horizon}", "metadata_dict": {'pmd:timeHorizon': time_horizon}} for time_horizon in time_horizons]
+
+
+def subscribe_for_igms(service):
+    """Add subscription for all IGM-s exept for RT (real time)"""
+
+    for outcome in service.subscribe_many(igm_subscriptions()):
+        print(f"Adding subscription {outcome['subscription']['subscription_id']} -> {'OK' if outcome['ok'] else outcome['error']}")
+        print(outcome["response"])
 
 if __name__ == '__main__':
     # Create connection to OPDM
@@ -42,20 +42,25 @@ print(f"Connection created to OPDM at {settings.OPDM_SERVER} as {settings.OPDM_U
 # Create list of file to upload
 files_to_upload = glob.glob(os.path.join(settings.IGM_SOURCE_FOLDER, "*.zip"))
 
-for cimxml_file_path in files_to_upload:
-
-    print(f"Uploading {cimxml_file_path}")
-    response = service.publication_request(cimxml_file_path)
-
-    response_file_path = os.path.join(settings.EXPORT_FOLDER, f"response_{os.path.basename(cimxml_file_path).replace('.zip', '.xml')}")
-
-    with open(response_file_path, "wb") as response_file:
-        print(f"Writing report {response_file_path}")
-        response_file.write(etree.tostring(response, pretty_print=True))
-
+print(f"Uploading {len(files_to_upload)} files")
+# Files accepted in previous runs (ledger) or already existing on OPDM are not sent again
+ledger_path = os.path.join(settings.EXPORT_FOLDER, "upload_ledger.sqlite")
+results = service.publish_many(files_to_upload, workers=4, ledger=ledger_path, skip_published=True)
 
+for result in results:
 
+    if result["skipped"]:
+        print(f"Skipped {result['path']}, already uploaded ({result['skipped']})")
+        continue
 
+    status = "accepted" if result["accepted"] else f"rejected -> {result['error']}"
+    print(f"Uploaded {result['path']} in {result['duration']:.1f}s, {status}")
 
+    if result["response"] is None:
+        continue
 
+    response_file_path = os.path.join(settings.EXPORT_FOLDER, f"response_{result['file_name'].replace('.zip', '.xml')}")
 
+    with open(response_file_path, "wb") as response_file:
+        print(f"Writing report {response_file_path}")
+        response_file.write(etree.tostring(result["response"], pretty_print=True))
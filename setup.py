@@ -19,6 +19,9 @@ setup(
     install_requires=[
         "requests", "zeep", 'urllib3', 'lxml', 'aniso8601', 'xmltodict',
     ],
+    entry_points={
+        "console_scripts": ["opdm = OPDM.cli:main"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -0,0 +1,22 @@
+import pytest
+
+from OPDM import Client
+from OPDM.mock_server import MockServer
+from OPDM.synthetic import SyntheticCatalogue
+
+
+@pytest.fixture
+def catalogue():
+    """Two TSOs, 1D and ID models for six hours of 2024-01-01, up to two versions each"""
+    return SyntheticCatalogue(tsos=2, time_horizons=("1D", "ID"), start="2024-01-01", hours=range(6), model_size=2_000)
+
+
+@pytest.fixture
+def server(catalogue):
+    with MockServer(catalogue.objects()) as server:
+        yield server
+
+
+@pytest.fixture
+def service(server):
+    return Client(server.url, username="user", password="pass", profiling=False)
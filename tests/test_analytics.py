@@ -0,0 +1,45 @@
+import pytest
+
+from OPDM.analytics import STAGES, _component_times, pipeline_frame, pipeline_report
+
+
+def test_component_times_compares_timestamps():
+    components = [{"opdm:Profile": {"pmd:file-uploaded-time": "2024-01-01T10:00:00+02:00", "pmd:model-assembly-end-time": "2024-01-01T08:30:00Z"}},
+                  {"opdm:Profile": {"pmd:file-uploaded-time": "2024-01-01T08:30:00Z", "pmd:model-assembly-end-time": "2024-01-01T08:30:00.500+00:00"}},
+                  {"opdm:Profile": {"pmd:file-uploaded-time": "not a time", "pmd:model-assembly-end-time": "2024-01-01T09:29:59+01:00"}}]
+
+    # As strings "2024-01-01T08:30:00Z" would be the earliest upload and "2024-01-01T09:29:59+01:00" the latest end
+    assert _component_times(components) == {"pmd:file-uploaded-time": "2024-01-01T10:00:00+02:00",
+                                             "pmd:model-assembly-end-time": "2024-01-01T08:30:00.500+00:00"}
+
+
+def test_component_times_of_single_component():
+    assert _component_times({"opdm:Profile": {"pmd:file-uploaded-time": "2024-01-01T08:00:00Z", "pmd:fileName": "a.zip"}}) == {"pmd:file-uploaded-time": "2024-01-01T08:00:00Z"}
+    assert _component_times(None) == {}
+
+
+def test_pipeline_frame_takes_times_from_components():
+    pandas = pytest.importorskip("pandas")
+
+    catalogue = [{"pmd:TSO": "TSO01", "pmd:timeHorizon": "1D", "pmd:scenarioDate": "2024-01-01T00:30:00Z",
+                  "opde:Component": [{"opdm:Profile": {"pmd:file-uploaded-time": "2024-01-01T01:00:00+01:00", "pmd:file-validation-start-time": "2024-01-01T00:00:30Z"}},
+                                     {"opdm:Profile": {"pmd:file-uploaded-time": "2024-01-01T00:00:10Z", "pmd:file-validation-start-time": "2024-01-01T00:00:20Z"}}]}]
+
+    frame = pipeline_frame(catalogue)
+
+    assert frame.loc[0, "pmd:file-uploaded-time"] == pandas.Timestamp("2024-01-01T00:00:00Z")
+    assert frame.loc[0, "tso"] == "TSO01"
+    assert frame.loc[0, "hour"] == 0
+
+
+def test_pipeline_report_from_query(service):
+    pytest.importorskip("pandas")
+
+    response = service.query_object("IGM", {"pmd:timeHorizon": "1D"})
+
+    report = pipeline_report(response, baseline=response)
+
+    assert len(report["durations"]) == len(response["sm:QueryResult"]["sm:part"]) - 1
+    assert (report["durations"]["total"].dropna() >= 0).all()
+    assert set(stage for stage, _ in report["percentiles"].columns) == set(STAGES) | {"count"}
+    assert report["regressions"].empty
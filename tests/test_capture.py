@@ -0,0 +1,41 @@
+import json
+
+from OPDM import Client
+from OPDM.capture import CaptureBuffer
+
+
+def test_dump_has_no_credentials(server, tmp_path):
+    path = tmp_path / "capture.jsonl"
+    service = Client(server.url, username="user", password="secret-password", profiling=False, capture=CaptureBuffer(dump_path=str(path)))
+
+    service.query_object("IGM", {"pmd:timeHorizon": "1D"})
+    service.capture.dump()
+
+    content = path.read_text(encoding="utf-8")
+    entries = [json.loads(line) for line in content.splitlines()]
+
+    assert entries
+    assert "secret-password" not in content
+    assert "secret-password" not in service.capture.format()
+    assert all("REDACTED" in entry["request"] for entry in entries if "Password" in entry["request"])
+
+
+def test_truncated_request_has_no_credentials(server):
+    # Body is cut inside the password element
+    service = Client(server.url, username="user", password="secret-password", profiling=False, capture=CaptureBuffer(max_body_bytes=425))
+
+    service.query_object("IGM", {"pmd:timeHorizon": "1D"})
+
+    assert "secret-password" not in service.capture.format()
+    assert "truncated" in service.capture.last()["request"]
+
+
+def test_errors_only_and_bounded_size(server):
+    capture = CaptureBuffer(size=2, errors_only=False)
+    service = Client(server.url, profiling=False, capture=capture)
+
+    for _ in range(3):
+        service.query_object("IGM", {"pmd:timeHorizon": "1D"})
+
+    assert len(capture.entries()) == 2
+    assert capture.dropped >= 1
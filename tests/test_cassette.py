@@ -0,0 +1,34 @@
+import gzip
+
+from OPDM import Client
+from OPDM.cassette import Cassette
+
+
+def test_record_and_replay(server, tmp_path):
+    path = tmp_path / "exchanges.jsonl.gz"
+
+    recording = Client(server.url, username="user", password="secret-password", profiling=False, cassette=Cassette(str(path), mode="record"))
+    recorded = recording.query_object("IGM", {"pmd:timeHorizon": "1D", "pmd:scenarioDate": "2024-01-01T00:30"})
+
+    url = server.url
+    server.stop()
+
+    replaying = Client(url, username="user", password="secret-password", profiling=False, cassette=Cassette(str(path), mode="replay", strict=True))
+    replayed = replaying.query_object("IGM", {"pmd:timeHorizon": "1D", "pmd:scenarioDate": "2024-01-01T00:30"})
+
+    assert replaying.cassette.mode == "replay"
+    assert replayed["sm:QueryResult"]["sm:part"][1:] == recorded["sm:QueryResult"]["sm:part"][1:]
+
+
+def test_record_redacts_credentials(server, tmp_path):
+    path = tmp_path / "exchanges.jsonl.gz"
+
+    service = Client(server.url, username="user", password="secret-password", profiling=False, cassette=Cassette(str(path), mode="record"))
+    service.query_object("IGM", {"pmd:timeHorizon": "1D"})
+
+    with gzip.open(path, "rt", encoding="utf-8") as file_object:
+        content = file_object.read()
+
+    assert "Password" in content
+    assert "secret-password" not in content
+    assert "REDACTED" in content
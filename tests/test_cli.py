@@ -0,0 +1,103 @@
+import csv
+import json
+import logging
+
+import pytest
+
+from OPDM.cli import QUERY_COLUMNS, main, parse_filter
+
+
+def test_parse_filter():
+    assert parse_filter("pmd:timeHorizon=1D") == ("pmd:timeHorizon", "1D")
+    assert parse_filter("pmd:scenarioDate is after=2024-01-01T00:00") == ("pmd:scenarioDate", {"operator": "is after", "value": "2024-01-01T00:00"})
+
+
+def test_ruleset_install_requires_version(server, capsys):
+    with pytest.raises(SystemExit) as error:
+        main(["--server", server.url, "ruleset", "install"])
+
+    assert error.value.code == 2
+    assert "--version" in capsys.readouterr().err
+
+
+def test_fault_is_reported_without_traceback(server, caplog):
+    assert main(["--server", server.url, "--quiet", "ruleset", "install", "--version", "9.9.9"]) == 1
+    assert [record.message.count("\n") for record in caplog.records if record.levelname == "ERROR"] == [0]
+    assert "Traceback" not in caplog.text
+
+
+def test_ruleset_install(server, capsys):
+    server.installed_ruleset = None
+
+    assert main(["--server", server.url, "--quiet", "ruleset", "install", "--version", "2.0.1"]) == 0
+    assert server.installed_ruleset == "2.0.1"
+
+
+def first_model(service):
+    response = service.query_object("IGM", {"pmd:timeHorizon": "1D", "pmd:scenarioDate": "2024-01-01T00:30"})
+    return response["sm:QueryResult"]["sm:part"][1]["opdm:OPDMObject"]
+
+
+def test_query_csv_output(server, tmp_path):
+    output = tmp_path / "models.csv"
+
+    assert main(["--server", server.url, "--quiet", "query", "IGM", "--filter", "pmd:timeHorizon=1D",
+                 "--filter", "pmd:scenarioDate is after=2024-01-01T03:00", "--output", str(output)]) == 0
+
+    with open(output, newline="", encoding="utf-8") as file_object:
+        rows = list(csv.DictReader(file_object))
+
+    assert rows
+    assert list(rows[0]) == QUERY_COLUMNS
+    assert {row["pmd:timeHorizon"] for row in rows} == {"1D"}
+    assert all(row["pmd:scenarioDate"] > "2024-01-01T03:00" for row in rows)
+
+
+@pytest.mark.parametrize("object_type", ["file", "model"])
+def test_download_rerun_skips_downloaded_files(service, server, tmp_path, caplog, object_type):
+    model = first_model(service)
+    profiles = [component["opdm:Profile"] for component in model["opde:Component"]]
+    ids = [model["opde:Id"]] if object_type == "model" else [profile["opde:Id"] for profile in profiles]
+    command = ["--server", server.url, "download", *ids, "--object_type", object_type, "--output_dir", str(tmp_path)]
+
+    assert main(command) == 0
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(profile["pmd:fileName"] for profile in profiles)
+
+    caplog.clear()
+    caplog.set_level(logging.INFO, logger="OPDM.cli")
+    assert main(command) == 0
+    assert f"Downloading 0 of {len(ids)} files" in caplog.text
+
+
+def test_download_requires_ids_or_query(server, capsys):
+    with pytest.raises(SystemExit) as error:
+        main(["--server", server.url, "download"])
+
+    assert error.value.code == 2
+    assert "--query" in capsys.readouterr().err
+
+
+def test_upload_skips_uploaded_files(server, tmp_path, capsys):
+    path = tmp_path / "20240101T0030Z_1D_TSO01_SSH_900.zip"
+    path.write_bytes(b"PK" * 50)
+    command = ["--server", server.url, "--quiet", "upload", str(path), "--ledger", str(tmp_path / "ledger.sqlite")]
+
+    assert main(command) == 0
+    assert main(command) == 0
+    assert capsys.readouterr().out.splitlines() == [f"{path}: accepted", f"{path}: skipped (ledger)"]
+    assert server.requests["PublicationRequest"] == 1
+
+    # Missing file is not accepted
+    assert main(command[:-3] + [str(tmp_path / "missing.zip"), "--ledger", str(tmp_path / "ledger.sqlite")]) == 1
+
+
+def test_subscribe_dry_run(server, tmp_path, capsys):
+    spec = tmp_path / "subscriptions.json"
+    spec.write_text(json.dumps([{"subscription_id": "IGM-1D", "object_type": "IGM", "metadata_dict": {"pmd:timeHorizon": "1D"}}]), encoding="utf-8")
+
+    assert main(["--server", server.url, "--quiet", "subscribe", str(spec), "--dry_run"]) == 0
+    assert capsys.readouterr().out.strip() == "+ IGM-1D: create (missing)"
+    assert server.subscriptions == {}
+
+    assert main(["--server", server.url, "--quiet", "subscribe", str(spec)]) == 0
+    assert list(server.subscriptions) == ["IGM-1D"]
@@ -0,0 +1,57 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from OPDM import Client
+from OPDM.loadgen import LoadGenerator, format_report, parse_mix, percentile, summarize
+from OPDM.mock_server import MockServer
+from OPDM.synthetic import SyntheticCatalogue
+
+
+@pytest.mark.parametrize("count, share, expected", [(100, 0.50, 50), (100, 0.95, 95), (100, 0.99, 99), (100, 1.0, 100),
+                                                    (10, 0.50, 5), (10, 0.95, 10), (1, 0.99, 1), (20, 0.95, 19), (100, 0.07, 7), (100, 0.0, 1)])
+def test_percentile_nearest_rank(count, share, expected):
+    assert percentile(list(range(1, count + 1)), share) == expected
+
+
+def test_percentile_empty():
+    assert percentile([], 0.5) is None
+
+
+def test_summarize():
+    statistics = summarize([0.4, 0.1, 0.3, 0.2], {"Fault": 1}, duration=2.0)
+
+    assert statistics["count"] == 5
+    assert statistics["ok"] == 4
+    assert statistics["error_rate"] == pytest.approx(0.2)
+    assert statistics["throughput"] == pytest.approx(2.0)
+    assert statistics["mean"] == pytest.approx(0.25)
+    assert (statistics["p50"], statistics["p95"], statistics["max"]) == (0.2, 0.4, 0.4)
+
+
+def test_summarize_without_samples():
+    statistics = summarize([], {}, duration=0)
+
+    assert statistics["count"] == 0
+    assert statistics["p99"] is None and statistics["throughput"] is None
+
+
+def test_parse_mix():
+    assert parse_mix("query=70, download=30,subscription") == {"query": 70.0, "download": 30.0, "subscription": 1.0}
+
+
+def test_closed_loop_run():
+    # Loadgen queries scenario days back from today
+    catalogue = SyntheticCatalogue(tsos=2, time_horizons=("1D",), start=datetime.now(timezone.utc).strftime("%Y-%m-%d"), hours=range(4), model_size=2_000)
+
+    with MockServer(catalogue.objects()) as server:
+        service = Client(server.url, profiling=False)
+        report = LoadGenerator(service, mix={"query": 1, "download": 1, "subscription": 1}, concurrency=3, duration=30, requests=30).run()
+
+    operations = report["operations"]
+
+    assert report["total"]["count"] == 30
+    assert report["total"]["errors"] == {}
+    assert sum(statistics["ok"] for statistics in operations.values()) == 30
+    assert all(statistics["p50"] <= statistics["p95"] <= statistics["p99"] <= statistics["max"] for statistics in operations.values() if statistics["ok"])
+    assert len(format_report(report).splitlines()) == len(operations) + 2
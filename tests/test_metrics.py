@@ -0,0 +1,63 @@
+import urllib.request
+
+import pytest
+from zeep.exceptions import Fault
+
+from OPDM import Client
+from OPDM.metrics import Histogram, MetricsRegistry
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+
+    for value in (0.05, 0.5, 0.5, 5):
+        histogram.observe(value, operation="Query")
+
+    assert histogram.render()[2:] == ['latency_seconds_bucket{operation="Query",le="0.1"} 1',
+                                      'latency_seconds_bucket{operation="Query",le="1"} 3',
+                                      'latency_seconds_bucket{operation="Query",le="+Inf"} 4',
+                                      'latency_seconds_sum{operation="Query"} 6.05',
+                                      'latency_seconds_count{operation="Query"} 4']
+    assert histogram.summary(operation="Query") == {"count": 4, "sum": pytest.approx(6.05)}
+
+
+def test_operation_metrics(server):
+    service = Client(server.url, profiling=False, metrics=True)
+
+    service.query_object("IGM", {"pmd:timeHorizon": "1D"})
+    service.query_object("IGM", {"pmd:timeHorizon": "ID"})
+
+    assert service.metrics.duration.summary(operation="Query", phase="total")["count"] == 2
+    for phase in ("serialization", "network", "parsing"):
+        assert service.metrics.duration.summary(operation="Query", phase=phase)["count"] == 2
+    assert service.metrics.response_bytes.summary(operation="Query")["sum"] > 0
+
+    text = service.metrics.render()
+    assert "# TYPE opdm_operation_duration_seconds histogram" in text
+    assert 'opdm_operation_duration_seconds_count{operation="Query",phase="total"} 2' in text
+    assert text.endswith("\n")
+
+
+def test_errors_are_counted_by_type(catalogue):
+    from OPDM.mock_server import MockServer
+
+    with MockServer(catalogue.objects(), fault_rate=1.0) as server:
+        service = Client(server.url, profiling=False, metrics=MetricsRegistry())
+
+        with pytest.raises(Fault):
+            service.query_object("IGM", {"pmd:timeHorizon": "1D"})
+
+    assert 'opdm_operation_errors_total{error="Fault",operation="Query"} 1' in service.metrics.render()
+
+
+def test_prometheus_endpoint(server):
+    service = Client(server.url, profiling=False, metrics=True)
+    service.query_object("IGM", {"pmd:timeHorizon": "1D"})
+
+    http_server = service.metrics.start_http_server(port=0, address="127.0.0.1")
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{http_server.server_address[1]}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert response.read().decode() == service.metrics.render()
+    finally:
+        http_server.shutdown()
@@ -0,0 +1,48 @@
+import pytest
+
+from OPDM.prefetch import Prefetcher, build_schedule
+
+
+def models(response):
+    # Remove first part of the response, it is the id of the original query
+    return sorted(part["opdm:OPDMObject"]["opde:Id"] for part in response["sm:QueryResult"]["sm:part"][1:])
+
+
+@pytest.mark.parametrize("scenario_date", ["2024-01-01T00:30", "2024-01-01T00:30:00", "2024-01-01T00:30:00Z", "2024-01-01T02:30:00+02:00"])
+def test_query_scenario_date_is(service, scenario_date):
+    expected = models(service.query_object("IGM", {"pmd:timeHorizon": "1D", "pmd:scenarioDate": "2024-01-01T00:30:00Z"}))
+    found = models(service.query_object("IGM", {"pmd:timeHorizon": "1D", "pmd:scenarioDate": {"operator": "is", "value": scenario_date}}))
+
+    assert expected
+    assert found == expected
+
+
+def test_query_scenario_date_is_one_of(service):
+    found = models(service.query_object("IGM", {"pmd:timeHorizon": "1D", "pmd:scenarioDate": {"operator": "is one of", "value": "2024-01-01T00:30,2024-01-01T01:30"}}))
+    first = models(service.query_object("IGM", {"pmd:timeHorizon": "1D", "pmd:scenarioDate": "2024-01-01T00:30"}))
+    second = models(service.query_object("IGM", {"pmd:timeHorizon": "1D", "pmd:scenarioDate": "2024-01-01T01:30"}))
+
+    assert found == sorted(first + second)
+
+
+def test_query_scenario_date_range(service):
+    after = models(service.query_object("IGM", {"pmd:timeHorizon": "1D", "pmd:scenarioDate": {"operator": "is after", "value": "2024-01-01T04:00"}}))
+    between = models(service.query_object("IGM", {"pmd:timeHorizon": "1D", "pmd:scenarioDate": {"operator": "is between", "value": "2024-01-01T04:00,2024-01-01T06:00"}}))
+
+    assert after
+    assert after == between
+
+
+def test_query_text_filters(service):
+    found = service.query_object("IGM", {"pmd:timeHorizon": "ID", "pmd:modelPartReference": "TSO01"})
+    objects = [part["opdm:OPDMObject"] for part in found["sm:QueryResult"]["sm:part"][1:]]
+
+    assert objects
+    assert {(item["pmd:timeHorizon"], item["pmd:modelPartReference"]) for item in objects} == {("ID", "TSO01")}
+
+
+def test_prefetch_schedule_finds_models(service):
+    prefetcher = Prefetcher(service, schedule=build_schedule(["1D"], ["2024-01-01T00:30", "2024-01-01T01:30"], object_types=["IGM"]), max_workers=2)
+
+    assert prefetcher.run_once() > 0
+    assert prefetcher.statistics["downloads"] == len(prefetcher.prefetched)
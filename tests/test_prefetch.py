@@ -0,0 +1,40 @@
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from OPDM.prefetch import Prefetcher, build_schedule, format_scenario_date
+
+
+def test_format_scenario_date():
+    assert format_scenario_date(datetime(2024, 1, 1, 2, 30, tzinfo=timezone(timedelta(hours=2)))) == "2024-01-01T00:30"
+    assert format_scenario_date("2024-01-01T00:30:00Z") == "2024-01-01T00:30:00Z"
+
+    with pytest.raises(ValueError):
+        format_scenario_date(datetime(2024, 1, 1, 0, 30))
+
+
+def test_prefetched_models_outside_schedule_are_forgotten(service):
+    window = ["2024-01-01T00:30", "2024-01-01T01:30"]
+    prefetcher = Prefetcher(service, schedule=lambda: build_schedule(["1D"], window, object_types=["IGM"]))
+
+    first = prefetcher.run_once()
+    assert first > 0
+    assert prefetcher.run_once() == 0
+
+    # Rolling window moves one hour forward
+    window[:] = ["2024-01-01T01:30", "2024-01-01T02:30"]
+    second = prefetcher.run_once()
+
+    assert second > 0
+    assert set(prefetcher.prefetched.values()) == set(window)
+
+
+def test_queries_and_downloads_use_background_priority(service):
+    prefetcher = Prefetcher(service, schedule=build_schedule(["1D"], ["2024-01-01T00:30"], object_types=["IGM"]))
+
+    count = prefetcher.run_once()
+    metrics = service.scheduler.metrics()
+
+    assert count > 0
+    assert metrics["BACKGROUND"]["completed"] == prefetcher.statistics["queries"] + count
+    assert all(metrics[name]["submitted"] == 0 for name in ("RT", "ID", "DA", "WA", "YR"))
@@ -0,0 +1,84 @@
+import pstats
+import tracemalloc
+
+from OPDM import Client
+from OPDM.profiling import Profiler
+
+
+def test_from_environment_without_profile():
+    assert Profiler.from_environment({}) is None
+    assert Profiler.from_environment({"OPDM_PROFILE": ""}) is None
+
+
+def test_from_environment(tmp_path):
+    profiler = Profiler.from_environment({"OPDM_PROFILE": "Query, GetContent,",
+                                          "OPDM_PROFILE_RATE": "0.25",
+                                          "OPDM_PROFILE_MEMORY": "yes",
+                                          "OPDM_PROFILE_DIR": str(tmp_path)})
+
+    assert profiler.operations == ["Query", "GetContent"]
+    assert profiler.sample_rate == 0.25
+    assert profiler.memory is True
+    assert profiler.output_dir == str(tmp_path)
+    assert profiler.selected("Query") and not profiler.selected("query_object")
+
+
+def test_client_uses_environment(server, monkeypatch):
+    monkeypatch.setenv("OPDM_PROFILE", "Query")
+
+    assert Client(server.url).profiler.operations == ["Query"]
+
+    monkeypatch.delenv("OPDM_PROFILE")
+
+    assert Client(server.url).profiler is None
+
+
+def test_profiled_operations(server, tmp_path):
+    profiler = Profiler(operations=["Query", "get_*"])
+    service = Client(server.url, profiling=profiler)
+
+    service.query_object("IGM", {"pmd:timeHorizon": "1D"})
+    service.query_object("IGM", {"pmd:timeHorizon": "ID"})
+
+    summary = profiler.summary()
+    assert set(summary) == {"Query"}
+    assert summary["Query"]["count"] == 2
+    assert summary["Query"]["total_time"] > 0
+    assert "function calls" in profiler.report("Query")
+
+    paths = profiler.write(tmp_path)
+    assert sorted(paths) == [str(tmp_path / "Query.collapsed"), str(tmp_path / "Query.pstats")]
+    assert pstats.Stats(str(tmp_path / "Query.pstats")).total_calls > 0
+    assert (tmp_path / "Query.collapsed").read_text(encoding="utf-8").strip()
+
+
+def test_sample_rate_zero_profiles_nothing(server):
+    profiler = Profiler(sample_rate=0.0)
+    service = Client(server.url, profiling=profiler)
+
+    service.query_object("IGM", {"pmd:timeHorizon": "1D"})
+
+    assert profiler.summary() == {}
+
+
+def test_memory_profiling_stops_own_tracing(server):
+    profiler = Profiler(operations=["Query"], memory=True)
+    service = Client(server.url, profiling=profiler)
+
+    service.query_object("IGM", {"pmd:timeHorizon": "1D"})
+
+    assert not tracemalloc.is_tracing()
+    assert profiler.summary()["Query"]["peak_memory"] > 0
+
+
+def test_memory_profiling_keeps_application_tracing(server):
+    profiler = Profiler(operations=["Query"], memory=True)
+    service = Client(server.url, profiling=profiler)
+
+    tracemalloc.start()
+    try:
+        service.query_object("IGM", {"pmd:timeHorizon": "1D"})
+
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,94 @@
+import io
+
+import pytest
+
+from OPDM import UploadLedger
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for number in range(3):
+        path = tmp_path / f"20240101T0030Z_1D_TSO01_SSH_90{number}.zip"
+        path.write_bytes(b"PK" + bytes([number]) * 100)
+        paths.append(str(path))
+    return paths
+
+
+def test_publish_many_results_in_input_order(service, server, files):
+    results = service.publish_many(files, workers=3)
+
+    assert [result["path"] for result in results] == files
+    assert [result["file_name"] for result in results] == [path.rsplit("/", 1)[-1] for path in files]
+    assert all(result["accepted"] and result["error"] is None and result["attempts"] == 1 for result in results)
+    assert sorted(server.uploads) == sorted(result["file_name"] for result in results)
+
+
+def test_publish_many_reports_missing_file(service, files):
+    results = service.publish_many(files[:1] + ["missing.zip"], retries=0)
+
+    assert [result["accepted"] for result in results] == [True, False]
+    assert results[1]["error"]
+
+
+def test_publish_many_skips_files_in_ledger(service, server, files, tmp_path):
+    ledger = UploadLedger(str(tmp_path / "ledger.sqlite"))
+
+    first = service.publish_many(files[:2], workers=2, ledger=ledger)
+    uploads = server.requests["PublicationRequest"]
+    second = service.publish_many(files, workers=2, ledger=ledger)
+
+    assert [result["accepted"] for result in first] == [True, True]
+    assert [result["skipped"] for result in second] == ["ledger", "ledger", None]
+    assert all(result["accepted"] for result in second)
+    assert server.requests["PublicationRequest"] == uploads + 1
+
+
+def test_publish_many_skips_published_files(service, server, files, tmp_path):
+    # Profile of the synthetic catalogue
+    published = tmp_path / "20240101T0030Z_1D_TSO01_EQ_001.zip"
+    published.write_bytes(b"PK")
+
+    results = service.publish_many([str(published)] + files[:1], skip_published=True)
+
+    assert [result["skipped"] for result in results] == ["published", None]
+    assert server.requests["PublicationRequest"] == 1
+
+
+def test_batched_publication_report(service, files):
+    service.publish_many(files)
+    file_names = [path.rsplit("/", 1)[-1] for path in files]
+
+    table = service.get_profile_publication_report(filename=file_names + ["missing.zip"], batch_size=2)
+
+    assert set(table["filename"]) == set(file_names)
+    assert len({len(column) for column in table.values()}) == 1
+    assert sorted(name for name, step in zip(table["filename"], table["step"]) if step == 0) == sorted(file_names)
+    assert set(table["publication:name"][number] for number, step in enumerate(table["step"]) if step == 0) == {"RECEIVED"}
+
+
+def test_publication_request_accepts_path_like_and_file_objects(service, server, tmp_path):
+    path = tmp_path / "20240101T0030Z_1D_TSO01_SSH_901.zip"
+    path.write_bytes(b"PK" + b"1" * 100)
+
+    service.publication_request(path)
+    with open(path, "rb") as file_object:
+        service.publication_request(file_object)
+
+    memory = io.BytesIO(b"PK" + b"2" * 50)
+    memory.name = "20240101T0030Z_1D_TSO01_SSH_902.zip"
+    service.publication_request(memory)
+
+    assert server.requests["PublicationRequest"] == 3
+    assert {name: upload["size"] for name, upload in server.uploads.items()} == {path.name: 102, memory.name: 52}
+
+
+def test_publication_request_sends_whole_bytesio(service, server):
+    memory = io.BytesIO()
+    memory.write(b"PK" + b"3" * 70)
+    memory.name = "20240101T0030Z_1D_TSO01_SSH_903.zip"
+
+    # Not rewound after writing
+    service.publication_request(memory)
+
+    assert server.uploads[memory.name]["size"] == 72
@@ -0,0 +1,42 @@
+from OPDM import plan_subscriptions, reconcile_subscriptions, format_plan
+
+SPEC = [{"subscription_id": "IGM-1D", "object_type": "IGM", "metadata_dict": {"pmd:timeHorizon": "1D"}},
+        {"subscription_id": "IGM-ID", "object_type": "IGM", "metadata_dict": {"pmd:timeHorizon": "ID"}, "active": False}]
+
+
+def test_plan_missing_subscriptions(service, server):
+    plan = plan_subscriptions(service, SPEC)
+
+    assert [(change["subscription_id"], change["steps"], change["reason"]) for change in plan] == [("IGM-1D", ["create"], "missing"),
+                                                                                                   ("IGM-ID", ["create", "stop"], "missing")]
+    # Planning does not change anything
+    assert server.subscriptions == {}
+
+
+def test_plan_changed_and_pruned_subscriptions(service):
+    service.publication_subscribe("IGM", subscription_id="IGM-1D", metadata_dict={"pmd:timeHorizon": "2D"})
+    service.publication_subscribe("BDS", subscription_id="OLD")
+
+    plan = {change["subscription_id"]: change for change in plan_subscriptions(service, SPEC[:1], prune=True)}
+
+    assert plan["IGM-1D"]["steps"] == ["stop", "delete", "create"]
+    assert plan["OLD"]["steps"] == ["stop", "delete"]
+    assert format_plan(list(plan.values())).splitlines() == ["~ IGM-1D: stop -> delete -> create (definition changed)", "- OLD: stop -> delete (not in spec)"]
+
+
+def test_reconcile_is_idempotent(service):
+    first = reconcile_subscriptions(service, SPEC)
+    second = reconcile_subscriptions(service, SPEC)
+
+    assert len(first["plan"]) == 2
+    assert all(result["ok"] for result in first["results"])
+    assert second == {"plan": [], "results": []}
+    assert format_plan(second["plan"]) == "No changes, subscriptions are up to date"
+
+
+def test_reconcile_dry_run(service, server):
+    result = reconcile_subscriptions(service, SPEC, dry_run=True)
+
+    assert len(result["plan"]) == 2
+    assert result["results"] == []
+    assert server.subscriptions == {}
@@ -0,0 +1,73 @@
+import pytest
+from requests.exceptions import ConnectionError
+
+from OPDM import Client
+from OPDM.mock_server import MockServer
+from OPDM.synthetic import OFFICIAL_NODE, SyntheticCatalogue
+
+
+@pytest.fixture
+def server():
+    catalogue = list(SyntheticCatalogue(tsos=1, time_horizons=("1D",), hours=range(1), rulesets=("2.0.1", "2.0.2")).objects())
+    # Ruleset without sender metadata
+    catalogue.append({"opde:Id": "ruleset-without-context", "opde:Object-Type": "RULESET", "pmd:version": "9.0.0"})
+
+    with MockServer(catalogue, installed_ruleset="2.0.1") as server:
+        yield server
+
+
+@pytest.fixture
+def service(server):
+    return Client(server.url, profiling=False)
+
+
+def test_installs_latest(service, server):
+    result = service.ensure_latest_ruleset([OFFICIAL_NODE], poll_interval=0.01)
+
+    assert (result["action"], result["latest"], result["installed"], result["error"]) == ("installed", "2.0.2", "2.0.2", None)
+    assert set(result["timings"]) == {"query", "download", "availability_wait", "install"}
+    assert server.installed_ruleset == "2.0.2"
+
+
+def test_already_current(service, server):
+    server.installed_ruleset = "2.0.2"
+
+    result = service.ensure_latest_ruleset([OFFICIAL_NODE])
+
+    assert (result["action"], result["installed"]) == ("none", "2.0.2")
+    assert "Install" not in server.requests
+
+
+def test_unofficial_nodes_fail(service):
+    result = service.ensure_latest_ruleset(["10V-UNKNOWN"])
+
+    assert result["action"] == "failed"
+    assert result["latest"] is None
+
+
+def test_availability_timeout(service, server, monkeypatch):
+    monkeypatch.setattr(service, "list_available_rulesets", lambda: None)
+
+    result = service.ensure_latest_ruleset([OFFICIAL_NODE], deadline=0.1, poll_interval=0.02, max_poll_interval=0.02)
+
+    assert result["action"] == "failed"
+    assert "not available" in result["error"]
+    assert server.installed_ruleset == "2.0.1"
+
+
+def test_availability_retries_transient_errors(service, server, monkeypatch):
+    list_available_rulesets = service.list_available_rulesets
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionError("connection reset")
+        return list_available_rulesets()
+
+    monkeypatch.setattr(service, "list_available_rulesets", flaky)
+
+    result = service.ensure_latest_ruleset([OFFICIAL_NODE], poll_interval=0.01)
+
+    assert result["action"] == "installed"
+    assert len(calls) == 2
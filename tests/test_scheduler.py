@@ -0,0 +1,89 @@
+import threading
+
+import pytest
+
+from OPDM import Client
+from OPDM.scheduler import PriorityScheduler, priority_class
+
+
+@pytest.mark.parametrize("metadata_dict, object_type, expected", [({"pmd:timeHorizon": "ID"}, "IGM", "ID"),
+                                                                  ({"pmd:timeHorizon": {"operator": "is", "value": "2D"}}, "IGM", "DA"),
+                                                                  ({"pmd:timeHorizon": "05"}, "IGM", "WA"),
+                                                                  ({"pmd:timeHorizon": "MO"}, "IGM", "YR"),
+                                                                  (None, "RULESET", "WA"),
+                                                                  (None, None, "DA")])
+def test_priority_class(metadata_dict, object_type, expected):
+    assert priority_class(metadata_dict, object_type) == expected
+
+
+def blocked_scheduler():
+    """Scheduler with one worker busy until returned event is set"""
+
+    scheduler = PriorityScheduler(max_workers=1)
+    release = threading.Event()
+    started = threading.Event()
+    scheduler.submit(lambda: started.set() or release.wait(5), priority="BACKGROUND")
+    started.wait(5)
+
+    return scheduler, release
+
+
+def test_urgent_work_runs_first():
+    scheduler, release = blocked_scheduler()
+    order = []
+
+    futures = [scheduler.submit(order.append, priority, priority=priority) for priority in ("YR", "BACKGROUND", "DA", "RT", "ID")]
+    release.set()
+    for future in futures:
+        future.result(5)
+    scheduler.shutdown()
+
+    assert order == ["RT", "ID", "DA", "YR", "BACKGROUND"]
+
+
+def test_low_priority_work_is_not_starved():
+    scheduler, release = blocked_scheduler()
+    order = []
+
+    futures = [scheduler.submit(order.append, "RT", priority="RT") for _ in range(64)] + [scheduler.submit(order.append, "YR", priority="YR")]
+    release.set()
+    for future in futures:
+        future.result(5)
+    scheduler.shutdown()
+
+    assert order.index("YR") < len(order) - 1
+
+
+def test_cancel_queued_work():
+    scheduler, release = blocked_scheduler()
+    done = []
+
+    long_term = [scheduler.submit(done.append, number, priority="YR") for number in range(3)]
+    intraday = scheduler.submit(done.append, "ID", priority="ID")
+
+    assert scheduler.cancel("YR") == 3
+    release.set()
+    intraday.result(5)
+    scheduler.shutdown()
+
+    assert all(future.cancelled() for future in long_term)
+    assert done == ["ID"]
+    assert scheduler.metrics()["YR"]["cancelled"] == 3
+
+
+def test_client_submit_cancel(service):
+    future = service.submit("query_object", "IGM", metadata_dict={"pmd:timeHorizon": "1D"})
+
+    assert future.result(10)["sm:QueryResult"]
+    assert service.scheduler.cancel("YR") == 0
+
+
+@pytest.mark.parametrize("operation, args, kwargs, expected", [("query_object", ("RULESET",), {}, "WA"),
+                                                               ("query_object", ("IGM", {"pmd:timeHorizon": "ID"}), {}, "ID"),
+                                                               ("query_profile", ({"pmd:timeHorizon": "05"},), {}, "WA"),
+                                                               ("get_content", ("RULESET",), {}, "DA")])
+def test_submit_priority(server, operation, args, kwargs, expected):
+    service = Client(server.url, profiling=False)
+    service.submit(operation, *args, **kwargs).exception(10)
+
+    assert service.scheduler.metrics()[expected]["submitted"] == 1
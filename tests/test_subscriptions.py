@@ -0,0 +1,63 @@
+import time
+
+from OPDM.OPDM_SOAP_API import parse_subscriptions
+
+
+def test_subscribe_many_validates_against_one_catalogue_fetch(service, server):
+    outcomes = service.subscribe_many([{"object_type": "IGM", "subscription_id": "IGM-1D", "metadata_dict": {"pmd:timeHorizon": "1D"}},
+                                       {"object_type": "BDS", "subscription_id": "BDS"},
+                                       {"object_type": "UNKNOWN", "subscription_id": "UNKNOWN"},
+                                       {"object_type": "IGM", "unknown_argument": True}])
+
+    assert [outcome["ok"] for outcome in outcomes] == [True, True, False, False]
+    assert outcomes[2]["error"] == "Subscription not valid for available publications"
+    assert "unknown_argument" in outcomes[3]["error"]
+    assert sorted(server.subscriptions) == ["BDS", "IGM-1D"]
+    assert server.requests["ExecuteOperation"] == 3
+
+
+def test_catalogue_is_cached_until_invalidated(service, server):
+    service.publication_subscribe("IGM", subscription_id="first")
+    service.publication_subscribe("IGM", subscription_id="second")
+    cached = server.requests["ExecuteOperation"]
+
+    service.catalogue.invalidate()
+    service.publication_subscribe("IGM", subscription_id="third")
+
+    # Two creations and one catalogue fetch, then catalogue fetch and creation
+    assert cached == 3
+    assert server.requests["ExecuteOperation"] == cached + 2
+    assert service.catalogue.object_types["IGM"] == "publication-IGM"
+
+
+
+def test_catalogue_is_refreshed_after_ttl(service, server):
+    service.catalogue.ttl = 0.05
+    service.publication_subscribe("IGM", subscription_id="first")
+    time.sleep(0.1)
+    service.publication_subscribe("IGM", subscription_id="second")
+
+    # Catalogue fetch and creation for both
+    assert server.requests["ExecuteOperation"] == 4
+
+
+def test_cancel_subscriptions_by_pattern(service, server):
+    for subscription_id in ("IGM-1D", "IGM-2D", "BDS"):
+        service.publication_subscribe("IGM" if subscription_id.startswith("IGM") else "BDS", subscription_id=subscription_id)
+    service.publication_stop_subscription("IGM-2D")
+
+    report = service.cancel_subscriptions(pattern="IGM-*")
+
+    assert report["matched"] == 2
+    assert sorted(report["cancelled"]) == ["IGM-1D", "IGM-2D"]
+    assert report["failed"] == []
+
+    statuses = {item["subscription_id"]: item["status"] for item in parse_subscriptions(service.subscription_list())}
+    assert statuses == {"IGM-1D": "DELETED", "IGM-2D": "DELETED", "BDS": "SUBSCRIBED"}
+
+
+def test_cancel_subscriptions_by_ids_and_unknown_status(service):
+    service.publication_subscribe("BDS", subscription_id="BDS")
+
+    assert service.cancel_subscriptions(subscription_ids=["BDS", "missing"])["cancelled"] == ["BDS"]
+    assert service.cancel_subscriptions("UNKNOWN") is None
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+from zeep.exceptions import Fault
+
+from OPDM import Client
+from OPDM.mock_server import MockServer
+
+
+def by_name(spans):
+    return {span["name"]: span for span in spans}
+
+
+def test_spans_form_one_trace(server):
+    spans = []
+    service = Client(server.url, profiling=False, tracing=spans.extend)
+
+    with service.span("closure", model_id="model-1"):
+        service.query_object("IGM", {"pmd:timeHorizon": "1D"})
+
+    named = by_name(spans)
+    closure, method, soap = named["closure"], named["query_object"], named["Query"]
+
+    assert len({span["context"]["trace_id"] for span in spans}) == 1
+    assert closure["parent_id"] is None
+    assert closure["attributes"] == {"model_id": "model-1"}
+    assert method["parent_id"] == closure["context"]["span_id"]
+    assert soap["parent_id"] == method["context"]["span_id"]
+
+    assert method["kind"] == "SpanKind.INTERNAL"
+    assert soap["kind"] == "SpanKind.CLIENT"
+    assert soap["attributes"]["rpc.method"] == "Query"
+    assert soap["attributes"]["http.response.status_code"] == 200
+
+    for name in ("serialize", "http", "deserialize"):
+        assert named[name]["parent_id"] == soap["context"]["span_id"]
+        assert named[name]["start_time"] <= named[name]["end_time"]
+
+
+def test_separate_operations_get_separate_traces(server):
+    spans = []
+    service = Client(server.url, profiling=False, tracing=spans.extend)
+
+    service.query_object("IGM", {"pmd:timeHorizon": "1D"})
+    service.query_object("IGM", {"pmd:timeHorizon": "ID"})
+
+    roots = [span for span in spans if span["parent_id"] is None]
+    assert [span["name"] for span in roots] == ["query_object", "query_object"]
+    assert roots[0]["context"]["trace_id"] != roots[1]["context"]["trace_id"]
+
+
+def test_fault_sets_error_status(catalogue):
+    spans = []
+
+    with MockServer(catalogue.objects(), fault_rate=1.0) as server:
+        service = Client(server.url, profiling=False, tracing=spans.extend)
+
+        with pytest.raises(Fault):
+            service.query_object("IGM", {"pmd:timeHorizon": "1D"})
+
+    status = by_name(spans)["Query"]["status"]
+    assert status["status_code"] == "ERROR"
+    assert status["description"].startswith("Fault")
+
+
+def test_file_export(server, tmp_path):
+    path = tmp_path / "spans.jsonl"
+    service = Client(server.url, profiling=False, tracing=path)
+
+    service.query_object("IGM", {"pmd:timeHorizon": "1D"})
+    service.query_object("IGM", {"pmd:timeHorizon": "ID"})
+
+    spans = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+    assert [span["name"] for span in spans].count("Query") == 2
+    assert all(span["resource"]["attributes"]["service.name"] == "OPDM" for span in spans)
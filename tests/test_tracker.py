@@ -0,0 +1,61 @@
+import pytest
+
+from OPDM import Client, PublicationTracker
+from OPDM.mock_server import MockServer
+from OPDM.tracker import is_final
+
+
+@pytest.mark.parametrize("status, final", [("SUCCESS", True), ("PUBLISHED", True), ("Published with warnings", True), ("REJECTED_BY_QAS", True),
+                                           ("IN_PROGRESS", False), ("OK", False), ("", False), (None, False)])
+def test_is_final_matches_status_keywords(status, final):
+    assert is_final({"status": status}) is final
+
+
+@pytest.fixture
+def service(catalogue):
+    # Publication steps advance every 20 ms
+    with MockServer(catalogue.objects(), processing_time=0.02) as server:
+        yield Client(server.url, profiling=False)
+
+
+def upload(service, tmp_path, count):
+    file_names = []
+    for number in range(count):
+        path = tmp_path / f"20240101T0030Z_1D_TSO01_SSH_{number:03d}.zip"
+        path.write_bytes(b"PK")
+        service.publication_request(str(path))
+        file_names.append(path.name)
+    return file_names
+
+
+def test_poll_once_batches_reports(service, tmp_path):
+    file_names = upload(service, tmp_path, 5)
+    tracker = PublicationTracker(service, batch_size=2)
+    futures = tracker.track_many(filenames=file_names)
+
+    tracker.poll_once()
+
+    # Five files in batches of two
+    assert tracker.report_calls == 3
+    assert all(future.done() or tracker.pending[("filename", name)]["report"]["filename"] == name for name, future in futures.items())
+
+
+def test_tracks_files_to_final_report(service, tmp_path):
+    file_names = upload(service, tmp_path, 3)
+    finished = []
+    tracker = PublicationTracker(service, callback=finished.append, interval=0.05, max_interval=0.1).start()
+
+    try:
+        futures = tracker.track_many(filenames=file_names)
+        reports = {name: future.result(timeout=10) for name, future in futures.items()}
+    finally:
+        tracker.stop()
+
+    assert {report["status"] for report in reports.values()} == {"SUCCESS"}
+    assert sorted(report["filename"] for report in finished) == sorted(file_names)
+    assert tracker.pending == {}
+
+
+def test_track_requires_identifier(service):
+    with pytest.raises(ValueError):
+        PublicationTracker(service).track()
@@ -0,0 +1,55 @@
+from OPDM import SubscriptionWatcher
+
+
+class Service:
+    """Returns given objects for every query, like server that rounds or ignores the creation date filter"""
+
+    def __init__(self, objects):
+        self.objects = objects
+        self.queries = []
+
+    def query_object(self, object_type, metadata_dict):
+        self.queries.append(metadata_dict)
+        return {"sm:QueryResult": {"sm:part": ["query-id"] + [{"opdm:OPDMObject": item} for item in self.objects]}}
+
+
+def test_poll_reports_new_objects_once(service):
+    watcher = SubscriptionWatcher(service)
+    name = watcher.watch("IGM", {"pmd:timeHorizon": "1D"}, since="2023-01-01T00:00:00Z")
+
+    first = watcher.poll(name)
+    second = watcher.poll(name)
+
+    assert first
+    assert second == []
+
+
+def test_poll_compares_creation_dates_as_timestamps():
+    service = Service([{"opde:Id": "a", "pmd:creationDate": "2024-01-01T10:00:00+02:00"},
+                       {"opde:Id": "b", "pmd:creationDate": "2024-01-01T09:00:00Z"},
+                       {"opde:Id": "c", "pmd:creationDate": "2024-01-01T07:30:00Z"}])
+    watcher = SubscriptionWatcher(service)
+    name = watcher.watch("IGM", {"pmd:timeHorizon": "1D"}, since="2024-01-01T08:00Z")
+
+    # As strings "2024-01-01T10:00:00+02:00" would be the latest and "2024-01-01T07:30:00Z" after the watermark
+    assert [item["opde:Id"] for item in watcher.poll(name)] == ["a", "b"]
+    assert watcher.watches[name].watermark == "2024-01-01T09:00:00Z"
+    assert service.queries[-1]["pmd:creationDate"]["value"] == "2024-01-01T08:00Z"
+
+    assert watcher.poll(name) == []
+    assert service.queries[-1]["pmd:creationDate"] == {"operator": "is after", "value": "2024-01-01T09:00:00Z"}
+
+
+def test_poll_reports_objects_without_creation_date_once():
+    service = Service([{"opde:Id": "a", "pmd:creationDate": "2024-01-01T09:00:00Z"},
+                       {"opde:Id": "b"},
+                       {"opde:Id": "c", "pmd:creationDate": "unknown"}])
+    watcher = SubscriptionWatcher(service)
+    name = watcher.watch("IGM", {"pmd:timeHorizon": "1D"}, since="2024-01-01T08:00:00Z")
+
+    assert [item["opde:Id"] for item in watcher.poll(name)] == ["a", "b", "c"]
+
+    # Watermark advanced, objects without date still come back from server
+    service.objects.append({"opde:Id": "d", "pmd:creationDate": "2024-01-01T10:00:00Z"})
+    assert [item["opde:Id"] for item in watcher.poll(name)] == ["d"]
+    assert watcher.poll(name) == []